@@ -0,0 +1,438 @@
+"""
+Каталог клубов и секций в памяти воркера.
+
+CatalogSnapshot неизменяем: чтения идут без блокировок и без БД,
+обновление собирает новый снимок и подменяет ссылку одним присваиванием.
+Изменения приходят из триггеров notify_catalog_change через ChangeListener;
+за окно window они копятся и перечитываются из БД только по изменённым id.
+Полная перезагрузка раз в CATALOG_FULL_RELOAD_INTERVAL страхует от
+уведомлений, потерянных при переподключении LISTEN-соединения.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from app.core.config import CATALOG_FULL_RELOAD_INTERVAL, CATALOG_REFRESH_WINDOW
+from app.core.database import async_session
+from app.core.periodic import PeriodicTask
+from app.core.realtime import change_listener
+from app.crud.catalog import get_catalog_clubs, get_catalog_sections
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY_SECONDS = 2.0
+_EMPTY: FrozenSet[int] = frozenset()
+
+
+def _index_key(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    key = str(value).strip().casefold()
+    return key or None
+
+
+def _fingerprint(table: str, item: Dict[str, Any]) -> int:
+    """64-bit digest of one row; the snapshot digest is the XOR over all rows"""
+    raw = json.dumps([table, item], sort_keys=True, ensure_ascii=False).encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big")
+
+
+def _section_keys(section: Dict[str, Any]) -> Dict[str, Set[Any]]:
+    return {
+        "club": {section["club_id"]},
+        "tag": {_index_key(tag) for tag in section.get("tags") or ()} - {None},
+        "level": {_index_key(section.get("level"))} - {None},
+    }
+
+
+def _reindex(
+    index: Dict[Any, FrozenSet[int]],
+    item_id: int,
+    old_keys: Iterable[Any],
+    new_keys: Iterable[Any],
+):
+    """Move item_id between posting sets of a (copied) index"""
+    old_keys, new_keys = set(old_keys), set(new_keys)
+    for key in old_keys - new_keys:
+        remaining = index.get(key, _EMPTY) - {item_id}
+        if remaining:
+            index[key] = remaining
+        else:
+            index.pop(key, None)
+    for key in new_keys - old_keys:
+        index[key] = index.get(key, _EMPTY) | {item_id}
+
+
+class CatalogSnapshot:
+    """
+    Immutable catalog view: clubs/sections as ready-to-serialize dicts
+    plus secondary indexes (city -> clubs; club_id, tag, level -> sections).
+    Ключи city/tag/level приводятся к casefold. Не изменять после сборки.
+    digest — XOR хэшей строк: зависит только от содержимого, поэтому
+    одинаков во всех воркерах и годится для ETag.
+    """
+
+    __slots__ = (
+        "version",
+        "digest",
+        "built_at",
+        "clubs",
+        "sections",
+        "clubs_by_city",
+        "sections_by_club",
+        "sections_by_tag",
+        "sections_by_level",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        digest: int,
+        clubs: Dict[int, Dict[str, Any]],
+        sections: Dict[int, Dict[str, Any]],
+        clubs_by_city: Dict[str, FrozenSet[int]],
+        sections_by_club: Dict[int, FrozenSet[int]],
+        sections_by_tag: Dict[str, FrozenSet[int]],
+        sections_by_level: Dict[str, FrozenSet[int]],
+    ):
+        self.version = version
+        self.digest = digest
+        self.built_at = time.time()
+        self.clubs = clubs
+        self.sections = sections
+        self.clubs_by_city = clubs_by_city
+        self.sections_by_club = sections_by_club
+        self.sections_by_tag = sections_by_tag
+        self.sections_by_level = sections_by_level
+
+    @classmethod
+    def empty(cls) -> "CatalogSnapshot":
+        return cls(0, 0, {}, {}, {}, {}, {}, {})
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        clubs: List[Dict[str, Any]],
+        sections: List[Dict[str, Any]],
+    ) -> "CatalogSnapshot":
+        """Full build: indexes are accumulated in sets and frozen once"""
+        digest = 0
+        clubs_by_city: Dict[str, Set[int]] = defaultdict(set)
+        for club in clubs:
+            digest ^= _fingerprint("clubs", club)
+            city = _index_key(club["city"])
+            if city is not None:
+                clubs_by_city[city].add(club["id"])
+
+        section_indexes: Dict[str, Dict[Any, Set[int]]] = {
+            "club": defaultdict(set),
+            "tag": defaultdict(set),
+            "level": defaultdict(set),
+        }
+        for section in sections:
+            digest ^= _fingerprint("sections", section)
+            for name, keys in _section_keys(section).items():
+                for key in keys:
+                    section_indexes[name][key].add(section["id"])
+
+        def freeze(index: Dict[Any, Set[int]]) -> Dict[Any, FrozenSet[int]]:
+            return {key: frozenset(ids) for key, ids in index.items()}
+
+        return cls(
+            version,
+            digest,
+            {club["id"]: club for club in clubs},
+            {section["id"]: section for section in sections},
+            freeze(clubs_by_city),
+            freeze(section_indexes["club"]),
+            freeze(section_indexes["tag"]),
+            freeze(section_indexes["level"]),
+        )
+
+    def apply(
+        self,
+        clubs: Dict[int, Optional[Dict[str, Any]]],
+        sections: Dict[int, Optional[Dict[str, Any]]],
+    ) -> "CatalogSnapshot":
+        """
+        New snapshot with rows replaced (dict) or removed (None).
+        Копируются только словари верхнего уровня, индексы меняются
+        лишь по затронутым ключам — для небольших пачек изменений.
+        """
+        new_clubs = dict(self.clubs)
+        new_sections = dict(self.sections)
+        clubs_by_city = dict(self.clubs_by_city)
+        sections_by_club = dict(self.sections_by_club)
+        sections_by_tag = dict(self.sections_by_tag)
+        sections_by_level = dict(self.sections_by_level)
+        digest = self.digest
+
+        def put_section(section_id: int, section: Optional[Dict[str, Any]]):
+            nonlocal digest
+            old = new_sections.pop(section_id, None)
+            old_keys = _section_keys(old) if old else {}
+            if old is not None:
+                digest ^= _fingerprint("sections", old)
+            new_keys = _section_keys(section) if section else {}
+            if section is not None:
+                new_sections[section_id] = section
+                digest ^= _fingerprint("sections", section)
+            indexes = {
+                "club": sections_by_club,
+                "tag": sections_by_tag,
+                "level": sections_by_level,
+            }
+            for name, index in indexes.items():
+                _reindex(
+                    index, section_id, old_keys.get(name, ()), new_keys.get(name, ())
+                )
+
+        for club_id, club in clubs.items():
+            old = new_clubs.pop(club_id, None)
+            if old is not None:
+                digest ^= _fingerprint("clubs", old)
+            if club is not None:
+                new_clubs[club_id] = club
+                digest ^= _fingerprint("clubs", club)
+            else:
+                # Секции удалённого клуба удаляются каскадом
+                for section_id in sections_by_club.get(club_id, _EMPTY):
+                    if section_id not in sections:
+                        put_section(section_id, None)
+            _reindex(
+                clubs_by_city,
+                club_id,
+                {_index_key(old["city"])} - {None} if old else (),
+                {_index_key(club["city"])} - {None} if club else (),
+            )
+
+        for section_id, section in sections.items():
+            put_section(section_id, section)
+
+        return CatalogSnapshot(
+            self.version + 1,
+            digest,
+            new_clubs,
+            new_sections,
+            clubs_by_city,
+            sections_by_club,
+            sections_by_tag,
+            sections_by_level,
+        )
+
+    def section_ids(
+        self,
+        club_id: Optional[int] = None,
+        city: Optional[str] = None,
+        tag: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> Optional[FrozenSet[int]]:
+        """Section ids matching all filters; None means "no filter given" """
+        candidates: List[FrozenSet[int]] = []
+        if club_id is not None:
+            candidates.append(self.sections_by_club.get(club_id, _EMPTY))
+        if city is not None:
+            candidates.append(
+                frozenset().union(
+                    *(
+                        self.sections_by_club.get(cid, _EMPTY)
+                        for cid in self.clubs_by_city.get(_index_key(city), _EMPTY)
+                    )
+                )
+            )
+        if tag is not None:
+            candidates.append(self.sections_by_tag.get(_index_key(tag), _EMPTY))
+        if level is not None:
+            candidates.append(self.sections_by_level.get(_index_key(level), _EMPTY))
+        if not candidates:
+            return None
+        # Пересечение начиная с самого короткого множества
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+    def find_clubs(
+        self,
+        city: Optional[str] = None,
+        tag: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Clubs in the city having an active section with the tag/level, by name"""
+        if city is not None:
+            club_ids: Iterable[int] = self.clubs_by_city.get(_index_key(city), _EMPTY)
+        else:
+            club_ids = self.clubs.keys()
+        if tag is not None or level is not None:
+            with_sections = {
+                self.sections[section_id]["club_id"]
+                for section_id in self.section_ids(tag=tag, level=level)
+            }
+            club_ids = [club_id for club_id in club_ids if club_id in with_sections]
+        clubs = [self.clubs[club_id] for club_id in club_ids if club_id in self.clubs]
+        return sorted(clubs, key=lambda club: (club["name"], club["id"]))
+
+    def find_sections(
+        self,
+        club_id: Optional[int] = None,
+        city: Optional[str] = None,
+        tag: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        ids = self.section_ids(club_id=club_id, city=city, tag=tag, level=level)
+        sections = [
+            self.sections[section_id]
+            for section_id in (self.sections.keys() if ids is None else ids)
+        ]
+        return sorted(
+            sections,
+            key=lambda section: (section["club_id"], section["name"], section["id"]),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "digest": f"{self.digest:016x}",
+            "clubs": len(self.clubs),
+            "sections": len(self.sections),
+            "cities": len(self.clubs_by_city),
+            "tags": len(self.sections_by_tag),
+            "levels": len(self.sections_by_level),
+            "age_seconds": round(time.time() - self.built_at, 3),
+        }
+
+
+class CatalogStore:
+    """
+    Holds the current CatalogSnapshot of this worker and keeps it fresh.
+    Все пересборки идут последовательно в одной фоновой задаче,
+    поэтому снимки не перетирают друг друга.
+    """
+
+    def __init__(
+        self,
+        window: float = CATALOG_REFRESH_WINDOW,
+        full_reload_interval: float = CATALOG_FULL_RELOAD_INTERVAL,
+    ):
+        self.window = window
+        self.snapshot = CatalogSnapshot.empty()
+        self._pending_clubs: Set[int] = set()
+        self._pending_sections: Set[int] = set()
+        self._dirty = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._reloader = PeriodicTask(
+            "catalog-reload", full_reload_interval, self.reload
+        )
+
+        self.changes_received = 0
+        self.full_builds = 0
+        self.incremental_builds = 0
+        self.failures = 0
+        self.last_build_kind: Optional[str] = None
+        self.last_build_seconds = 0.0
+
+    async def start(self):
+        await self.reload()
+        self._task = asyncio.create_task(self._run(), name="catalog-refresh")
+        await self._reloader.start()
+
+    async def stop(self):
+        await self._reloader.stop()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def handle_change(self, change: Dict[str, Any]):
+        """ChangeListener handler: remember the changed id, refresh after window"""
+        table, row_id = change.get("table"), change.get("id")
+        if row_id is None:
+            return
+        if table == "clubs":
+            self._pending_clubs.add(row_id)
+        elif table == "sections":
+            self._pending_sections.add(row_id)
+        else:
+            return
+        self.changes_received += 1
+        self._dirty.set()
+
+    async def reload(self):
+        """Full rebuild from the database"""
+        async with self._lock:
+            started = time.perf_counter()
+            async with async_session() as session:
+                clubs = await get_catalog_clubs(session)
+                sections = await get_catalog_sections(session)
+            snapshot = CatalogSnapshot.build(self.snapshot.version + 1, clubs, sections)
+            self._swap(snapshot, "full", time.perf_counter() - started)
+
+    async def refresh(self, club_ids: Set[int], section_ids: Set[int]):
+        """Incremental rebuild: re-read only the changed rows"""
+        async with self._lock:
+            started = time.perf_counter()
+            async with async_session() as session:
+                clubs = await get_catalog_clubs(session, club_ids) if club_ids else []
+                sections = (
+                    await get_catalog_sections(session, section_ids)
+                    if section_ids
+                    else []
+                )
+            # id без строки в ответе — удалены (или секция стала неактивной)
+            club_changes = dict.fromkeys(club_ids)
+            club_changes.update((club["id"], club) for club in clubs)
+            section_changes = dict.fromkeys(section_ids)
+            section_changes.update((section["id"], section) for section in sections)
+
+            snapshot = self.snapshot.apply(club_changes, section_changes)
+            self._swap(snapshot, "incremental", time.perf_counter() - started)
+
+    def _swap(self, snapshot: CatalogSnapshot, kind: str, seconds: float):
+        self.snapshot = snapshot
+        self.last_build_kind = kind
+        self.last_build_seconds = seconds
+        if kind == "full":
+            self.full_builds += 1
+        else:
+            self.incremental_builds += 1
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            # Окно: серия изменений (например, записи в секцию) — одна пересборка
+            await asyncio.sleep(self.window)
+            self._dirty.clear()
+            club_ids, self._pending_clubs = self._pending_clubs, set()
+            section_ids, self._pending_sections = self._pending_sections, set()
+            try:
+                await self.refresh(club_ids, section_ids)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("Catalog refresh failed, retrying")
+                self._pending_clubs |= club_ids
+                self._pending_sections |= section_ids
+                self._dirty.set()
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.snapshot.stats(),
+            "changes_received": self.changes_received,
+            "pending_changes": len(self._pending_clubs) + len(self._pending_sections),
+            "full_builds": self.full_builds,
+            "incremental_builds": self.incremental_builds,
+            "failures": self.failures,
+            "last_build_kind": self.last_build_kind,
+            "last_build_ms": round(self.last_build_seconds * 1000, 3),
+        }
+
+
+catalog = CatalogStore()
+change_listener.add_handler(catalog.handle_change)
@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Deque, List, Optional, Set, Tuple
+
+import asyncpg
+
+from app.core.config import (
+    CHECKIN_DEAD_LETTER_MAX,
+    CHECKIN_FLUSH_INTERVAL,
+    CHECKIN_FLUSH_SIZE,
+    CHECKIN_MAX_FLUSH_ATTEMPTS,
+    CHECKIN_MAX_PENDING,
+)
+from app.core.database import engine
+from app.core.partitions import ensure_monthly_partitions, month_start, next_month
+
+logger = logging.getLogger(__name__)
+
+CHECKIN_TABLE = "check_ins"
+CHECKIN_COLUMNS = ("section_id", "telegram_id", "checked_in_at", "source")
+
+CheckInRow = Tuple[int, int, datetime, str]
+
+# Ошибки из-за содержимого строк: нарушение ограничений, неверный тип или
+# длина значения. Соединение, остановка сервера и нехватка ресурсов — не они:
+# такую пачку делить бессмысленно, она просто ждёт следующего сброса
+_ROW_ERRORS = (asyncpg.PostgresError, ValueError, TypeError)
+_TRANSIENT_ERRORS = (
+    asyncpg.PostgresConnectionError,
+    asyncpg.exceptions.OperatorInterventionError,
+    asyncpg.exceptions.InsufficientResourcesError,
+)
+
+
+def _is_row_error(exc: Optional[BaseException]) -> bool:
+    # SQLAlchemy заворачивает ошибку драйвера: исходная — в цепочке __cause__
+    while exc is not None:
+        if isinstance(exc, _TRANSIENT_ERRORS):
+            return False
+        if isinstance(exc, _ROW_ERRORS):
+            return True
+        exc = exc.__cause__
+    return False
+
+
+class CheckInBuffer:
+    """
+    In-process буфер отметок посещения.
+
+    Запрос только добавляет строку в список и сразу отвечает;
+    фоновая задача сбрасывает накопленное одним COPY, когда набралось
+    flush_size строк или прошло flush_interval секунд.
+    При ошибке записи пачка возвращается в начало буфера; после
+    max_attempts неудач подряд пачка делится пополам, пока не останутся
+    строки, которые не пишутся сами по себе — они уходят в dead letter
+    (лог + последние dead_letter_max строк в памяти), остальное пишется.
+    На shutdown (lifespan) буфер дренируется полностью.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = CHECKIN_FLUSH_SIZE,
+        flush_interval: float = CHECKIN_FLUSH_INTERVAL,
+        max_pending: int = CHECKIN_MAX_PENDING,
+        max_attempts: int = CHECKIN_MAX_FLUSH_ATTEMPTS,
+        dead_letter_max: int = CHECKIN_DEAD_LETTER_MAX,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+
+        self._rows: List[CheckInRow] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._partitions: Set[date] = set()
+        self._failed_attempts = 0
+        # Строки пачки, которая сейчас пишется: при ошибке вернутся в буфер
+        self._in_flight = 0
+        self.dead_letters: Deque[Tuple[CheckInRow, str]] = deque(maxlen=dead_letter_max)
+
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        self.last_flush_rows = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def pending(self) -> int:
+        return len(self._rows)
+
+    def add(
+        self,
+        section_id: int,
+        telegram_id: int,
+        checked_in_at: Optional[datetime] = None,
+        source: str = "qr",
+    ) -> bool:
+        """Append a check-in; returns False when the buffer is full"""
+        if len(self._rows) + self._in_flight >= self.max_pending:
+            self.rejected += 1
+            return False
+
+        self._rows.append(
+            (
+                section_id,
+                telegram_id,
+                checked_in_at or datetime.now(timezone.utc),
+                source,
+            )
+        )
+        self.accepted += 1
+        if len(self._rows) >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        # Партиции текущего и следующего месяца — чтобы первый COPY не ждал DDL
+        today = datetime.now(timezone.utc).date()
+        await self._ensure_partitions({month_start(today), next_month(today)})
+        self._task = asyncio.create_task(self._run(), name="checkin-buffer")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # Финальный дренаж: последняя попытка успевает разделить пачку с
+        # «ядовитой» строкой; затем честно логируем потерю
+        for _ in range(max(self.max_attempts, 3) + 1):
+            if not self._rows:
+                return
+            await self.flush()
+        if self._rows:
+            logger.error(
+                "Check-in buffer shutdown with %d unflushed rows", len(self._rows)
+            )
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far with COPY; returns rows written"""
+        async with self._flush_lock:
+            if not self._rows:
+                return 0
+
+            rows, self._rows = self._rows, []
+            self._in_flight = len(rows)
+            try:
+                return await self._flush_batch(rows)
+            finally:
+                self._in_flight = 0
+
+    async def _flush_batch(self, rows: List[CheckInRow]) -> int:
+        started = time.perf_counter()
+        try:
+            await self._write(rows)
+        except asyncio.CancelledError:
+            # Отмена посреди COPY (shutdown): строки вернутся в финальный дренаж
+            self._rows[:0] = rows
+            raise
+        except Exception as exc:
+            self.failed_flushes += 1
+            self._failed_attempts += 1
+            logger.exception("Check-in flush of %d rows failed", len(rows))
+            if self._failed_attempts < self.max_attempts or not _is_row_error(exc):
+                self._requeue(rows)
+                return 0
+            # Одна «ядовитая» строка не должна блокировать весь буфер
+            written, retry = await self._bisect(rows, exc)
+            self._requeue(retry)
+        else:
+            written, retry = len(rows), []
+
+        if not retry:
+            self._failed_attempts = 0
+        self.flushed += written
+        self.last_flush_rows = written
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return written
+
+    def _requeue(self, rows: List[CheckInRow]):
+        # Пачка возвращается в начало целиком: место под неё add() держал,
+        # пока шла запись (_in_flight), так что лимит буфера не превышается
+        self._rows[:0] = rows
+
+    async def _bisect(
+        self, rows: List[CheckInRow], exc: BaseException
+    ) -> Tuple[int, List[CheckInRow]]:
+        """
+        Split a failed batch and write the halves separately.
+        Returns rows written and rows to retry later (the database is
+        unavailable rather than rejecting particular rows).
+        """
+        if len(rows) == 1:
+            self._dead_letter(rows[0], exc)
+            return 0, []
+        middle = len(rows) // 2
+        written, retry = await self._isolate(rows[:middle])
+        if retry:
+            return written, retry + rows[middle:]
+        tail_written, retry = await self._isolate(rows[middle:])
+        return written + tail_written, retry
+
+    async def _isolate(self, rows: List[CheckInRow]) -> Tuple[int, List[CheckInRow]]:
+        try:
+            await self._write(rows)
+        except Exception as exc:
+            if not _is_row_error(exc):
+                return 0, rows
+            return await self._bisect(rows, exc)
+        return len(rows), []
+
+    def _dead_letter(self, row: CheckInRow, exc: BaseException):
+        self.dead_lettered += 1
+        self.dead_letters.append((row, repr(exc)))
+        logger.error("Check-in dead-lettered: %r (%r)", row, exc)
+
+    async def _write(self, rows: List[CheckInRow]):
+        await self._ensure_partitions({month_start(row[2].date()) for row in rows})
+        await self._copy(rows)
+
+    async def _ensure_partitions(self, months: Set[date]):
+        missing = months - self._partitions
+        if not missing:
+            return
+        async with engine.begin() as conn:
+            self._partitions |= await ensure_monthly_partitions(
+                conn, CHECKIN_TABLE, missing
+            )
+
+    async def _copy(self, rows: List[CheckInRow]):
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                CHECKIN_TABLE, records=rows, columns=CHECKIN_COLUMNS
+            )
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered": self.dead_lettered,
+            "last_flush_rows": self.last_flush_rows,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+
+checkin_buffer = CheckInBuffer()
@@ -0,0 +1,247 @@
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHE_ENTRIES,
+    COMPRESSION_CACHE_MAX_BODY,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+)
+from app.core.offload import run_in_thread
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него отдаём gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/",
+    "application/javascript",
+    "application/xml",
+)
+# Тела больше этого сжимаем в потоке, чтобы не держать event loop
+THREAD_THRESHOLD = 256 * 1024
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from Accept-Encoding (q=0 means "not acceptable")"""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def compress(
+    body: bytes,
+    encoding: str,
+    gzip_level: int = COMPRESSION_GZIP_LEVEL,
+    brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+# (encoding, blake2b тела, длина тела)
+CacheKey = Tuple[str, bytes, int]
+
+
+def cache_key(body: bytes, encoding: str) -> CacheKey:
+    return encoding, hashlib.blake2b(body, digest_size=16).digest(), len(body)
+
+
+class PrecompressedCache:
+    """
+    LRU уже сжатых тел по (encoding, хэш тела, длина тела).
+    Кэшируются только ответы с ETag — горячий ответ (страница списка,
+    каталог) сжимается один раз, а не на каждый запрос. Ключ — хэш самого
+    тела, а не ETag: слабый ETag (W/) допускает разные байты при одном
+    значении, и сжатое тело чужой версии ушло бы клиенту. Хэш тела в
+    разы дешевле его сжатия (benchmarks/compression.py).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = COMPRESSION_CACHE_ENTRIES,
+        max_body: int = COMPRESSION_CACHE_MAX_BODY,
+    ):
+        self.max_entries = max_entries
+        self.max_body = max_body
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_seconds = 0.0
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: CacheKey, body: bytes):
+        if key[2] > self.max_body:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record(self, size_in: int, size_out: int, seconds: float):
+        self.compressed += 1
+        self.bytes_in += size_in
+        self.bytes_out += size_out
+        self.compress_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "brotli_available": brotli is not None,
+            "cache_entries": len(self._entries),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "compressed_responses": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": (
+                round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None
+            ),
+            "compress_ms_total": round(self.compress_seconds * 1000, 2),
+        }
+
+
+precompressed_cache = PrecompressedCache()
+
+
+class CompressionMiddleware:
+    """
+    ASGI-middleware сжатия ответов: br (если есть brotli) или gzip по
+    Accept-Encoding, только для текстовых типов не меньше minimum_size байт.
+    Ответы с ETag (и без no-store) берутся из PrecompressedCache.
+    Потоковые ответы (несколько body-сообщений) проходят без изменений.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        cache: PrecompressedCache = precompressed_cache,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            if passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(
+                start_message, body
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            compressed = await self._compress(body, encoding, headers)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, start_message: Message, body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        status = start_message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def _compress(
+        self, body: bytes, encoding: str, headers: MutableHeaders
+    ) -> bytes:
+        cacheable = (
+            "etag" in headers
+            and "no-store" not in headers.get("cache-control", "")
+            and len(body) <= self.cache.max_body
+        )
+        if cacheable:
+            key = cache_key(body, encoding)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        if len(body) >= THREAD_THRESHOLD:
+            compressed = await run_in_thread(
+                compress, body, encoding, self.gzip_level, self.brotli_quality
+            )
+        else:
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+        self.cache.record(len(body), len(compressed), time.perf_counter() - started)
+
+        if cacheable:
+            self.cache.put(key, compressed)
+        return compressed
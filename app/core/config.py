@@ -9,3 +9,112 @@ POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# Base URL of the Bot API; override to point the notification worker at a local fake server
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# Токен для /api/v1/admin/*; если не задан — админ-эндпоинты недоступны
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Буфер check-in: сброс в БД по размеру пачки или по таймеру (секунды)
+CHECKIN_FLUSH_SIZE = int(os.getenv("CHECKIN_FLUSH_SIZE", "500"))
+CHECKIN_FLUSH_INTERVAL = float(os.getenv("CHECKIN_FLUSH_INTERVAL", "1.0"))
+CHECKIN_MAX_PENDING = int(os.getenv("CHECKIN_MAX_PENDING", "50000"))
+# После стольких неудачных сбросов подряд пачка делится пополам, пока не
+# останутся строки, которые не пишутся сами по себе (они уходят в dead letter)
+CHECKIN_MAX_FLUSH_ATTEMPTS = int(os.getenv("CHECKIN_MAX_FLUSH_ATTEMPTS", "3"))
+CHECKIN_DEAD_LETTER_MAX = int(os.getenv("CHECKIN_DEAD_LETTER_MAX", "1000"))
+
+# Рассылка уведомлений: глобальный лимит Bot API (сообщений/сек) и размер пачки
+# Без TELEGRAM_BOT_TOKEN рассылка по умолчанию выключена: любая отправка упала бы
+NOTIFICATIONS_DEFAULT = "true" if TELEGRAM_BOT_TOKEN else "false"
+NOTIFICATIONS_ENABLED = (
+    os.getenv("NOTIFICATIONS_ENABLED", NOTIFICATIONS_DEFAULT).lower() == "true"
+)
+NOTIFY_RATE_PER_SECOND = float(os.getenv("NOTIFY_RATE_PER_SECOND", "25"))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "100"))
+NOTIFY_SENDERS = int(os.getenv("NOTIFY_SENDERS", "8"))
+NOTIFY_POLL_INTERVAL = float(os.getenv("NOTIFY_POLL_INTERVAL", "1.0"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+# Лимит глобальный: рассылку ведёт один воркер (advisory lock), остальные
+# раз в столько секунд пробуют перехватить замок; лидер — проверяет соединение
+NOTIFY_LEADER_CHECK_INTERVAL = float(os.getenv("NOTIFY_LEADER_CHECK_INTERVAL", "5"))
+
+# Логирование: JSON в stdout из фонового потока, лимит одинаковых строк в секунду
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+LOG_RATE_LIMIT_PER_SECOND = float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", "10"))
+# Переопределения лимита по логгерам: "sqlalchemy.engine=50,app.core.telegram_auth=2"
+LOG_RATE_LIMITS = os.getenv("LOG_RATE_LIMITS", "")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Сколько ключей (logger, шаблон) держит лимитер; дольше всех не виденные вытесняются
+LOG_RATE_LIMIT_MAX_KEYS = int(os.getenv("LOG_RATE_LIMIT_MAX_KEYS", "10000"))
+# SQL-эхо (раньше echo=True в движке) — только по явному запросу
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Сверка rollup-ов статистики клубов с исходными таблицами (секунды)
+CLUB_STATS_RECONCILE_INTERVAL = float(
+    os.getenv("CLUB_STATS_RECONCILE_INTERVAL", str(6 * 60 * 60))
+)
+
+# Idempotency-Key: сколько хранить ответ (секунды) и сколько ключей держать в памяти
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+# Single-flight: сколько секунд после завершения запроса к БД его результат
+# отдаётся таким же параллельным чтениям
+SINGLEFLIGHT_GRACE = float(os.getenv("SINGLEFLIGHT_GRACE", "0.05"))
+
+# Сжатие ответов (brotli, если установлен пакет brotli, иначе gzip)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# Кэш уже сжатых тел по ETag: записей и максимальный размер одного тела (байт)
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", "1048576"))
+
+# Каталог клубов/секций в памяти: окно схлопывания уведомлений перед
+# перечитыванием изменённых строк и период полной перезагрузки (секунды)
+CATALOG_REFRESH_WINDOW = float(os.getenv("CATALOG_REFRESH_WINDOW", "0.5"))
+CATALOG_FULL_RELOAD_INTERVAL = float(
+    os.getenv("CATALOG_FULL_RELOAD_INTERVAL", str(10 * 60))
+)
+
+# Профайлер запросов: секрет подписи заголовка X-Profile (без него — только
+# включение через /admin/profiler), шаг сэмплирования (секунды),
+# сколько готовых профилей хранить и сколько запросов профилировать одновременно
+PROFILER_SECRET = os.getenv("PROFILER_SECRET") or None
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.005"))
+PROFILER_MAX_PROFILES = int(os.getenv("PROFILER_MAX_PROFILES", "50"))
+PROFILER_MAX_ACTIVE = int(os.getenv("PROFILER_MAX_ACTIVE", "4"))
+
+# Монитор задержки event loop: шаг измерения и порог, после которого
+# снимается стек блокирующего кода (секунды); сколько последних блокировок хранить
+LOOP_MONITOR_INTERVAL = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.1"))
+LOOP_MONITOR_MAX_STALLS = int(os.getenv("LOOP_MONITOR_MAX_STALLS", "20"))
+# Пулы для run_in_thread / run_in_process
+OFFLOAD_THREAD_WORKERS = int(os.getenv("OFFLOAD_THREAD_WORKERS", "4"))
+OFFLOAD_PROCESS_WORKERS = int(os.getenv("OFFLOAD_PROCESS_WORKERS", "2"))
+
+# Архив членств: неактивные дольше USER_ROLES_RETENTION_DAYS строки user_roles
+# переносятся в user_roles_history пачками по USER_ROLES_ARCHIVE_BATCH
+# (одна короткая транзакция на пачку); период запуска — секунды
+USER_ROLES_RETENTION_DAYS = int(os.getenv("USER_ROLES_RETENTION_DAYS", "365"))
+USER_ROLES_ARCHIVE_BATCH = int(os.getenv("USER_ROLES_ARCHIVE_BATCH", "1000"))
+USER_ROLES_ARCHIVE_INTERVAL = float(
+    os.getenv("USER_ROLES_ARCHIVE_INTERVAL", str(24 * 60 * 60))
+)
+
+# Слоты тренеров хранятся в UTC по смещению на момент записи: после перехода
+# клуба на летнее время они сдвинуты, пока их не пересоберёт эта задача
+COACH_SLOTS_RESYNC_INTERVAL = float(
+    os.getenv("COACH_SLOTS_RESYNC_INTERVAL", str(6 * 60 * 60))
+)
+
+# Tombstone-ы /sync старше SYNC_TOMBSTONE_RETENTION_DAYS удаляются; клиент с
+# токеном старше удалённых получает 410 и делает полную синхронизацию
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "30"))
+SYNC_TOMBSTONE_PRUNE_BATCH = int(os.getenv("SYNC_TOMBSTONE_PRUNE_BATCH", "5000"))
+SYNC_TOMBSTONE_PRUNE_INTERVAL = float(
+    os.getenv("SYNC_TOMBSTONE_PRUNE_INTERVAL", str(24 * 60 * 60))
+)
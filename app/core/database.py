@@ -1,9 +1,11 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from typing import Iterable
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from .config import DATABASE_URL
 
+# echo выключен: SQL-лог включается через DB_ECHO и идёт через очередь логов
 engine = create_async_engine(
-    DATABASE_URL, echo=True, pool_size=20, max_overflow=0, pool_timeout=30
+    DATABASE_URL, echo=False, pool_size=20, max_overflow=0, pool_timeout=30
 )
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -13,3 +15,11 @@ Base = declarative_base()
 async def get_session():
     async with async_session() as session:
         yield session
+
+
+async def run_ddl(conn: AsyncConnection, statements: Iterable[str]):
+    """Execute raw idempotent DDL (functions, triggers) one statement at a time"""
+    # Воркеры стартуют одновременно: CREATE OR REPLACE параллельно падает
+    await conn.exec_driver_sql("SELECT pg_advisory_xact_lock(hashtext('startup_ddl'))")
+    for statement in statements:
+        await conn.exec_driver_sql(statement)
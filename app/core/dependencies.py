@@ -1,7 +1,8 @@
-from typing import Dict, Any
+import hmac
+from typing import Dict, Any, Optional
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.config import TELEGRAM_BOT_TOKEN
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
+from app.core.config import ADMIN_TOKEN, TELEGRAM_BOT_TOKEN
 from app.core.telegram_auth import TelegramAuth
 
 # HTTP Bearer scheme for Swagger UI
@@ -10,6 +11,14 @@ security = HTTPBearer(
     description="Enter your Telegram Web App initData string",
 )
 
+# Header scheme for service/admin endpoints
+admin_token_header = APIKeyHeader(
+    name="X-Admin-Token",
+    scheme_name="Admin Token",
+    description="Service token for /admin endpoints (ADMIN_TOKEN)",
+    auto_error=False,
+)
+
 # Initialize Telegram auth instance
 telegram_auth = TelegramAuth(TELEGRAM_BOT_TOKEN)
 
@@ -46,3 +55,15 @@ async def get_current_user(
             detail=f"Authentication failed: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+async def require_admin(token: Optional[str] = Depends(admin_token_header)) -> None:
+    """
+    Dependency for service endpoints (metrics, maintenance jobs).
+    Requires X-Admin-Token header equal to ADMIN_TOKEN; disabled if ADMIN_TOKEN is unset.
+    """
+    if not ADMIN_TOKEN or not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
@@ -0,0 +1,48 @@
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+MAX_FIELDS = 30
+
+
+def parse_fields(
+    value: Optional[str],
+    schema: Type[BaseModel],
+    required: Iterable[str] = ("id",),
+    allowed: Optional[Iterable[str]] = None,
+) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a sparse fieldset "id,first_name" and validate it against the schema.
+    Returns None when the parameter is absent (full representation).
+    required fields (ключи для клиента, например id) добавляются всегда.
+    """
+    if value is None:
+        return None
+
+    requested = [field.strip() for field in value.split(",") if field.strip()]
+    if not requested:
+        raise HTTPException(status_code=422, detail="fields must not be empty")
+    if len(requested) > MAX_FIELDS:
+        raise HTTPException(
+            status_code=422, detail=f"No more than {MAX_FIELDS} fields per request"
+        )
+
+    known = set(allowed) if allowed is not None else set(schema.model_fields)
+    invalid = [field for field in requested if field not in known]
+    if invalid:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(invalid)}. "
+            f"Available: {', '.join(sorted(known))}",
+        )
+    return tuple(dict.fromkeys([*required, *requested]))
+
+
+def model_columns(model: Any, fields: Iterable[str]) -> list:
+    """ORM columns for a validated fieldset (column-level SELECT)"""
+    return [getattr(model, field) for field in fields]
+
+
+def row_to_dict(row: Any) -> Dict[str, Any]:
+    return dict(row._mapping)
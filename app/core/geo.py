@@ -0,0 +1,98 @@
+import math
+from typing import List, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9  # ~4.8m x 4.8m — с запасом для поиска по ячейкам
+# Символ, который в C-collation больше любого символа алфавита geohash:
+# prefix <= geohash < prefix + "~" — диапазон B-tree для всех строк с префиксом
+GEOHASH_RANGE_END = "~"
+
+
+def encode_geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode coordinates into a geohash string of given precision"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if lon >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def cell_size_degrees(precision: int) -> Tuple[float, float]:
+    """Return (lat_degrees, lon_degrees) size of a geohash cell"""
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2**lat_bits), 360.0 / (2**lon_bits)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def covering_cells(lat: float, lon: float, radius_km: float) -> List[str]:
+    """
+    Geohash prefixes whose cells cover the circle (lat, lon, radius_km).
+
+    Выбираем самую мелкую точность, при которой ячейка не меньше радиуса,
+    и берём центральную ячейку + 8 соседей: круг гарантированно внутри 3x3.
+    """
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lon_deg = cell_size_degrees(candidate)
+        height_km = lat_deg * KM_PER_DEGREE
+        width_km = lon_deg * KM_PER_DEGREE * cos_lat
+        if height_km >= radius_km and width_km >= radius_km:
+            precision = candidate
+            break
+
+    lat_deg, lon_deg = cell_size_degrees(precision)
+    cells = []
+    for d_lat in (-1, 0, 1):
+        for d_lon in (-1, 0, 1):
+            neighbour_lat = min(max(lat + d_lat * lat_deg, -90.0), 90.0)
+            neighbour_lon = (lon + d_lon * lon_deg + 180.0) % 360.0 - 180.0
+            cell = encode_geohash(neighbour_lat, neighbour_lon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
@@ -0,0 +1,88 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+# Ответ зависит от данных, которые могут поменяться в любой момент:
+# клиент хранит копию, но перед использованием обязан сделать conditional GET
+CACHE_REVALIDATE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag from version parts (ids, updated_at, query params)"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = CACHE_REVALIDATE,
+) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since (RFC 9110 13.2.2):
+    If-None-Match wins when both are present.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Слабое сравнение: W/"x" и "x" считаются равными
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP-дата с точностью до секунды
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = CACHE_REVALIDATE,
+) -> Optional[Response]:
+    """
+    Returns a ready 304 response if the client copy is fresh; otherwise sets
+    validator headers on the outgoing response and returns None.
+    """
+    headers = cache_headers(etag, last_modified, cache_control)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.config import IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_TTL
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+StoreKey = Tuple[int, str]
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def to_response(self, replayed: bool) -> Response:
+        headers = dict(self.headers)
+        if replayed:
+            headers[REPLAYED_HEADER] = "true"
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    future: "asyncio.Future[StoredResponse]"
+    expires_at: float = float("inf")
+
+
+class IdempotencyStore:
+    """
+    In-process хранилище ответов по (telegram_id, Idempotency-Key).
+
+    Первый запрос с ключом выполняет обработчик, остальные с тем же ключом:
+    - пока первый выполняется — ждут его future, а не выполняют запрос повторно;
+    - после — получают сохранённый ответ (до ttl секунд).
+    Размер ограничен max_entries (LRU). Ошибки 5xx и исключения не сохраняются:
+    такой запрос можно повторить с тем же ключом.
+    Хранилище своё у каждого воркера.
+    """
+
+    def __init__(
+        self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[StoreKey, _Entry]" = OrderedDict()
+
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+
+    async def run(
+        self,
+        key: StoreKey,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[StoredResponse]],
+    ) -> Tuple[StoredResponse, bool]:
+        """Returns (response, replayed)"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[key]
+            entry = None
+
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with another request",
+                )
+            self._entries.move_to_end(key)
+            if entry.future.done():
+                self.replayed += 1
+            else:
+                self.waited += 1
+            # shield: отмена ожидающего клиента не должна отменять чужой future
+            return await asyncio.shield(entry.future), True
+
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+        self._evict()
+
+        self.executed += 1
+        try:
+            stored = await handler()
+        except BaseException as e:
+            # Ничего не сохраняем: повтор выполнит запрос заново
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            if isinstance(e, asyncio.CancelledError):
+                e = HTTPException(
+                    status_code=409,
+                    detail="Concurrent request with this key was interrupted, retry",
+                )
+            entry.future.set_exception(e)
+            # Ожидающих может не быть — помечаем исключение полученным
+            entry.future.exception()
+            raise
+
+        if stored.status_code >= 500:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        else:
+            entry.expires_at = time.monotonic() + self.ttl
+        entry.future.set_result(stored)
+        return stored, False
+
+    def _evict(self):
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        # Самые давние завершённые; выполняющиеся не трогаем, иначе их дубль
+        # пройдёт мимо ожидания
+        victims = []
+        for key, entry in self._entries.items():
+            if entry.future.done():
+                victims.append(key)
+                if len(victims) == excess:
+                    break
+        for key in victims:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "waited": self.waited,
+        }
+
+
+idempotency_store = IdempotencyStore()
+
+
+async def idempotent(
+    request: Request,
+    telegram_id: int,
+    handler: Callable[[], Awaitable[Any]],
+    response_model: Type[BaseModel],
+    status_code: int = 200,
+    store: IdempotencyStore = idempotency_store,
+) -> Any:
+    """
+    Run a mutating route handler under the Idempotency-Key header.
+    Without the header the handler result is returned as is.
+    HTTPException 4xx are stored and replayed like regular responses.
+    """
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if idempotency_key is None:
+        return await handler()
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=422, detail=f"Invalid {IDEMPOTENCY_HEADER} header"
+        )
+
+    body = await request.body()
+    fingerprint = hashlib.sha256(
+        b"\n".join([request.method.encode(), request.url.path.encode(), body])
+    ).hexdigest()
+
+    async def execute() -> StoredResponse:
+        try:
+            result = await handler()
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code)
+            return StoredResponse(e.status_code, response.body, dict(e.headers or {}))
+        payload = jsonable_encoder(response_model.model_validate(result))
+        return StoredResponse(status_code, JSONResponse(payload).body)
+
+    stored, replayed = await store.run(
+        (telegram_id, idempotency_key), fingerprint, execute
+    )
+    return stored.to_response(replayed)
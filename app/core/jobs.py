@@ -0,0 +1,173 @@
+import logging
+from sqlalchemy import text
+
+from app.core.config import (
+    CLUB_STATS_RECONCILE_INTERVAL,
+    COACH_SLOTS_RESYNC_INTERVAL,
+    SYNC_TOMBSTONE_PRUNE_INTERVAL,
+    USER_ROLES_ARCHIVE_INTERVAL,
+)
+from app.core.database import engine
+from app.core.periodic import PeriodicTask
+from app.crud.archival import archive_user_roles
+from app.crud.club_stats import reconcile_all_club_stats
+from app.crud.sections import resync_coach_slots
+from app.crud.sync import prune_sync_tombstones
+
+logger = logging.getLogger(__name__)
+
+# Ключи advisory lock: периодическую работу выполняет один воркер из всех
+CLUB_STATS_RECONCILE_LOCK = 735001
+USER_ROLES_ARCHIVE_LOCK = 735002
+# Держится всё время жизни активного диспетчера уведомлений (app.core.notifications)
+NOTIFY_DISPATCHER_LOCK = 735003
+COACH_SLOTS_RESYNC_LOCK = 735004
+SYNC_TOMBSTONES_PRUNE_LOCK = 735005
+
+
+async def reconcile_club_stats_job():
+    async with engine.connect() as conn:
+        acquired = await conn.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"),
+            {"key": CLUB_STATS_RECONCILE_LOCK},
+        )
+        await conn.commit()
+        if not acquired:
+            return
+
+        try:
+            clubs = await reconcile_all_club_stats(conn)
+            logger.info("Club stats reconciled for %d clubs", clubs)
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"),
+                {"key": CLUB_STATS_RECONCILE_LOCK},
+            )
+            await conn.commit()
+
+
+club_stats_reconciler = PeriodicTask(
+    "club-stats-reconcile", CLUB_STATS_RECONCILE_INTERVAL, reconcile_club_stats_job
+)
+
+
+async def archive_user_roles_job():
+    async with engine.connect() as conn:
+        acquired = await conn.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"),
+            {"key": USER_ROLES_ARCHIVE_LOCK},
+        )
+        await conn.commit()
+        if not acquired:
+            return
+
+        try:
+            report = await archive_user_roles(conn)
+            if report["archived"]:
+                logger.info(
+                    "Archived %d inactive memberships in %d batches; "
+                    "user_roles %d -> %d bytes, sync_tombstones %d -> %d bytes",
+                    report["archived"],
+                    report["batches"],
+                    _total_bytes(report["before"]["user_roles"]),
+                    _total_bytes(report["after"]["user_roles"]),
+                    _total_bytes(report["before"]["sync_tombstones"]),
+                    _total_bytes(report["after"]["sync_tombstones"]),
+                )
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"),
+                {"key": USER_ROLES_ARCHIVE_LOCK},
+            )
+            await conn.commit()
+
+
+def _total_bytes(sizes) -> int:
+    return sizes["table_bytes"] + sizes["index_bytes"]
+
+
+user_roles_archiver = PeriodicTask(
+    "user-roles-archive", USER_ROLES_ARCHIVE_INTERVAL, archive_user_roles_job
+)
+
+
+async def resync_coach_slots_job(wait: bool = False):
+    """
+    Rebuild coach_schedule_slots from section schedules (see resync_coach_slots).
+    wait=True — на старте: дождаться воркера, который пересобирает сейчас;
+    периодический запуск в этом случае просто пропускается.
+    """
+    async with engine.begin() as conn:
+        if wait:
+            await conn.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"),
+                {"key": COACH_SLOTS_RESYNC_LOCK},
+            )
+        elif not await conn.scalar(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            {"key": COACH_SLOTS_RESYNC_LOCK},
+        ):
+            return
+        report = await resync_coach_slots(conn)
+
+    for conflict in report["conflicts"]:
+        logger.warning(
+            "Coach %s: section %s overlaps section %s of club %s (%s - %s)",
+            conflict["coach_id"],
+            conflict["section_id"],
+            conflict["other_section_id"],
+            conflict["other_club_id"],
+            conflict["start"],
+            conflict["end"],
+        )
+    for invalid in report["invalid"]:
+        logger.warning(
+            "Section %s has an invalid schedule: %s",
+            invalid["section_id"],
+            invalid["error"],
+        )
+    if report["rebuilt"] or report["cleared"] or report["unslotted"]:
+        logger.info(
+            "Coach slots resynced: %d sections rebuilt, %d cleared, "
+            "%d left without slots %s",
+            report["rebuilt"],
+            report["cleared"],
+            len(report["unslotted"]),
+            report["unslotted"][:20],
+        )
+
+
+coach_slots_resyncer = PeriodicTask(
+    "coach-slots-resync", COACH_SLOTS_RESYNC_INTERVAL, resync_coach_slots_job
+)
+
+
+async def prune_sync_tombstones_job():
+    async with engine.connect() as conn:
+        acquired = await conn.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"),
+            {"key": SYNC_TOMBSTONES_PRUNE_LOCK},
+        )
+        await conn.commit()
+        if not acquired:
+            return
+
+        try:
+            report = await prune_sync_tombstones(conn)
+            if report["pruned"]:
+                logger.info(
+                    "Pruned %d sync tombstones; sync horizon is now xid %d",
+                    report["pruned"],
+                    report["horizon"],
+                )
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"),
+                {"key": SYNC_TOMBSTONES_PRUNE_LOCK},
+            )
+            await conn.commit()
+
+
+sync_tombstones_pruner = PeriodicTask(
+    "sync-tombstones-prune", SYNC_TOMBSTONE_PRUNE_INTERVAL, prune_sync_tombstones_job
+)
@@ -1,3 +1,6 @@
+import asyncio
+import time
+from typing import Optional
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -22,3 +25,54 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     )
     response.headers["Retry-After"] = str(getattr(exc, "retry_after", 60))
     return response
+
+
+class TokenBucket:
+    """
+    Простой token bucket: rate токенов в секунду, не больше capacity подряд.
+    Используется для исходящих лимитов (Telegram Bot API, логи), не для входящих запросов.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens without waiting; False if not enough"""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until tokens are available (fair across concurrent waiters)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for given seconds (e.g. after HTTP 429)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        # Токены копятся только после паузы, иначе сразу за ней — всплеск
+        self.tokens = 0
+        self.updated = self.paused_until
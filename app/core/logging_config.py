@@ -0,0 +1,211 @@
+import json
+import logging
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO, Tuple
+
+from app.core.config import (
+    DB_ECHO,
+    LOG_JSON,
+    LOG_LEVEL,
+    LOG_QUEUE_SIZE,
+    LOG_RATE_LIMIT_MAX_KEYS,
+    LOG_RATE_LIMIT_PER_SECOND,
+    LOG_RATE_LIMITS,
+)
+from app.core.limits import TokenBucket
+
+# Атрибуты LogRecord, которые не считаются пользовательскими extra-полями
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message + extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничение частоты одинаковых сообщений: не больше rate строк в секунду
+    на пару (logger, шаблон msg). Поэтому логировать нужно с %-аргументами,
+    а не f-строками — иначе каждое сообщение получает свой ключ.
+    Первая пропущенная после подавления строка получает поле suppressed
+    с числом выброшенных. Ключей не больше max_keys: f-строки (в том числе
+    в сторонних библиотеках) вытесняют давно не встречавшиеся ключи (LRU),
+    а не растят словари без предела.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        sample_rates: Optional[Dict[str, float]] = None,
+        max_keys: int = LOG_RATE_LIMIT_MAX_KEYS,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.sample_rates = sample_rates or {}
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._suppressed: Dict[Tuple[str, str], int] = {}
+        # filter() зовётся из любого логирующего потока, а не только из loop
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.evicted = 0
+
+    @property
+    def keys(self) -> int:
+        return len(self._buckets)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+
+        key = (record.name, str(record.msg))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate = self.sample_rates.get(record.name, self.rate)
+                bucket = self._buckets[key] = TokenBucket(rate)
+                if len(self._buckets) > self.max_keys:
+                    evicted, _ = self._buckets.popitem(last=False)
+                    self._suppressed.pop(evicted, None)
+                    self.evicted += 1
+            else:
+                self._buckets.move_to_end(key)
+
+            if not bucket.try_acquire():
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                self.dropped += 1
+                return False
+
+            suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the event loop: drops when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Стандартный prepare() форматирует сообщение в вызывающем потоке;
+        # здесь форматирование целиком остаётся потоку QueueListener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """Parse "sqlalchemy.engine=5,app.core.telegram_auth=2" into {logger: rate}"""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+# uvicorn настраивает свои логгеры до старта приложения: StreamHandler на
+# uvicorn и uvicorn.access, propagate=False — мимо очереди, синхронно в loop
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+# В access-логе у всех запросов один шаблон msg: общий лимит оставил бы
+# 10 строк в секунду на весь трафик. LOG_RATE_LIMITS переопределяет
+DEFAULT_RATE_LIMITS = {"uvicorn.access": 1000.0}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_rate_filter: Optional[RateLimitFilter] = None
+
+
+def setup_logging(stream: Optional[TextIO] = None):
+    """
+    Route all logging through a bounded queue to a background thread.
+    On the event loop a record costs a rate-limit check and a put_nowait;
+    formatting, JSON serialization and stream I/O happen in the listener thread.
+    stream defaults to stdout.
+    """
+    global _listener, _queue_handler, _rate_filter
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter()
+        if LOG_JSON
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    _rate_filter = RateLimitFilter(
+        LOG_RATE_LIMIT_PER_SECOND,
+        {**DEFAULT_RATE_LIMITS, **parse_rate_limits(LOG_RATE_LIMITS)},
+    )
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(_rate_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for handler in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = True
+
+    # SQL-эхо идёт через ту же очередь, а не через синхронный echo-хендлер движка
+    if DB_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> Dict[str, int]:
+    return {
+        "rate_limited": _rate_filter.dropped if _rate_filter else 0,
+        "rate_limit_keys": _rate_filter.keys if _rate_filter else 0,
+        "rate_limit_evicted": _rate_filter.evicted if _rate_filter else 0,
+        "queue_full_dropped": _queue_handler.dropped if _queue_handler else 0,
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+    }
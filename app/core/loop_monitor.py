@@ -0,0 +1,226 @@
+"""
+Монитор задержки event loop.
+
+Задача-тикер спит interval секунд и меряет, насколько позже она проснулась:
+это и есть lag — сколько ждал бы любой готовый к работе запрос. Значения
+копятся в гистограмме. Поток-сторож видит, что тикер давно не отмечался,
+пока loop ещё заблокирован, и снимает стек потока loop в этот момент —
+так в отчёт попадает сам блокирующий код и маршрут запроса, который его
+выполняет (LoopMonitorMiddleware ведёт реестр запросов по задачам).
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import (
+    LOOP_LAG_THRESHOLD,
+    LOOP_MONITOR_INTERVAL,
+    LOOP_MONITOR_MAX_STALLS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограммы, секунды (последняя корзина — +Inf)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MAX_STACK_FRAMES = 40
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus-style le buckets)"""
+
+    def __init__(self, buckets: Sequence[float] = LAG_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, seen = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[f"{bound * 1000:g}"] = seen
+        cumulative["+Inf"] = self.count
+        return {
+            "buckets_ms": cumulative,
+            "count": self.count,
+            "sum_ms": round(self.sum * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "p50_le_ms": _ms(self.quantile(0.5)),
+            "p99_le_ms": _ms(self.quantile(0.99)),
+        }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 1000, 3)
+
+
+def _format_stack(frame) -> List[str]:
+    return [
+        f"{entry.filename}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame)[-MAX_STACK_FRAMES:]
+    ]
+
+
+def _route_of(scope: Optional[Scope]) -> Optional[str]:
+    if scope is None:
+        return None
+    # FastAPI кладёт найденный маршрут в scope["route"] — шаблон пути
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        threshold: float = LOOP_LAG_THRESHOLD,
+        max_stalls: int = LOOP_MONITOR_MAX_STALLS,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.histogram = Histogram()
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=max_stalls)
+        self.stalls_by_route: Counter = Counter()
+
+        # task -> scope запроса, который она обслуживает
+        self.requests: Dict[asyncio.Task, Scope] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id = 0
+        self._heartbeat = 0.0
+        self._open_stall: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - started - self.interval, 0.0)
+            self._heartbeat = time.monotonic()
+            self.histogram.observe(lag)
+
+            stall = self._open_stall
+            if stall is not None:
+                # Сторож снял стек во время блокировки; теперь известна длительность
+                stall["lag_ms"] = round(lag * 1000, 3)
+                self._open_stall = None
+                logger.warning(
+                    "Event loop blocked for %.0f ms in %s at %s",
+                    lag * 1000,
+                    stall["route"] or "<no request>",
+                    stall["stack"][-1] if stall["stack"] else "?",
+                )
+
+    def _watch(self):
+        # Тикер отмечается раз в interval: дольше interval + threshold — loop занят
+        while not self._stop.wait(max(self.threshold / 2, 0.01)):
+            blocked_for = time.monotonic() - self._heartbeat - self.interval
+            if blocked_for < self.threshold or self._open_stall is not None:
+                continue
+            self._capture(blocked_for)
+
+    def _capture(self, blocked_for: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        task = asyncio.current_task(self._loop) if self._loop else None
+        route = _route_of(self.requests.get(task)) if task else None
+        stall = {
+            "detected_at": time.time(),
+            "blocked_ms_at_capture": round(blocked_for * 1000, 3),
+            "lag_ms": None,
+            "route": route,
+            "task": task.get_name() if task else None,
+            "stack": _format_stack(frame) if frame is not None else [],
+        }
+        self.stalls.append(stall)
+        self.stalls_by_route[route or "<no request>"] += 1
+        self._open_stall = stall
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "lag": self.histogram.snapshot(),
+            "in_flight_requests": len(self.requests),
+            "stalls_by_route": dict(self.stalls_by_route.most_common()),
+            "recent_stalls": list(self.stalls),
+        }
+
+
+loop_monitor = LoopLagMonitor()
+
+
+class LoopMonitorMiddleware:
+    """Registers the task serving each HTTP request for stall attribution"""
+
+    def __init__(self, app: ASGIApp, monitor: LoopLagMonitor = loop_monitor):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        task = asyncio.current_task()
+        if scope["type"] != "http" or task is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.monitor.requests[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.requests.pop(task, None)
@@ -0,0 +1,463 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+import asyncpg
+import httpx
+from sqlalchemy import func, update
+from sqlalchemy.future import select
+
+from app.core.config import (
+    NOTIFY_BATCH_SIZE,
+    NOTIFY_LEADER_CHECK_INTERVAL,
+    NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_POLL_INTERVAL,
+    NOTIFY_RATE_PER_SECOND,
+    NOTIFY_SENDERS,
+    TELEGRAM_API_URL,
+    TELEGRAM_BOT_TOKEN,
+)
+from app.core.database import async_session, engine
+from app.core.jobs import NOTIFY_DISPATCHER_LOCK
+from app.core.limits import TokenBucket
+from app.models.notifications import Notification, NotificationStatus
+from app.models.users import User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "ru"
+
+# Шаблоны по kind и языку; поля подставляются из payload
+TEMPLATES: Dict[str, Dict[str, str]] = {
+    "class_reminder": {
+        "ru": "Напоминание: занятие «{section}» начнётся в {time}.",
+        "kz": "Еске салу: «{section}» сабағы {time} басталады.",
+        "en": "Reminder: the «{section}» class starts at {time}.",
+    },
+    "booking_confirmed": {
+        "ru": "Вы записаны на занятие «{section}».",
+        "kz": "Сіз «{section}» сабағына жазылдыңыз.",
+        "en": "You are booked for the «{section}» class.",
+    },
+}
+
+# Строки в статусе sending дольше этого — воркер упал посреди отправки
+STALE_CLAIM_AFTER = timedelta(minutes=5)
+RELEASE_STALE_EVERY_SECONDS = 60
+RETRY_BASE_DELAY_SECONDS = 5
+
+
+@dataclass
+class OutgoingMessage:
+    id: int
+    telegram_id: int
+    text: str
+    attempts: int
+
+
+def render_group(kind: str, language: str, payloads: List[Dict[str, Any]]) -> List[str]:
+    """Render one (kind, language) group: the template is resolved once per group"""
+    templates = TEMPLATES.get(kind)
+    if templates is None:
+        # Неизвестный kind — payload должен содержать готовый text
+        return [str(payload.get("text", "")) for payload in payloads]
+
+    template = templates.get(language) or templates[DEFAULT_LANGUAGE]
+    return [template.format_map(defaultdict(str, payload)) for payload in payloads]
+
+
+class NotificationDispatcher:
+    """
+    Фоновая рассылка из notification_outbox.
+
+    Claimer забирает пачки pending-строк через FOR UPDATE SKIP LOCKED
+    (несколько воркеров не пересекаются), рендерит их группами по языку
+    и кладёт в очередь; пул sender-задач отправляет сообщения в Bot API
+    под общим token bucket. Статусы записываются пачками.
+
+    Лимит Bot API — на бота, а token bucket — на процесс, поэтому
+    рассылку ведёт один воркер: тот, кто держит session-level advisory
+    lock на отдельном соединении (вне пула). Остальные стоят в резерве и
+    раз в leader_check_interval пробуют замок; упавший или потерявший
+    соединение лидер отпускает его, и рассылку подхватывает другой воркер.
+    Пока обрыв не замечен (до leader_check_interval), два лидера могут
+    работать одновременно — лимит кратковременно удваивается.
+    """
+
+    def __init__(
+        self,
+        api_url: str = TELEGRAM_API_URL,
+        bot_token: Optional[str] = TELEGRAM_BOT_TOKEN,
+        rate_per_second: float = NOTIFY_RATE_PER_SECOND,
+        batch_size: int = NOTIFY_BATCH_SIZE,
+        senders: int = NOTIFY_SENDERS,
+        poll_interval: float = NOTIFY_POLL_INTERVAL,
+        max_attempts: int = NOTIFY_MAX_ATTEMPTS,
+        leader_check_interval: float = NOTIFY_LEADER_CHECK_INTERVAL,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.bot_token = bot_token
+        self.bucket = TokenBucket(rate_per_second)
+        self.batch_size = batch_size
+        self.senders = senders
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.leader_check_interval = leader_check_interval
+
+        self._queue: "asyncio.Queue[OutgoingMessage]" = asyncio.Queue(
+            maxsize=batch_size * 2
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._election: Optional[asyncio.Task] = None
+        self._lock_conn: Optional[asyncpg.Connection] = None
+        self._claimer: Optional[asyncio.Task] = None
+        self._sender_tasks: List[asyncio.Task] = []
+        self._last_stale_release = 0.0
+
+        # Результаты отправки, записываются в БД пачкой на каждом цикле claimer
+        self._sent: List[int] = []
+        self._failed: List[Tuple[int, str]] = []
+        self._retries: List[Tuple[int, float, str]] = []
+
+        self.leader = False
+        self.claimed = 0
+        self.sent = 0
+        self.failed = 0
+        self.skipped = 0
+        self.retried = 0
+        self._sent_times: deque = deque(maxlen=10000)
+
+    async def start(self):
+        self._client = httpx.AsyncClient(
+            base_url=f"{self.api_url}/bot{self.bot_token}", timeout=10.0
+        )
+        self._election = asyncio.create_task(
+            self._election_loop(), name="notify-election"
+        )
+
+    async def stop(self, timeout: float = 5.0):
+        if self._election:
+            self._election.cancel()
+            await asyncio.gather(self._election, return_exceptions=True)
+            self._election = None
+        await self._stop_sending(timeout)
+        await self._release_leadership()
+
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    # ---------- leader election ----------
+    async def _election_loop(self):
+        dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while True:
+            try:
+                self._lock_conn = await asyncpg.connect(dsn)
+                while not await self._lock_conn.fetchval(
+                    "SELECT pg_try_advisory_lock($1)", NOTIFY_DISPATCHER_LOCK
+                ):
+                    await asyncio.sleep(self.leader_check_interval)
+
+                self.leader = True
+                logger.info("Notification dispatcher is active on this worker")
+                self._start_sending()
+                while True:
+                    await asyncio.sleep(self.leader_check_interval)
+                    # Замок живёт, пока живо соединение: обрыв — уступаем рассылку
+                    await self._lock_conn.fetchval(
+                        "SELECT 1", timeout=self.leader_check_interval
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification dispatcher lock connection failed")
+            await self._stop_sending()
+            await self._release_leadership()
+            await asyncio.sleep(self.leader_check_interval)
+
+    async def _release_leadership(self):
+        self.leader = False
+        conn, self._lock_conn = self._lock_conn, None
+        if conn is None or conn.is_closed():
+            return
+        try:
+            # Закрытие сессии снимает advisory lock
+            await conn.close(timeout=self.leader_check_interval)
+        except Exception:
+            conn.terminate()
+
+    def _start_sending(self):
+        # Прежний лидер мог только что израсходовать лимит: начинаем с пустого bucket
+        self.bucket.pause(0)
+        self._claimer = asyncio.create_task(self._claim_loop(), name="notify-claimer")
+        self._sender_tasks = [
+            asyncio.create_task(self._sender_loop(), name=f"notify-sender-{index}")
+            for index in range(self.senders)
+        ]
+
+    async def _stop_sending(self, timeout: float = 5.0):
+        if self._claimer:
+            self._claimer.cancel()
+            await asyncio.gather(self._claimer, return_exceptions=True)
+            self._claimer = None
+
+        # Даём отправить уже взятое, остальное возвращаем в pending
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for task in self._sender_tasks:
+            task.cancel()
+        await asyncio.gather(*self._sender_tasks, return_exceptions=True)
+        self._sender_tasks = []
+
+        while not self._queue.empty():
+            message = self._queue.get_nowait()
+            self._queue.task_done()
+            self._retries.append((message.id, 0, "released on shutdown"))
+        try:
+            await self._flush_results()
+        except Exception:
+            # БД недоступна: строки в sending вернёт в pending новый лидер
+            logger.exception("Failed to store notification results on stop")
+
+    # ---------- claimer ----------
+    async def _claim_loop(self):
+        while True:
+            try:
+                await self._flush_results()
+                await self._release_stale_claims()
+                claimed = 0
+                if self._queue.qsize() < self.batch_size:
+                    claimed = await self._claim_batch()
+                if claimed < self.batch_size:
+                    await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification claim loop error")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim_batch(self) -> int:
+        candidates = (
+            select(Notification.id)
+            .where(
+                Notification.status == NotificationStatus.pending.value,
+                Notification.not_before <= func.now(),
+            )
+            .order_by(Notification.not_before, Notification.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(Notification)
+            .where(Notification.id.in_(candidates), User.id == Notification.user_id)
+            .values(
+                status=NotificationStatus.sending.value,
+                claimed_at=func.now(),
+                attempts=Notification.attempts + 1,
+            )
+            .returning(
+                Notification.id,
+                Notification.telegram_id,
+                Notification.kind,
+                Notification.payload,
+                Notification.language,
+                Notification.attempts,
+                User.preferences["notifications"],
+            )
+        )
+
+        async with async_session() as session:
+            result = await session.execute(claim)
+            rows = result.all()
+
+            # Пользователь мог выключить уведомления после постановки в очередь
+            skipped = [row.id for row in rows if row[-1] is False]
+            if skipped:
+                await session.execute(
+                    update(Notification),
+                    [
+                        {
+                            "id": notification_id,
+                            "status": NotificationStatus.skipped.value,
+                        }
+                        for notification_id in skipped
+                    ],
+                )
+            await session.commit()
+
+        self.claimed += len(rows)
+        self.skipped += len(skipped)
+
+        deliverable = sorted(
+            (row for row in rows if row[-1] is not False),
+            key=lambda row: (row.kind, row.language or DEFAULT_LANGUAGE),
+        )
+        for (kind, language), group in groupby(
+            deliverable, key=lambda row: (row.kind, row.language or DEFAULT_LANGUAGE)
+        ):
+            group = list(group)
+            texts = render_group(kind, language, [row.payload or {} for row in group])
+            for row, text in zip(group, texts):
+                await self._queue.put(
+                    OutgoingMessage(row.id, row.telegram_id, text, row.attempts)
+                )
+        return len(rows)
+
+    async def _release_stale_claims(self):
+        now = time.monotonic()
+        if now - self._last_stale_release < RELEASE_STALE_EVERY_SECONDS:
+            return
+        self._last_stale_release = now
+
+        async with async_session() as session:
+            await session.execute(
+                update(Notification)
+                .where(
+                    Notification.status == NotificationStatus.sending.value,
+                    Notification.claimed_at
+                    < datetime.now(timezone.utc) - STALE_CLAIM_AFTER,
+                )
+                .values(status=NotificationStatus.pending.value)
+            )
+            await session.commit()
+
+    async def _flush_results(self):
+        if not (self._sent or self._failed or self._retries):
+            return
+
+        now = datetime.now(timezone.utc)
+        sent, self._sent = self._sent, []
+        failed, self._failed = self._failed, []
+        retries, self._retries = self._retries, []
+
+        rows = [
+            {
+                "id": notification_id,
+                "status": NotificationStatus.sent.value,
+                "sent_at": now,
+            }
+            for notification_id in sent
+        ]
+        rows.extend(
+            {
+                "id": notification_id,
+                "status": NotificationStatus.failed.value,
+                "last_error": error[:1000],
+            }
+            for notification_id, error in failed
+        )
+        rows.extend(
+            {
+                "id": notification_id,
+                "status": NotificationStatus.pending.value,
+                "not_before": now + timedelta(seconds=delay),
+                "last_error": error[:1000],
+            }
+            for notification_id, delay, error in retries
+        )
+
+        try:
+            async with async_session() as session:
+                await session.execute(update(Notification), rows)
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to store %d notification results", len(rows))
+            self._sent[:0] = sent
+            self._failed[:0] = failed
+            self._retries[:0] = retries
+
+    # ---------- senders ----------
+    async def _sender_loop(self):
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._send(message)
+            except asyncio.CancelledError:
+                self._retries.append((message.id, 0, "released on shutdown"))
+                raise
+            except Exception as e:
+                logger.exception("Notification %s send error", message.id)
+                self._retry(message, RETRY_BASE_DELAY_SECONDS, str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, message: OutgoingMessage):
+        await self.bucket.acquire()
+        try:
+            response = await self._client.post(
+                "/sendMessage",
+                json={"chat_id": message.telegram_id, "text": message.text},
+            )
+        except httpx.HTTPError as e:
+            self._retry(message, RETRY_BASE_DELAY_SECONDS * message.attempts, str(e))
+            return
+
+        if response.status_code == 200:
+            self._sent.append(message.id)
+            self.sent += 1
+            self._sent_times.append(time.monotonic())
+            return
+
+        description = self._error_description(response)
+        if response.status_code == 429:
+            retry_after = self._retry_after(response)
+            # Лимит общий для бота — притормаживаем всех отправителей
+            self.bucket.pause(retry_after)
+            self._retry(message, retry_after, description)
+        elif response.status_code >= 500:
+            self._retry(
+                message, RETRY_BASE_DELAY_SECONDS * message.attempts, description
+            )
+        else:
+            # 400/403: чат не найден, бот заблокирован — повтор не поможет
+            self._failed.append((message.id, description))
+            self.failed += 1
+
+    def _retry(self, message: OutgoingMessage, delay: float, error: str):
+        if message.attempts >= self.max_attempts:
+            self._failed.append((message.id, error))
+            self.failed += 1
+        else:
+            self._retries.append((message.id, delay, error))
+            self.retried += 1
+
+    @staticmethod
+    def _error_description(response: httpx.Response) -> str:
+        try:
+            return f"{response.status_code}: {response.json().get('description', '')}"
+        except ValueError:
+            return f"{response.status_code}: {response.text[:200]}"
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json().get("parameters", {}).get("retry_after", 1))
+        except (ValueError, AttributeError):
+            return 1.0
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        sent_last_minute = sum(1 for sent_at in self._sent_times if now - sent_at <= 60)
+        return {
+            "claimed": self.claimed,
+            "sent": self.sent,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retried": self.retried,
+            "leader": self.leader,
+            "queued": self._queue.qsize(),
+            "sent_per_second_1m": round(sent_last_minute / 60, 2),
+            "rate_limit_per_second": self.bucket.rate,
+        }
+
+
+notification_dispatcher = NotificationDispatcher()
@@ -0,0 +1,73 @@
+"""
+Вынос тяжёлой синхронной работы из event loop.
+
+run_in_thread — для кода, который отпускает GIL (сжатие, хэширование
+больших данных, файловый ввод-вывод) или просто долго блокирует;
+run_in_process — для чистого CPU на Python (экспорт CSV, разворачивание
+расписаний), которому поток не поможет из-за GIL. Функция для процесса
+должна быть объявлена на уровне модуля, аргументы и результат — picklable.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.core.config import OFFLOAD_PROCESS_WORKERS, OFFLOAD_THREAD_WORKERS
+
+T = TypeVar("T")
+
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_stats = {"thread_calls": 0, "process_calls": 0}
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=OFFLOAD_THREAD_WORKERS, thread_name_prefix="offload"
+        )
+    return _thread_pool
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    # Создаётся при первом вызове: воркеры без тяжёлых задач не держат процессы
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=OFFLOAD_PROCESS_WORKERS)
+    return _process_pool
+
+
+async def run_in_thread(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run fn(*args, **kwargs) in the bounded offload thread pool"""
+    _stats["thread_calls"] += 1
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_thread_pool(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+async def run_in_process(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a module-level fn in the process pool (CPU-bound pure Python)"""
+    _stats["process_calls"] += 1
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_process_pool(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+async def shutdown_pools():
+    """Wait for queued work to finish (shutdown itself blocks, so in a thread)"""
+    global _thread_pool, _process_pool
+    pools = [pool for pool in (_thread_pool, _process_pool) if pool is not None]
+    _thread_pool = _process_pool = None
+    for pool in pools:
+        await asyncio.to_thread(pool.shutdown, wait=True)
+
+
+def offload_stats() -> Dict[str, Any]:
+    return {
+        **_stats,
+        "thread_workers": OFFLOAD_THREAD_WORKERS,
+        "process_workers": OFFLOAD_PROCESS_WORKERS,
+        "process_pool_started": _process_pool is not None,
+    }
@@ -0,0 +1,52 @@
+from datetime import date, datetime, timezone
+from typing import Iterable, Set
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _utc_literal(value: date) -> str:
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc).isoformat()
+
+
+async def ensure_range_partition(
+    conn: AsyncConnection, table: str, suffix: str, start: date, end: date
+):
+    """
+    CREATE TABLE IF NOT EXISTS <table>_<suffix> PARTITION OF <table>
+    FOR VALUES FROM (start) TO (end).
+    Имена таблиц — только внутренние константы, не пользовательский ввод.
+    """
+    partition = f"{table}_{suffix}"
+    # Несколько воркеров могут создавать одну партицию одновременно
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": partition}
+    )
+    await conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{_utc_literal(start)}') TO ('{_utc_literal(end)}')"
+        )
+    )
+
+
+async def ensure_monthly_partitions(
+    conn: AsyncConnection, table: str, months: Iterable[date]
+) -> Set[date]:
+    """Create monthly partitions for given months; returns their first days"""
+    created = set()
+    for month in sorted({month_start(value) for value in months}):
+        await ensure_range_partition(
+            conn, table, f"{month:%Y_%m}", month, next_month(month)
+        )
+        created.add(month)
+    return created
@@ -0,0 +1,49 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Фоновая задача воркера: вызывает job каждые interval секунд.
+    Ошибки логируются и не останавливают цикл.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        job: Callable[[], Awaitable[None]],
+        initial_delay: Optional[float] = None,
+    ):
+        self.name = name
+        self.interval = interval
+        self.job = job
+        self.initial_delay = interval if initial_delay is None else initial_delay
+        self.runs = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        await asyncio.sleep(self.initial_delay)
+        while True:
+            try:
+                await self.job()
+                self.runs += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.failures += 1
+                logger.exception("Periodic task %s failed", self.name)
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,367 @@
+"""
+Сэмплирующий профайлер отдельных запросов.
+
+Запрос профилируется, если пришёл с подписанным заголовком X-Profile
+(выдаётся POST /admin/profiler/token, нужен PROFILER_SECRET) или попал в
+долю sample_rate, включённую через POST /admin/profiler. Пока профайлер
+выключен и PROFILER_SECRET не задан, middleware только проверяет один флаг:
+нет ни потока-сэмплера, ни разбора заголовков.
+
+Поток-сэмплер живёт, только пока есть профилируемые запросы. Каждые
+interval секунд он берёт стек задачи запроса: если задача сейчас
+выполняется — реальный стек потока event loop (CPU: разбор initData,
+валидация Pydantic, гидратация ORM), если ждёт — цепочку await корутин
+с листом "(waiting)" (БД, сеть). Готовые профили хранятся в кольцевом
+буфере и отдаются в collapsed-формате или в JSON для speedscope.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    PROFILER_INTERVAL,
+    PROFILER_MAX_ACTIVE,
+    PROFILER_MAX_PROFILES,
+    PROFILER_SECRET,
+)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+MAX_TOKEN_TTL = 24 * 60 * 60
+WAITING_FRAME = ("(waiting)", "", 0)
+
+# (function, file, first line) — кадры функции агрегируются вместе
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+
+def sign_token(secret: str, expires_at: int) -> str:
+    digest = hmac.new(secret.encode(), str(expires_at).encode(), hashlib.sha256)
+    return f"{expires_at}.{digest.hexdigest()}"
+
+
+def verify_token(secret: str, token: str, now: Optional[float] = None) -> bool:
+    expires_at, _, _ = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < (now or time.time()):
+        return False
+    return hmac.compare_digest(token, sign_token(secret, int(expires_at)))
+
+
+def _frame_key(code) -> Frame:
+    filename = code.co_filename
+    # Короткий путь: от пакета app/ или site-packages/
+    for marker in (f"{os.sep}site-packages{os.sep}", f"{os.sep}app{os.sep}"):
+        index = filename.rfind(marker)
+        if index != -1:
+            filename = filename[index + 1 :]
+            break
+    return (
+        getattr(code, "co_qualname", code.co_name),
+        filename,
+        code.co_firstlineno,
+    )
+
+
+def _coroutine_frames(coro) -> List[Any]:
+    """Frames of a suspended await chain, outermost first"""
+    frames = []
+    while coro is not None:
+        frame = (
+            getattr(coro, "cr_frame", None)
+            or getattr(coro, "gi_frame", None)
+            or getattr(coro, "ag_frame", None)
+        )
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = (
+            getattr(coro, "cr_await", None)
+            or getattr(coro, "gi_yieldfrom", None)
+            or getattr(coro, "ag_await", None)
+        )
+    return frames
+
+
+def _thread_frames(frame) -> List[Any]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+@dataclass
+class RequestProfile:
+    id: int
+    method: str
+    path: str
+    reason: str
+    interval: float
+    started_at: float = field(default_factory=time.time)
+    duration: float = 0.0
+    status: Optional[int] = None
+    samples: Counter = field(default_factory=Counter)
+
+    # Только пока запрос выполняется
+    task: Optional[asyncio.Task] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    thread_id: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": sum(self.samples.values()),
+            "interval_ms": self.interval * 1000,
+        }
+
+
+class RequestProfiler:
+    """Registry of profiled requests, the sampler thread and the ring buffer"""
+
+    def __init__(
+        self,
+        secret: Optional[str] = PROFILER_SECRET,
+        interval: float = PROFILER_INTERVAL,
+        max_profiles: int = PROFILER_MAX_PROFILES,
+        max_active: int = PROFILER_MAX_ACTIVE,
+    ):
+        self.secret = secret
+        self.interval = interval
+        self.max_active = max_active
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.path_prefix: Optional[str] = None
+
+        self.profiles: Deque[RequestProfile] = deque(maxlen=max_profiles)
+        self._active: Dict[int, RequestProfile] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Кадр ProfilerMiddleware.__call__ — всё, что выше него, отрезается
+        self._root_code = None
+
+        self.skipped_busy = 0
+
+    @property
+    def armed(self) -> bool:
+        """False means the middleware does nothing but check this flag"""
+        return self.enabled or self.secret is not None
+
+    def configure(
+        self, enabled: bool, sample_rate: float, path_prefix: Optional[str] = None
+    ):
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.path_prefix = path_prefix or None
+        self.enabled = enabled and self.sample_rate > 0
+
+    def issue_token(self, ttl: int) -> Dict[str, Any]:
+        expires_at = int(time.time()) + min(max(ttl, 1), MAX_TOKEN_TTL)
+        return {
+            "header": "X-Profile",
+            "value": sign_token(self.secret, expires_at),
+            "expires_at": expires_at,
+        }
+
+    def select(self, scope: Scope) -> Optional[str]:
+        """Why this request should be profiled ("header"/"sampled"), or None"""
+        if self.secret is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    if verify_token(self.secret, value.decode("latin-1")):
+                        return "header"
+                    break
+        if self.enabled and random.random() < self.sample_rate:
+            if self.path_prefix is None or scope["path"].startswith(self.path_prefix):
+                return "sampled"
+        return None
+
+    def begin(self, scope: Scope, reason: str) -> Optional[RequestProfile]:
+        profile = RequestProfile(
+            id=next(self._ids),
+            method=scope["method"],
+            path=scope["path"],
+            reason=reason,
+            interval=self.interval,
+            task=asyncio.current_task(),
+            loop=asyncio.get_running_loop(),
+            thread_id=threading.get_ident(),
+        )
+        with self._lock:
+            if len(self._active) >= self.max_active:
+                self.skipped_busy += 1
+                return None
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sample_loop, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+        return profile
+
+    def end(self, profile: RequestProfile):
+        with self._lock:
+            self._active.pop(profile.id, None)
+        profile.duration = time.time() - profile.started_at
+        profile.task = profile.loop = None
+        self.profiles.append(profile)
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._thread = None
+                    return
+            thread_frames = sys._current_frames()
+            stacks = [
+                (profile, self._sample(profile, thread_frames)) for profile in active
+            ]
+            with self._lock:
+                # end() мог уже отдать профиль в буфер: его samples читает loop
+                for profile, stack in stacks:
+                    if stack and profile.id in self._active:
+                        profile.samples[stack] += 1
+
+    def _sample(self, profile: RequestProfile, thread_frames: Dict[int, Any]) -> Stack:
+        task = profile.task
+        if task is None or task.done():
+            return ()
+        if asyncio.current_task(profile.loop) is task:
+            frames = _thread_frames(thread_frames.get(profile.thread_id))
+            leaf: Tuple[Frame, ...] = ()
+        else:
+            frames = _coroutine_frames(task.get_coro())
+            leaf = (WAITING_FRAME,)
+
+        codes = [frame.f_code for frame in frames]
+        if self._root_code is not None and self._root_code in codes:
+            codes = codes[codes.index(self._root_code) + 1 :]
+        return tuple(_frame_key(code) for code in codes) + leaf
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "path_prefix": self.path_prefix,
+            "signed_header": self.secret is not None,
+            "interval_ms": self.interval * 1000,
+            "active": len(self._active),
+            "skipped_busy": self.skipped_busy,
+            "stored": len(self.profiles),
+            "capacity": self.profiles.maxlen,
+        }
+
+
+def _merge(profiles: Iterable[RequestProfile]) -> Counter:
+    merged: Counter = Counter()
+    for profile in profiles:
+        merged.update(profile.samples)
+    return merged
+
+
+def to_collapsed(profiles: Iterable[RequestProfile]) -> str:
+    """Brendan Gregg collapsed stacks: "frame;frame;frame count" per line"""
+    lines = []
+    for stack, count in sorted(_merge(profiles).items()):
+        frames = ";".join(
+            f"{name} ({filename}:{line})" if filename else name
+            for name, filename, line in stack
+        )
+        lines.append(f"{frames} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(profiles: List[RequestProfile], name: str) -> Dict[str, Any]:
+    """speedscope.app file format: one sampled profile weighted in milliseconds"""
+    frame_index: Dict[Frame, int] = {}
+    samples, weights = [], []
+    for profile in profiles:
+        for stack, count in profile.samples.items():
+            samples.append(
+                [frame_index.setdefault(frame, len(frame_index)) for frame in stack]
+            )
+            weights.append(round(count * profile.interval * 1000, 3))
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "training-api",
+        "activeProfileIndex": 0,
+        "shared": {
+            "frames": [
+                {"name": frame_name, "file": filename, "line": line}
+                for frame_name, filename, line in frame_index
+            ]
+        },
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+request_profiler = RequestProfiler()
+
+
+class ProfilerMiddleware:
+    """
+    ASGI-middleware профайлера. Ставится внешним, чтобы в профиль попали
+    остальные middleware (сжатие). Профилированный ответ получает
+    заголовок X-Profile-Id — по нему профиль ищется в /admin/profiler.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler = request_profiler):
+        self.app = app
+        self.profiler = profiler
+        profiler._root_code = ProfilerMiddleware.__call__.__code__
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not self.profiler.armed or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        reason = self.profiler.select(scope)
+        profile = self.profiler.begin(scope, reason) if reason else None
+        if profile is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers[PROFILE_ID_HEADER] = str(profile.id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.end(profile)
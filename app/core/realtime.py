@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import asyncpg
+
+from app.core.database import engine
+from app.models.triggers import CATALOG_CHANGES_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+ChangeHandler = Callable[[Dict[str, Any]], None]
+
+RECONNECT_DELAY_SECONDS = 2.0
+
+
+class ChangeListener:
+    """
+    Одно LISTEN-соединение на воркер (вне пула SQLAlchemy).
+    Уведомления из триггеров разбираются один раз и раздаются
+    in-process обработчикам (WebSocket hub, кэши).
+    """
+
+    def __init__(self, channel: str = CATALOG_CHANGES_CHANNEL):
+        self.channel = channel
+        self._handlers: List[ChangeHandler] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = asyncio.Event()
+        self.received = 0
+
+    def add_handler(self, handler: ChangeHandler):
+        self._handlers.append(handler)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name="change-listener")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self._close_connection()
+
+    async def _run(self):
+        dsn = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while True:
+            try:
+                self._closed.clear()
+                self._conn = await asyncpg.connect(dsn)
+                self._conn.add_termination_listener(lambda conn: self._closed.set())
+                await self._conn.add_listener(self.channel, self._on_notify)
+                logger.info("Listening for %s notifications", self.channel)
+                await self._closed.wait()
+                logger.warning("LISTEN connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("LISTEN connection failed")
+            await self._close_connection()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _close_connection(self):
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning("Malformed %s payload: %r", channel, payload[:200])
+            return
+
+        self.received += 1
+        for handler in self._handlers:
+            try:
+                handler(change)
+            except Exception:
+                logger.exception("Change handler %r failed", handler)
+
+
+def change_channels(change: Dict[str, Any]) -> List[str]:
+    """Subscription channels affected by a catalog change"""
+    if change.get("table") == "sections":
+        channels = [f"section:{change['id']}"]
+        if change.get("club_id") is not None:
+            channels.append(f"club:{change['club_id']}")
+        return channels
+    if change.get("table") == "clubs":
+        return [f"club:{change['id']}"]
+    return []
+
+
+class Subscriber:
+    """One WebSocket client: its channels and a bounded outgoing queue"""
+
+    def __init__(self, max_queue: int):
+        self.channels: Set[str] = set()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+        self.resyncs = 0
+
+    def offer(self, message: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Медленный клиент: выбрасываем накопленное и просим перечитать
+            # состояние через REST — память на клиента остаётся ограниченной
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+            self.resyncs += 1
+
+
+class LiveUpdatesHub:
+    """
+    Fan-out изменений каталога по подпискам club:<id> / section:<id>.
+    Изменения копятся window секунд и схлопываются по (table, id):
+    клиент получает только последнее состояние строки за окно.
+    """
+
+    def __init__(self, window: float = 0.25, max_queue: int = 100):
+        self.window = window
+        self.max_queue = max_queue
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._pending: Dict[str, Dict[Tuple[str, int], Dict[str, Any]]] = {}
+        self._flush_scheduled = False
+
+        self.changes_received = 0
+        self.messages_sent = 0
+
+    def connect(self) -> Subscriber:
+        return Subscriber(self.max_queue)
+
+    def disconnect(self, subscriber: Subscriber):
+        for channel in list(subscriber.channels):
+            self.unsubscribe(subscriber, channel)
+
+    def subscribe(self, subscriber: Subscriber, channel: str):
+        subscriber.channels.add(channel)
+        self._subscribers.setdefault(channel, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber, channel: str):
+        subscriber.channels.discard(channel)
+        subscribers = self._subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[channel]
+
+    def handle_change(self, change: Dict[str, Any]):
+        """ChangeListener handler: buffer the change for subscribed channels"""
+        self.changes_received += 1
+        for channel in change_channels(change):
+            if channel not in self._subscribers:
+                continue
+            self._pending.setdefault(channel, {})[
+                (change["table"], change["id"])
+            ] = change
+
+        if self._pending and not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        for channel, changes in pending.items():
+            message = {
+                "type": "changes",
+                "channel": channel,
+                "changes": list(changes.values()),
+            }
+            for subscriber in self._subscribers.get(channel, ()):
+                subscriber.offer(message)
+                self.messages_sent += 1
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = {s for group in self._subscribers.values() for s in group}
+        return {
+            "channels": len(self._subscribers),
+            "subscribers": len(subscribers),
+            "changes_received": self.changes_received,
+            "messages_sent": self.messages_sent,
+            "resyncs": sum(s.resyncs for s in subscribers),
+        }
+
+
+change_listener = ChangeListener()
+live_updates_hub = LiveUpdatesHub()
+change_listener.add_handler(live_updates_hub.handle_change)
@@ -0,0 +1,195 @@
+"""
+Разбор Section.schedule и работа с недельными интервалами.
+
+Формат schedule — ключи дней недели ("mon".."sun" или полные имена),
+значения — список занятий. Занятие задаётся одним из способов:
+    "18:00"                                 — начало, длительность = duration_min
+    {"start": "18:00", "end": "19:30"}
+    {"start": "18:00", "duration": 90}
+Пример: {"mon": ["18:00"], "wed": [{"start": "10:00", "end": "11:30"}]}
+
+Интервалы считаются в минутах от начала недели (пн 00:00) по UTC,
+полуинтервалы [start, end). Занятие через границу недели делится на два.
+Смещение пояса — текущее: в поясах с летним временем интервалы верны до
+ближайшего перехода, хранимые слоты пересобираются периодически.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+_WEEKDAY_ALIASES = {
+    **{day: index for index, day in enumerate(WEEKDAYS)},
+    **{
+        name: index
+        for index, name in enumerate(
+            (
+                "monday",
+                "tuesday",
+                "wednesday",
+                "thursday",
+                "friday",
+                "saturday",
+                "sunday",
+            )
+        )
+    },
+}
+_TIME_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})$")
+
+Interval = Tuple[int, int]
+
+
+class ScheduleError(ValueError):
+    """Schedule JSON cannot be parsed"""
+
+
+class ScheduleConflictError(Exception):
+    """Coach is already busy in another section at these times"""
+
+    def __init__(self, conflicts: List[Dict[str, Any]]):
+        super().__init__("Coach schedule conflict")
+        self.conflicts = conflicts
+
+
+def _parse_time(value: Any) -> int:
+    match = _TIME_PATTERN.match(str(value).strip())
+    if not match:
+        raise ScheduleError(f"Invalid time: {value!r}")
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours > 23 or minutes > 59:
+        raise ScheduleError(f"Invalid time: {value!r}")
+    return hours * 60 + minutes
+
+
+def utc_offset_minutes(tz: tzinfo, at: Optional[datetime] = None) -> int:
+    offset = (at or datetime.now(timezone.utc)).astimezone(tz).utcoffset()
+    return int(offset.total_seconds() // 60) if offset else 0
+
+
+def local_slots(
+    schedule: Optional[Dict[str, Any]], default_duration: int
+) -> List[Interval]:
+    """Weekly slots in local time: [(start_minute_of_week, end_minute_of_week)]"""
+    slots = []
+    for day, entries in (schedule or {}).items():
+        weekday = _WEEKDAY_ALIASES.get(str(day).strip().lower())
+        if weekday is None:
+            raise ScheduleError(f"Invalid weekday: {day!r}")
+        if not isinstance(entries, list):
+            entries = [entries]
+
+        for entry in entries:
+            if isinstance(entry, dict):
+                start = _parse_time(entry.get("start") or entry.get("time"))
+                if entry.get("end"):
+                    end = _parse_time(entry["end"])
+                    if end <= start:
+                        end += MINUTES_PER_DAY  # занятие через полночь
+                else:
+                    end = start + int(entry.get("duration") or default_duration)
+            else:
+                start = _parse_time(entry)
+                end = start + default_duration
+
+            if end <= start:
+                raise ScheduleError(f"Empty slot on {day}: {entry!r}")
+            offset = weekday * MINUTES_PER_DAY
+            slots.append((offset + start, offset + end))
+    return slots
+
+
+def normalize(intervals: List[Interval]) -> List[Interval]:
+    """Wrap intervals into [0, week), split at the week boundary, merge overlaps"""
+    pieces = []
+    for start, end in intervals:
+        length = min(end - start, MINUTES_PER_WEEK)
+        start %= MINUTES_PER_WEEK
+        end = start + length
+        if end > MINUTES_PER_WEEK:
+            pieces.append((start, MINUTES_PER_WEEK))
+            pieces.append((0, end - MINUTES_PER_WEEK))
+        else:
+            pieces.append((start, end))
+
+    merged: List[Interval] = []
+    for start, end in sorted(pieces):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def schedule_intervals(
+    schedule: Optional[Dict[str, Any]], default_duration: int, tz: tzinfo
+) -> List[Interval]:
+    """Section schedule as merged UTC minute-of-week intervals"""
+    shift = utc_offset_minutes(tz)
+    return normalize(
+        [
+            (start - shift, end - shift)
+            for start, end in local_slots(schedule, default_duration or 60)
+        ]
+    )
+
+
+def next_occurrences(
+    schedule: Optional[Dict[str, Any]],
+    default_duration: int,
+    tz: tzinfo,
+    now: datetime,
+    days: int = 7,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Concrete (starts_at, ends_at) of the section classes in [now, now + days),
+    plus the class in progress. Считается по локальному времени клуба, поэтому
+    переходы на летнее время не сдвигают занятия.
+    """
+    local_now = now.astimezone(tz)
+    week_start = datetime.combine(
+        (local_now - timedelta(days=local_now.weekday())).date(),
+        datetime.min.time(),
+        tzinfo=tz,
+    )
+    until = now + timedelta(days=days)
+
+    occurrences = []
+    for week in range(days // 7 + 2):
+        for start, end in local_slots(schedule, default_duration or 60):
+            offset = week * MINUTES_PER_WEEK
+            starts_at = week_start + timedelta(minutes=start + offset)
+            ends_at = week_start + timedelta(minutes=end + offset)
+            if ends_at > now and starts_at < until:
+                occurrences.append((starts_at, ends_at))
+    return sorted(occurrences)
+
+
+def format_minute(minute_of_week: int, tz: tzinfo) -> str:
+    """UTC minute of week -> "wed 18:30" in the given timezone"""
+    local = (minute_of_week + utc_offset_minutes(tz)) % MINUTES_PER_WEEK
+    day, minute = divmod(local, MINUTES_PER_DAY)
+    return f"{WEEKDAYS[day]} {minute // 60:02d}:{minute % 60:02d}"
+
+
+def find_overlaps(
+    intervals: List[Tuple[int, int, Hashable]],
+) -> List[Tuple[Hashable, Hashable, int, int]]:
+    """
+    Sweep over (start, end, owner) intervals; returns (owner_a, owner_b,
+    overlap_start, overlap_end) for every overlapping pair with different owners.
+    O(n log n + k), k — число пересечений.
+    """
+    overlaps = []
+    active: List[Tuple[int, int, Hashable]] = []
+    for start, end, owner in sorted(intervals, key=lambda item: (item[0], item[1])):
+        active = [item for item in active if item[1] > start]
+        for other_start, other_end, other_owner in active:
+            if other_owner != owner:
+                overlaps.append((other_owner, owner, start, min(end, other_end)))
+        active.append((start, end, owner))
+    return overlaps
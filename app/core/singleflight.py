@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import SINGLEFLIGHT_GRACE
+from app.core.database import async_session
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Схлопывание одинаковых параллельных чтений: первый вызов с ключом
+    выполняет fn, остальные ждут его результат. Ещё grace секунд после
+    завершения результат отдаётся новым вызовам без повторного запроса.
+
+    fn выполняется отдельной задачей: отмена запроса, который её запустил
+    (клиент закрыл соединение), не роняет остальных ожидающих.
+    Ошибки отдаются только тем, кто ждал одновременно, и не кэшируются.
+    """
+
+    def __init__(self, grace: float = SINGLEFLIGHT_GRACE):
+        self.grace = grace
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.grace_hits = 0
+        self.errors = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._flights.get(key)
+        if task is not None:
+            if task.done():
+                self.grace_hits += 1
+            else:
+                self.coalesced += 1
+        else:
+            self.executed += 1
+            task = asyncio.create_task(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._landed(key, done))
+        return await asyncio.shield(task)
+
+    def _landed(self, key: Hashable, task: asyncio.Task):
+        if task.cancelled() or task.exception() is not None:
+            self.errors += 1
+            self._forget(key, task)
+        elif self.grace > 0:
+            asyncio.get_running_loop().call_later(self.grace, self._forget, key, task)
+        else:
+            self._forget(key, task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "grace_hits": self.grace_hits,
+            "errors": self.errors,
+            "in_flight": sum(1 for task in self._flights.values() if not task.done()),
+            "grace_window_seconds": self.grace,
+        }
+
+
+db_reads = SingleFlight()
+
+
+def _key_part(value: Any) -> Hashable:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json()
+    if isinstance(value, (list, set, frozenset)):
+        return tuple(_key_part(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _key_part(item)) for key, item in value.items()))
+    return value
+
+
+async def coalesced_read(
+    query: Callable[..., Awaitable[T]],
+    *args: Any,
+    flight: Optional[SingleFlight] = None,
+    **kwargs: Any,
+) -> T:
+    """
+    Run query(session, *args, **kwargs) once for all concurrent identical calls.
+    Запрос идёт в собственной сессии, а не в сессии запроса, который его
+    запустил, поэтому результат не должен содержать ORM-объекты: query
+    возвращает Row/скаляры/pydantic-модели, общие для всех ожидающих
+    (их нельзя изменять на месте).
+    """
+    key = (
+        query.__module__,
+        query.__qualname__,
+        _key_part(list(args)),
+        _key_part(kwargs),
+    )
+
+    async def run() -> T:
+        async with async_session() as session:
+            return await query(session, *args, **kwargs)
+
+    return await (flight or db_reads).do(key, run)
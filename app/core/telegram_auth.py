@@ -63,7 +63,7 @@ class TelegramAuth:
         except TelegramAuthError:
             raise
         except Exception as e:
-            logger.error(f"Failed to parse init data: {str(e)}")
+            logger.error("Failed to parse init data: %s", e)
             raise TelegramAuthError("Invalid data format", "PARSE_ERROR")
 
     def validate_hash(self, init_data: str) -> bool:
@@ -105,7 +105,7 @@ class TelegramAuth:
         except TelegramAuthError:
             raise
         except Exception as e:
-            logger.error(f"Hash validation error: {str(e)}")
+            logger.error("Hash validation error: %s", e)
             raise TelegramAuthError("Hash validation failed", "HASH_VALIDATION_ERROR")
 
     def validate_auth_date(self, auth_date: str, max_age_seconds: int = 86400) -> bool:
@@ -176,7 +176,7 @@ class TelegramAuth:
         except TelegramAuthError:
             raise
         except Exception as e:
-            logger.error(f"Query validation error: {str(e)}")
+            logger.error("Query validation error: %s", e)
             raise TelegramAuthError("Query validation failed", "VALIDATION_ERROR")
 
     def authenticate(self, init_data: str) -> Dict[str, Any]:
@@ -216,8 +216,14 @@ class TelegramAuth:
             return parsed_data
 
         except TelegramAuthError as e:
-            # Log the specific error for debugging but don't expose details
-            logger.warning(f"Telegram auth failed: {e.error_code} - {e.message}")
+            # Log the specific error for debugging but don't expose details.
+            # %-style args keep one rate-limit key for the whole auth-failure flood
+            logger.warning(
+                "Telegram auth failed: %s - %s",
+                e.error_code,
+                e.message,
+                extra={"error_code": e.error_code},
+            )
             # Always return generic error to client
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -226,7 +232,7 @@ class TelegramAuth:
             )
         except Exception as e:
             # Log unexpected errors
-            logger.error(f"Unexpected auth error: {str(e)}")
+            logger.error("Unexpected auth error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication failed",
@@ -258,14 +264,19 @@ class TelegramAuth:
             return parsed_data
 
         except TelegramAuthError as e:
-            logger.warning(f"Contact auth failed: {e.error_code} - {e.message}")
+            logger.warning(
+                "Contact auth failed: %s - %s",
+                e.error_code,
+                e.message,
+                extra={"error_code": e.error_code},
+            )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Contact authentication failed",
                 headers={"WWW-Authenticate": "tma"},
             )
         except Exception as e:
-            logger.error(f"Unexpected contact auth error: {str(e)}")
+            logger.error("Unexpected contact auth error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Contact authentication failed",
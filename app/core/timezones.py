@@ -0,0 +1,36 @@
+import re
+from datetime import timedelta, timezone, tzinfo
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# "UTC+5" — значение по умолчанию в preferences
+DEFAULT_TIMEZONE = timezone(timedelta(hours=5))
+
+UTC_OFFSET_PATTERN = re.compile(r"^(?:UTC|GMT)?\s*([+-])(\d{1,2})(?::?(\d{2}))?$")
+
+
+def parse_timezone(value: Optional[str], default: tzinfo = DEFAULT_TIMEZONE) -> tzinfo:
+    """
+    Parse a timezone from user/club settings.
+    Supports offsets like "UTC+5", "UTC-03:30", "+06:00" and IANA names like "Asia/Almaty".
+    Unknown values fall back to default.
+    """
+    if not value:
+        return default
+
+    value = value.strip()
+    if value.upper() in ("UTC", "GMT", "Z"):
+        return timezone.utc
+
+    match = UTC_OFFSET_PATTERN.match(value.upper())
+    if match:
+        sign, hours, minutes = match.groups()
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        if offset > timedelta(hours=14):
+            return default
+        return timezone(-offset if sign == "-" else offset)
+
+    try:
+        return ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        return default
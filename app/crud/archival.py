@@ -0,0 +1,138 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.config import USER_ROLES_ARCHIVE_BATCH, USER_ROLES_RETENTION_DAYS
+from app.core.partitions import ensure_range_partition
+
+HISTORY_TABLE = "user_roles_history"
+
+# Кандидаты в архив: неактивные дольше срока хранения. Условие и сортировка
+# совпадают с частичным индексом ix_user_roles_inactive_since; SKIP LOCKED —
+# строки, которые сейчас меняет API, пропускаются до следующего запуска
+_SELECT_BATCH = text("""
+    SELECT id,
+           date_part('year', coalesce(left_at, joined_at) AT TIME ZONE 'UTC')::int
+    FROM user_roles
+    WHERE is_active IS NOT TRUE AND coalesce(left_at, joined_at) < :cutoff
+    ORDER BY coalesce(left_at, joined_at)
+    LIMIT :batch
+    FOR UPDATE SKIP LOCKED
+    """)
+
+# Перенос одним запросом: строки уже заблокированы в этой транзакции.
+# DELETE неактивных строк не меняет club_stats_daily (триггер учитывает только
+# активные), сверка статистики читает их дальше через view user_roles_all.
+# Tombstone-ов /sync он не пишет, если деактивация ниже горизонта sync
+# (sync_record_delete): иначе архивация раздувала бы sync_tombstones
+_MOVE_BATCH = text("""
+    WITH moved AS (
+        DELETE FROM user_roles
+        WHERE id = ANY(:ids)
+        RETURNING id, user_id, club_id, role_id, joined_at, left_at, is_active
+    )
+    INSERT INTO user_roles_history
+        (id, period_at, user_id, club_id, role_id, joined_at, left_at, is_active)
+    SELECT id, coalesce(left_at, joined_at), user_id, club_id, role_id,
+           joined_at, left_at, is_active
+    FROM moved
+    """)
+
+# Строки — оценка планировщика (reltuples): count(*) по истории дорог.
+# Для партиционированной истории размеры суммируются по листовым партициям
+# (для обычной таблицы pg_partition_tree пуст — берётся она сама);
+# sync_tombstones — чтобы видеть, что архивация не растит tombstone-ы
+_TABLE_SIZES = text("""
+    SELECT t.name,
+           coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint AS rows,
+           coalesce(sum(pg_relation_size(c.oid)), 0)::bigint AS table_bytes,
+           coalesce(sum(pg_indexes_size(c.oid)), 0)::bigint AS index_bytes
+    FROM (VALUES ('user_roles'), ('user_roles_history'), ('sync_tombstones'))
+        AS t(name)
+    LEFT JOIN LATERAL (
+        SELECT relid FROM pg_partition_tree(t.name::regclass) WHERE isleaf
+    ) p ON true
+    LEFT JOIN pg_class c ON c.oid = coalesce(p.relid, t.name::regclass)
+    GROUP BY t.name
+    ORDER BY t.name
+    """)
+
+# Годы, для которых партиция истории уже создана этим процессом
+_history_years: Set[int] = set()
+
+
+async def get_user_roles_sizes(conn: AsyncConnection) -> Dict[str, Dict[str, int]]:
+    """Estimated rows, heap and index bytes of user_roles, history and tombstones"""
+    result = await conn.execute(_TABLE_SIZES)
+    return {
+        row.name: {
+            "rows": row.rows,
+            "table_bytes": row.table_bytes,
+            "index_bytes": row.index_bytes,
+        }
+        for row in result.all()
+    }
+
+
+async def _archive_batch(conn: AsyncConnection, cutoff: datetime, batch: int) -> int:
+    async with conn.begin():
+        result = await conn.execute(_SELECT_BATCH, {"cutoff": cutoff, "batch": batch})
+        rows = result.all()
+        if not rows:
+            return 0
+
+        years = {year for _, year in rows}
+        for year in sorted(years - _history_years):
+            await ensure_range_partition(
+                conn, HISTORY_TABLE, str(year), date(year, 1, 1), date(year + 1, 1, 1)
+            )
+
+        await conn.execute(_MOVE_BATCH, {"ids": [row_id for row_id, _ in rows]})
+
+    # Только после COMMIT: при откате CREATE TABLE откатывается вместе с пачкой
+    _history_years.update(years)
+    return len(rows)
+
+
+async def archive_user_roles(
+    conn: AsyncConnection,
+    retention_days: int = USER_ROLES_RETENTION_DAYS,
+    batch: int = USER_ROLES_ARCHIVE_BATCH,
+    max_batches: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Move memberships inactive for more than retention_days into
+    user_roles_history, one short transaction per batch.
+    Возвращает число перенесённых строк и размеры таблиц до и после.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    before = await get_user_roles_sizes(conn)
+    await conn.commit()
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = await _archive_batch(conn, cutoff, batch)
+        if not moved:
+            break
+        archived += moved
+        batches += 1
+        if moved < batch:
+            break
+
+    if archived:
+        # Освобождённое место переиспользуется только после VACUUM; заодно
+        # обновляются reltuples для отчёта. VACUUM — вне транзакции
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM (ANALYZE) user_roles"))
+        await conn.execute(text("ANALYZE user_roles_history"))
+        await conn.execute(text("ANALYZE sync_tombstones"))
+
+    after = await get_user_roles_sizes(conn)
+    await conn.commit()
+    return {
+        "cutoff": cutoff,
+        "archived": archived,
+        "batches": batches,
+        "before": before,
+        "after": after,
+    }
@@ -0,0 +1,264 @@
+from datetime import datetime, timezone
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.schedule import ScheduleError, next_occurrences
+from app.core.timezones import parse_timezone
+from app.models.bookings import Booking, BookingStatus
+from app.models.clubs import Club
+from app.models.sections import Section
+from app.models.users import User
+
+ACTIVE_STATUSES = (BookingStatus.confirmed.value, BookingStatus.waitlisted.value)
+
+
+async def get_booking(session: AsyncSession, section_id: int, user_id: int):
+    result = await session.execute(
+        select(Booking).where(
+            Booking.section_id == section_id, Booking.user_id == user_id
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_waitlist_position(session: AsyncSession, booking: Booking):
+    """1-based position in the section waitlist, None if not waitlisted"""
+    if booking.status != BookingStatus.waitlisted.value:
+        return None
+
+    result = await session.execute(
+        select(func.count(Booking.id)).where(
+            Booking.section_id == booking.section_id,
+            Booking.status == BookingStatus.waitlisted.value,
+            or_(
+                Booking.created_at < booking.created_at,
+                and_(
+                    Booking.created_at == booking.created_at,
+                    Booking.id < booking.id,
+                ),
+            ),
+        )
+    )
+    return result.scalar() + 1
+
+
+def _lock_section(section_id: int):
+    # FOR NO KEY UPDATE: как UPDATE счётчика booked, но не мешает вставке
+    # записей (FK-проверка берёт FOR KEY SHARE на строку секции)
+    return (
+        select(Section.id)
+        .where(Section.id == section_id, Section.active.is_(True))
+        .with_for_update(key_share=True)
+    )
+
+
+async def _take_seat(session: AsyncSession, section_id: int) -> bool:
+    """booked + 1, if the section is active and has a free seat"""
+    seat = await session.execute(
+        update(Section)
+        .where(
+            Section.id == section_id,
+            Section.active.is_(True),
+            or_(Section.capacity.is_(None), Section.booked < Section.capacity),
+        )
+        .values(booked=Section.booked + 1)
+        .returning(Section.id)
+    )
+    return seat.scalar_one_or_none() is not None
+
+
+async def book_section(session: AsyncSession, section_id: int, user_id: int):
+    """
+    Записать пользователя в секцию.
+
+    Место занимается одним условным UPDATE счётчика Section.booked
+    (без SELECT ... FOR UPDATE): строка секции блокируется только на время
+    этой короткой транзакции. Если мест нет — строка секции блокируется
+    явно и попытка повторяется: запись в очередь и cancel_booking
+    (передача места / уменьшение booked) так не расходятся.
+    Повторный вызов возвращает уже существующую активную запись.
+    Возвращает None, если секция не найдена или неактивна.
+    """
+    existing = await get_booking(session, section_id, user_id)
+    if existing and existing.status in ACTIVE_STATUSES:
+        return existing
+
+    try:
+        if await _take_seat(session, section_id):
+            status = BookingStatus.confirmed.value
+        else:
+            # Отмена, не нашедшая очереди, могла освободить место после нашего
+            # UPDATE: под блокировкой секции пробуем ещё раз
+            section = await session.execute(_lock_section(section_id))
+            if section.scalar_one_or_none() is None:
+                await session.rollback()
+                return None
+            if await _take_seat(session, section_id):
+                status = BookingStatus.confirmed.value
+            else:
+                status = BookingStatus.waitlisted.value
+
+        # Отменённая запись переиспользуется; активную (созданную параллельным
+        # запросом того же пользователя) не трогаем
+        stmt = (
+            insert(Booking)
+            .values(section_id=section_id, user_id=user_id, status=status)
+            .on_conflict_do_update(
+                constraint="uq_booking_section_user",
+                set_={
+                    "status": status,
+                    "created_at": func.now(),
+                    "updated_at": func.now(),
+                    "cancelled_at": None,
+                },
+                where=Booking.status == BookingStatus.cancelled.value,
+            )
+            .returning(Booking)
+            .execution_options(populate_existing=True)
+        )
+        result = await session.execute(stmt)
+        booking = result.scalar_one_or_none()
+
+        if booking is None:
+            # Параллельный дубль уже записал пользователя — откатываем наш +1
+            await session.rollback()
+            return await get_booking(session, section_id, user_id)
+
+        await session.commit()
+        return booking
+    except:
+        await session.rollback()
+        raise
+
+
+async def cancel_booking(session: AsyncSession, section_id: int, user_id: int):
+    """
+    Отменить запись. Идемпотентно: повторная отмена возвращает
+    уже отменённую запись. Освободившееся место сразу передаётся
+    первому в очереди; если очереди нет — уменьшается Section.booked.
+    Возвращает None, если записи не было.
+    """
+    try:
+        # Сначала строка секции (порядок блокировок как в book_section):
+        # запись в очередь не проскочит между поиском очереди и booked - 1
+        await session.execute(
+            select(Section.id)
+            .where(Section.id == section_id)
+            .with_for_update(key_share=True)
+        )
+        # Затем строку этой записи — и узнаём её прежний статус
+        previous = (
+            select(Booking.id, Booking.status)
+            .where(
+                Booking.section_id == section_id,
+                Booking.user_id == user_id,
+                Booking.status.in_(ACTIVE_STATUSES),
+            )
+            .with_for_update()
+            .subquery()
+        )
+        cancelled = await session.execute(
+            update(Booking)
+            .where(Booking.id == previous.c.id)
+            .values(
+                status=BookingStatus.cancelled.value,
+                cancelled_at=func.now(),
+            )
+            .returning(previous.c.status)
+        )
+        previous_status = cancelled.scalar_one_or_none()
+
+        if previous_status == BookingStatus.confirmed.value:
+            next_in_line = (
+                select(Booking.id)
+                .where(
+                    Booking.section_id == section_id,
+                    Booking.status == BookingStatus.waitlisted.value,
+                )
+                .order_by(Booking.created_at, Booking.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            promoted = await session.execute(
+                update(Booking)
+                .where(Booking.id == next_in_line)
+                .values(status=BookingStatus.confirmed.value)
+                .returning(Booking.id)
+            )
+            if promoted.scalar_one_or_none() is None:
+                await session.execute(
+                    update(Section)
+                    .where(Section.id == section_id, Section.booked > 0)
+                    .values(booked=Section.booked - 1)
+                )
+
+        await session.commit()
+    except:
+        await session.rollback()
+        raise
+
+    booking = await session.execute(
+        select(Booking)
+        .where(Booking.section_id == section_id, Booking.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    return booking.scalar_one_or_none()
+
+
+async def get_upcoming_sessions(
+    session: AsyncSession, telegram_id: int, days: int = 7, limit: int = 20
+):
+    """
+    Ближайшие занятия пользователя: активные записи (confirmed/waitlisted)
+    в активные секции, развёрнутые по Section.schedule во времени клуба.
+    """
+    result = await session.execute(
+        select(
+            Booking.status,
+            Section.id.label("section_id"),
+            Section.name.label("section_name"),
+            Section.schedule,
+            Section.duration_min,
+            Club.id.label("club_id"),
+            Club.name.label("club_name"),
+            Club.timezone,
+        )
+        .join(Section, Section.id == Booking.section_id)
+        .join(Club, Club.id == Section.club_id)
+        .join(User, User.id == Booking.user_id)
+        .where(
+            User.telegram_id == telegram_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Section.active.is_(True),
+        )
+    )
+
+    now = datetime.now(timezone.utc)
+    sessions = []
+    for row in result.all():
+        try:
+            occurrences = next_occurrences(
+                row.schedule,
+                row.duration_min,
+                parse_timezone(row.timezone),
+                now,
+                days=days,
+            )
+        except ScheduleError:
+            continue
+        sessions.extend(
+            {
+                "section_id": row.section_id,
+                "section_name": row.section_name,
+                "club_id": row.club_id,
+                "club_name": row.club_name,
+                "starts_at": starts_at,
+                "ends_at": ends_at,
+                "booking_status": row.status,
+            }
+            for starts_at, ends_at in occurrences
+        )
+    sessions.sort(key=lambda item: item["starts_at"])
+    return sessions[:limit]
@@ -0,0 +1,46 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from pydantic import ValidationError
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.clubs import Club
+from app.models.sections import Section
+from app.schemas.clubs import ClubRead
+from app.schemas.sections import SectionRead
+
+logger = logging.getLogger(__name__)
+
+
+def _serialize(rows, schema) -> List[Dict[str, Any]]:
+    items = []
+    for row in rows:
+        try:
+            items.append(schema.model_validate(row).model_dump(mode="json"))
+        except ValidationError:
+            # Одна битая строка (например, невалидный URL) не должна ронять каталог
+            logger.warning(
+                "Skipping invalid %s id=%s in catalog", schema.__name__, row.id
+            )
+    return items
+
+
+async def get_catalog_clubs(
+    session: AsyncSession, ids: Optional[Iterable[int]] = None
+) -> List[Dict[str, Any]]:
+    """Clubs as ClubRead dicts: all of them, or only ids (missing ids are absent)"""
+    query = select(Club)
+    if ids is not None:
+        query = query.where(Club.id.in_(list(ids)))
+    result = await session.execute(query)
+    return _serialize(result.scalars().all(), ClubRead)
+
+
+async def get_catalog_sections(
+    session: AsyncSession, ids: Optional[Iterable[int]] = None
+) -> List[Dict[str, Any]]:
+    """Active sections as SectionRead dicts: all of them, or only ids"""
+    query = select(Section).where(Section.active.is_(True))
+    if ids is not None:
+        query = query.where(Section.id.in_(list(ids)))
+    result = await session.execute(query)
+    return _serialize(result.scalars().all(), SectionRead)
@@ -0,0 +1,125 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict
+from sqlalchemy import func, text
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.models.club_stats import ClubStatsDaily
+from app.models.clubs import Club
+
+# Пересборка rollup-ов клуба из исходных таблиц. Даты — по UTC, как в триггерах.
+# Членства читаются из user_roles_all: архивные строки тоже дают joins/leaves
+_RECONCILE_CLUB_STATS = text("""
+    INSERT INTO club_stats_daily (club_id, day, metric, value)
+    SELECT club_id, day, metric, sum(delta)
+    FROM (
+        SELECT ur.club_id,
+               (coalesce(ur.joined_at, now()) AT TIME ZONE 'UTC')::date AS day,
+               'members:' || r.code::text AS metric,
+               1::numeric AS delta
+        FROM user_roles_all ur JOIN roles r ON r.id = ur.role_id
+        WHERE ur.club_id = :club_id
+        UNION ALL
+        SELECT ur.club_id,
+               (coalesce(ur.left_at, ur.joined_at, now()) AT TIME ZONE 'UTC')::date,
+               'members:' || r.code::text,
+               -1
+        FROM user_roles_all ur JOIN roles r ON r.id = ur.role_id
+        WHERE ur.club_id = :club_id AND ur.is_active IS NOT TRUE
+        UNION ALL
+        SELECT club_id, (coalesce(joined_at, now()) AT TIME ZONE 'UTC')::date, 'joins', 1
+        FROM user_roles_all
+        WHERE club_id = :club_id
+        UNION ALL
+        SELECT club_id, (left_at AT TIME ZONE 'UTC')::date, 'leaves', 1
+        FROM user_roles_all
+        WHERE club_id = :club_id AND is_active IS NOT TRUE AND left_at IS NOT NULL
+        UNION ALL
+        SELECT club_id, (coalesce(created_at, now()) AT TIME ZONE 'UTC')::date,
+               'sections:' || coalesce(level, 'none'), 1
+        FROM sections
+        WHERE club_id = :club_id AND active IS TRUE
+        UNION ALL
+        SELECT club_id, (coalesce(created_at, now()) AT TIME ZONE 'UTC')::date,
+               'revenue_potential', coalesce(price, 0) * coalesce(capacity, 0)
+        FROM sections
+        WHERE club_id = :club_id AND active IS TRUE
+    ) deltas
+    GROUP BY club_id, day, metric
+    HAVING sum(delta) <> 0
+    """)
+
+
+async def reconcile_club_stats(conn: AsyncConnection, club_id: int):
+    """
+    Rebuild rollups of one club from user_roles_all/sections.
+    Call inside a transaction. The table lock waits for in-flight trigger
+    upserts and blocks new ones only for the duration of this club's rebuild.
+    """
+    await conn.execute(text("LOCK TABLE club_stats_daily IN SHARE ROW EXCLUSIVE MODE"))
+    await conn.execute(
+        ClubStatsDaily.__table__.delete().where(ClubStatsDaily.club_id == club_id)
+    )
+    await conn.execute(_RECONCILE_CLUB_STATS, {"club_id": club_id})
+
+
+async def reconcile_all_club_stats(conn: AsyncConnection) -> int:
+    """Reconcile every club, one short transaction per club"""
+    result = await conn.execute(select(Club.id).order_by(Club.id))
+    club_ids = result.scalars().all()
+    await conn.commit()
+
+    for club_id in club_ids:
+        async with conn.begin():
+            await reconcile_club_stats(conn, club_id)
+    return len(club_ids)
+
+
+async def get_club_stats(
+    session: AsyncSession, club_id: int, days: int = 30
+) -> Dict[str, Any]:
+    """Current totals and weekly joins/leaves for the last `days` days"""
+    totals_result = await session.execute(
+        select(ClubStatsDaily.metric, func.sum(ClubStatsDaily.value))
+        .where(ClubStatsDaily.club_id == club_id)
+        .group_by(ClubStatsDaily.metric)
+    )
+    totals = {metric: value for metric, value in totals_result.all()}
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    week = func.date_trunc("week", ClubStatsDaily.day).cast(ClubStatsDaily.day.type)
+    weekly_result = await session.execute(
+        select(week, ClubStatsDaily.metric, func.sum(ClubStatsDaily.value))
+        .where(
+            ClubStatsDaily.club_id == club_id,
+            ClubStatsDaily.day >= since,
+            ClubStatsDaily.metric.in_(["joins", "leaves"]),
+        )
+        .group_by(week, ClubStatsDaily.metric)
+        .order_by(week)
+    )
+    weeks: Dict[date, Dict[str, int]] = {}
+    for week_start, metric, value in weekly_result.all():
+        weeks.setdefault(week_start, {"joins": 0, "leaves": 0})[metric] = int(value)
+
+    members_by_role = {
+        metric.split(":", 1)[1]: int(value)
+        for metric, value in totals.items()
+        if metric.startswith("members:") and value
+    }
+    sections_by_level = {
+        metric.split(":", 1)[1]: int(value)
+        for metric, value in totals.items()
+        if metric.startswith("sections:") and value
+    }
+
+    return {
+        "club_id": club_id,
+        "total_members": sum(members_by_role.values()),
+        "members_by_role": members_by_role,
+        "sections_by_level": sections_by_level,
+        "revenue_potential": float(totals.get("revenue_potential") or 0),
+        "weekly": [
+            {"week_start": week_start, **counts} for week_start, counts in weeks.items()
+        ],
+        "days": days,
+    }
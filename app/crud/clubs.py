@@ -0,0 +1,115 @@
+import re
+from typing import Optional, Sequence
+from sqlalchemy import and_, cast, func, literal_column, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.fieldsets import model_columns
+from app.core.geo import (
+    EARTH_RADIUS_KM,
+    GEOHASH_RANGE_END,
+    covering_cells,
+)
+from app.models.clubs import Club
+from app.models.sections import Section
+from app.models.triggers import SEARCH_CONFIG
+
+# Слово запроса — буквы/цифры любого алфавита (кириллица, латиница)
+_SEARCH_TERM = re.compile(r"[^\W_]+")
+MAX_SEARCH_TERMS = 8
+# Конфигурация поиска — константа в тексте SQL, а не bind-параметр
+_SEARCH_REGCONFIG = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+
+def _distance_km(lat: float, lon: float):
+    """Haversine distance (km) from the point to Club coordinates, as SQL"""
+    d_lat = func.radians(Club.latitude - lat) * 0.5
+    d_lon = func.radians(Club.longitude - lon) * 0.5
+    a = func.power(func.sin(d_lat), 2) + func.cos(func.radians(lat)) * func.cos(
+        func.radians(Club.latitude)
+    ) * func.power(func.sin(d_lon), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+async def get_clubs_nearby(
+    session: AsyncSession,
+    lat: float,
+    lon: float,
+    radius_km: float,
+    level: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[Sequence[str]] = None,
+):
+    """
+    Клубы в радиусе radius_km, отсортированные по расстоянию.
+    Возвращает список пар (Club, distance_km); с fields — строки
+    только с этими колонками и distance_km.
+    """
+    # Префильтр по geohash-ячейкам: до 9 диапазонов по B-tree индексу,
+    # точный радиус считаем только для попавших в них клубов
+    cells = covering_cells(lat, lon, radius_km)
+    cell_condition = or_(
+        *[
+            and_(Club.geohash >= cell, Club.geohash < cell + GEOHASH_RANGE_END)
+            for cell in cells
+        ]
+    )
+
+    distance = _distance_km(lat, lon).label("distance_km")
+    conditions = [cell_condition, distance <= float(radius_km)]
+
+    if level or tag:
+        section_conditions = [Section.club_id == Club.id, Section.active.is_(True)]
+        if level:
+            section_conditions.append(Section.level == level)
+        if tag:
+            section_conditions.append(cast(Section.tags, JSONB).contains([tag]))
+        conditions.append(select(Section.id).where(*section_conditions).exists())
+
+    selected = model_columns(Club, fields) if fields else [Club]
+    query = (
+        select(*selected, distance)
+        .where(*conditions)
+        .order_by(distance, Club.id)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+def search_tsquery(text: str) -> Optional[str]:
+    """
+    "бокс дети Алм" -> "бокс:* & дети:* & алм:*": все слова обязательны,
+    каждое — как префикс (автодополнение по недописанному слову).
+    None, если в строке нет ни одного слова.
+    """
+    terms = _SEARCH_TERM.findall(text.lower())[:MAX_SEARCH_TERMS]
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+async def search_clubs(
+    session: AsyncSession,
+    text: str,
+    city: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    """
+    Полнотекстовый поиск по clubs.search_vector (GIN-индекс), по убыванию
+    ts_rank. Возвращает список пар (Club, rank).
+    """
+    tsquery_text = search_tsquery(text)
+    if tsquery_text is None:
+        return []
+
+    tsquery = func.to_tsquery(_SEARCH_REGCONFIG, tsquery_text)
+    rank = func.ts_rank(Club.search_vector, tsquery).label("rank")
+    query = select(Club, rank).where(Club.search_vector.bool_op("@@")(tsquery))
+    if city:
+        query = query.where(func.lower(Club.city) == city.strip().lower())
+
+    result = await session.execute(
+        query.order_by(rank.desc(), Club.name, Club.id).offset(offset).limit(limit)
+    )
+    return result.all()
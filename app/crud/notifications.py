@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import Integer, any_, bindparam, func, insert
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.timezones import parse_timezone
+from app.models.notifications import Notification, NotificationStatus
+from app.models.users import User
+
+# Тихие часы по местному времени пользователя: [22:00, 08:00)
+QUIET_HOURS_START = 22
+QUIET_HOURS_END = 8
+
+
+def delivery_time(send_at: datetime, user_timezone: Optional[str]) -> datetime:
+    """Shift send_at out of the user's local quiet hours"""
+    local = send_at.astimezone(parse_timezone(user_timezone))
+    if local.hour >= QUIET_HOURS_START:
+        local = (local + timedelta(days=1)).replace(
+            hour=QUIET_HOURS_END, minute=0, second=0, microsecond=0
+        )
+    elif local.hour < QUIET_HOURS_END:
+        local = local.replace(hour=QUIET_HOURS_END, minute=0, second=0, microsecond=0)
+    return local.astimezone(timezone.utc)
+
+
+async def enqueue_notifications(
+    session: AsyncSession,
+    user_ids: Iterable[int],
+    kind: str,
+    payload: Dict[str, Any],
+    send_at: Optional[datetime] = None,
+) -> int:
+    """
+    Поставить сообщение в outbox для списка пользователей.
+    Пользователи с notifications=false пропускаются сразу; язык и
+    тихие часы берутся из preferences. Возвращает число поставленных строк.
+    """
+    ids = list(dict.fromkeys(user_ids))
+    if not ids:
+        return 0
+
+    result = await session.execute(
+        select(
+            User.id,
+            User.telegram_id,
+            User.preferences["language"].as_string(),
+            User.preferences["notifications"],
+            User.preferences["timezone"].as_string(),
+        ).where(User.id == any_(bindparam("user_ids", ids, type_=ARRAY(Integer))))
+    )
+
+    send_at = send_at or datetime.now(timezone.utc)
+    rows = [
+        {
+            "user_id": user_id,
+            "telegram_id": telegram_id,
+            "kind": kind,
+            "payload": payload,
+            "language": language or "ru",
+            "not_before": delivery_time(send_at, user_timezone),
+        }
+        for user_id, telegram_id, language, notifications, user_timezone in result.all()
+        if telegram_id and notifications is not False
+    ]
+    if not rows:
+        return 0
+
+    try:
+        await session.execute(insert(Notification), rows)
+        await session.commit()
+    except:
+        await session.rollback()
+        raise
+    return len(rows)
+
+
+async def get_outbox_backlog(session: AsyncSession) -> Dict[str, Any]:
+    """Backlog of the outbox: rows per active status and age of the oldest due row"""
+    result = await session.execute(
+        select(Notification.status, func.count(Notification.id))
+        .where(
+            Notification.status.in_(
+                [NotificationStatus.pending.value, NotificationStatus.sending.value]
+            )
+        )
+        .group_by(Notification.status)
+    )
+    counts = dict(result.all())
+
+    oldest = await session.execute(
+        select(func.min(Notification.not_before)).where(
+            Notification.status == NotificationStatus.pending.value,
+            Notification.not_before <= func.now(),
+        )
+    )
+    oldest_due = oldest.scalar()
+    age = (
+        (datetime.now(timezone.utc) - oldest_due).total_seconds() if oldest_due else 0.0
+    )
+
+    return {
+        "pending": counts.get(NotificationStatus.pending.value, 0),
+        "sending": counts.get(NotificationStatus.sending.value, 0),
+        "oldest_due_age_seconds": round(max(age, 0.0), 1),
+    }
@@ -0,0 +1,369 @@
+from datetime import tzinfo
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import Integer, any_, bindparam, delete, insert, or_
+from sqlalchemy.dialects.postgresql import ARRAY, Range
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.core.schedule import (
+    Interval,
+    ScheduleConflictError,
+    ScheduleError,
+    find_overlaps,
+    format_minute,
+    schedule_intervals,
+)
+from app.core.timezones import parse_timezone
+from app.models.clubs import Club
+from app.models.coach_slots import CoachSlot
+from app.models.sections import Section
+from app.schemas.sections import SectionCreate, SectionUpdate
+
+# Поля секции, от которых зависит занятость тренера
+SLOT_FIELDS = {"schedule", "duration_min", "coach_id_default", "active"}
+
+
+async def get_section_by_id(session: AsyncSession, section_id: int):
+    result = await session.execute(select(Section).where(Section.id == section_id))
+    return result.scalar_one_or_none()
+
+
+async def get_club_timezone(session: AsyncSession, club_id: int) -> Optional[tzinfo]:
+    """Club timezone, None if the club does not exist"""
+    result = await session.execute(select(Club.timezone).where(Club.id == club_id))
+    row = result.first()
+    return parse_timezone(row[0]) if row else None
+
+
+def _conflict(
+    coach_id: int,
+    section_id: Optional[int],
+    other_section_id: int,
+    other_club_id: int,
+    start: int,
+    end: int,
+    tz: tzinfo,
+) -> Dict[str, Any]:
+    return {
+        "coach_id": coach_id,
+        "section_id": section_id,
+        "other_section_id": other_section_id,
+        "other_club_id": other_club_id,
+        "start": format_minute(start, tz),
+        "end": format_minute(end, tz),
+    }
+
+
+async def find_coach_conflicts(
+    session: AsyncSession,
+    coach_id: int,
+    intervals: List[Interval],
+    tz: tzinfo,
+    section_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Occupied slots of the coach (any club) overlapping the intervals.
+    Один запрос по GiST-индексу exclusion constraint: (coach_id =, slot &&).
+    """
+    if not intervals:
+        return []
+
+    query = select(CoachSlot.section_id, CoachSlot.club_id, CoachSlot.slot).where(
+        CoachSlot.coach_id == coach_id,
+        or_(*[CoachSlot.slot.overlaps(Range(start, end)) for start, end in intervals]),
+    )
+    if section_id is not None:
+        query = query.where(CoachSlot.section_id != section_id)
+    result = await session.execute(query)
+
+    conflicts = []
+    for other_section_id, other_club_id, slot in result.all():
+        for start, end in intervals:
+            if start < slot.upper and slot.lower < end:
+                conflicts.append(
+                    _conflict(
+                        coach_id,
+                        section_id,
+                        other_section_id,
+                        other_club_id,
+                        max(start, slot.lower),
+                        min(end, slot.upper),
+                        tz,
+                    )
+                )
+    return conflicts
+
+
+async def _sync_coach_slots(session: AsyncSession, section: Section, tz: tzinfo):
+    """
+    Rebuild coach_schedule_slots rows of the section.
+    Raises ScheduleConflictError when the coach is busy elsewhere.
+    """
+    await session.execute(delete(CoachSlot).where(CoachSlot.section_id == section.id))
+    if not section.active or section.coach_id_default is None:
+        return
+
+    intervals = schedule_intervals(section.schedule, section.duration_min, tz)
+    conflicts = await find_coach_conflicts(
+        session, section.coach_id_default, intervals, tz, section_id=section.id
+    )
+    if conflicts:
+        raise ScheduleConflictError(conflicts)
+
+    session.add_all(
+        CoachSlot(
+            coach_id=section.coach_id_default,
+            section_id=section.id,
+            club_id=section.club_id,
+            slot=Range(start, end),
+        )
+        for start, end in intervals
+    )
+    try:
+        await session.flush()
+    except IntegrityError as e:
+        # Параллельный запрос занял то же время между нашей проверкой и вставкой
+        if "ex_coach_schedule_slot_overlap" in str(e.orig):
+            raise ScheduleConflictError([]) from e
+        raise
+
+
+async def create_section(session: AsyncSession, section: SectionCreate):
+    """Create a section; returns None if the club does not exist"""
+    tz = await get_club_timezone(session, section.club_id)
+    if tz is None:
+        return None
+
+    try:
+        db_section = Section(**section.model_dump())
+        session.add(db_section)
+        await session.flush()
+        await _sync_coach_slots(session, db_section, tz)
+        await session.commit()
+        await session.refresh(db_section)
+        return db_section
+    except:
+        await session.rollback()
+        raise
+
+
+async def update_section(
+    session: AsyncSession, db_section: Section, section: SectionUpdate
+):
+    section_data = section.model_dump(exclude_unset=True)
+    try:
+        for key, value in section_data.items():
+            setattr(db_section, key, value)
+
+        if SLOT_FIELDS & section_data.keys():
+            tz = await get_club_timezone(session, db_section.club_id)
+            await session.flush()
+            await _sync_coach_slots(session, db_section, tz)
+
+        await session.commit()
+        await session.refresh(db_section)
+        return db_section
+    except:
+        await session.rollback()
+        raise
+
+
+async def validate_club_timetable(session: AsyncSession, club_id: int):
+    """
+    Bulk check of the whole club timetable: coach overlaps between the club's
+    sections and against the coaches' sections in other clubs.
+    Считается по Section.schedule — и своих, и чужих секций, каждая в поясе
+    своего клуба, — а не по coach_schedule_slots, поэтому находит и
+    конфликты, сохранённые до появления exclusion constraint или без слотов.
+    Returns None if the club does not exist.
+    """
+    tz = await get_club_timezone(session, club_id)
+    if tz is None:
+        return None
+
+    result = await session.execute(
+        select(Section).where(
+            Section.club_id == club_id,
+            Section.active.is_(True),
+            Section.coach_id_default.is_not(None),
+        )
+    )
+    sections = result.scalars().all()
+
+    invalid = []
+    intervals_by_coach: Dict[int, list] = {}
+    for section in sections:
+        try:
+            intervals = schedule_intervals(section.schedule, section.duration_min, tz)
+        except ScheduleError as e:
+            invalid.append({"section_id": section.id, "error": str(e)})
+            continue
+        intervals_by_coach.setdefault(section.coach_id_default, []).extend(
+            (start, end, (section.id, club_id)) for start, end in intervals
+        )
+
+    if intervals_by_coach:
+        other_sections = await session.execute(
+            select(
+                Section.id,
+                Section.club_id,
+                Section.coach_id_default,
+                Section.schedule,
+                Section.duration_min,
+                Club.timezone,
+            )
+            .join(Club, Club.id == Section.club_id)
+            .where(
+                Section.coach_id_default.in_(intervals_by_coach),
+                Section.club_id != club_id,
+                Section.active.is_(True),
+            )
+        )
+        for row in other_sections.all():
+            try:
+                other_intervals = schedule_intervals(
+                    row.schedule, row.duration_min, parse_timezone(row.timezone)
+                )
+            except ScheduleError:
+                # Битое расписание чужого клуба покажет валидация того клуба
+                continue
+            intervals_by_coach[row.coach_id_default].extend(
+                (start, end, (row.id, row.club_id)) for start, end in other_intervals
+            )
+
+    conflicts = []
+    for coach_id, intervals in intervals_by_coach.items():
+        for first, second, start, end in find_overlaps(intervals):
+            # Пара двух чужих секций нас не интересует
+            if first[1] != club_id:
+                first, second = second, first
+            if first[1] != club_id:
+                continue
+            conflicts.append(
+                _conflict(coach_id, first[0], second[0], second[1], start, end, tz)
+            )
+
+    return {
+        "club_id": club_id,
+        "sections_checked": len(sections),
+        "conflicts": conflicts,
+        "invalid": invalid,
+    }
+
+
+async def resync_coach_slots(conn: AsyncConnection) -> Dict[str, Any]:
+    """
+    Rebuild coach_schedule_slots of all sections from Section.schedule with
+    the clubs' current UTC offsets. Call inside a transaction.
+
+    Идемпотентно: переписываются только секции, чьи слоты отличаются от
+    расписания, — первый запуск заполняет таблицу для секций, созданных
+    до неё, следующие догоняют переходы на летнее время (слоты хранятся
+    в UTC по смещению на момент записи). Секция, которая пересекается с
+    уже занятым временем тренера, остаётся без слотов и попадает в отчёт.
+    """
+    result = await conn.execute(
+        select(
+            Section.id,
+            Section.club_id,
+            Section.coach_id_default,
+            Section.schedule,
+            Section.duration_min,
+            Club.timezone,
+        )
+        .join(Club, Club.id == Section.club_id)
+        .where(Section.active.is_(True), Section.coach_id_default.is_not(None))
+        .order_by(Section.id)
+    )
+
+    desired: Dict[int, Tuple[int, int, List[Interval]]] = {}
+    timezones: Dict[int, tzinfo] = {}
+    intervals_by_coach: Dict[int, list] = {}
+    invalid = []
+    for row in result.all():
+        tz = timezones[row.id] = parse_timezone(row.timezone)
+        try:
+            intervals = schedule_intervals(row.schedule, row.duration_min, tz)
+        except ScheduleError as e:
+            invalid.append({"section_id": row.id, "error": str(e)})
+            continue
+        desired[row.id] = (row.coach_id_default, row.club_id, intervals)
+        intervals_by_coach.setdefault(row.coach_id_default, []).extend(
+            (start, end, (row.id, row.club_id)) for start, end in intervals
+        )
+
+    conflicts = []
+    for coach_id, intervals in intervals_by_coach.items():
+        for first, second, start, end in find_overlaps(intervals):
+            conflicts.append(
+                _conflict(
+                    coach_id,
+                    first[0],
+                    second[0],
+                    second[1],
+                    start,
+                    end,
+                    timezones[first[0]],
+                )
+            )
+
+    stored: Dict[int, Set[Tuple[int, int, int]]] = {}
+    result = await conn.execute(
+        select(CoachSlot.section_id, CoachSlot.coach_id, CoachSlot.slot)
+    )
+    for section_id, coach_id, slot in result.all():
+        stored.setdefault(section_id, set()).add((coach_id, slot.lower, slot.upper))
+
+    changed = sorted(
+        section_id
+        for section_id in desired.keys() | stored.keys()
+        if section_id not in desired
+        or stored.get(section_id, set())
+        != {
+            (desired[section_id][0], start, end)
+            for start, end in desired[section_id][2]
+        }
+    )
+    if changed:
+        # Сначала снимаются все устаревшие слоты: иначе сдвиг одной секции
+        # упрётся в ещё не сдвинутый слот соседней
+        await conn.execute(
+            delete(CoachSlot).where(
+                CoachSlot.section_id
+                == any_(bindparam("section_ids", changed, type_=ARRAY(Integer)))
+            )
+        )
+
+    rebuilt, unslotted = 0, []
+    for section_id in changed:
+        if not desired.get(section_id, (None, None, []))[2]:
+            continue
+        coach_id, club_id, intervals = desired[section_id]
+        try:
+            async with conn.begin_nested():
+                await conn.execute(
+                    insert(CoachSlot),
+                    [
+                        {
+                            "coach_id": coach_id,
+                            "section_id": section_id,
+                            "club_id": club_id,
+                            "slot": Range(start, end),
+                        }
+                        for start, end in intervals
+                    ],
+                )
+            rebuilt += 1
+        except IntegrityError as e:
+            if "ex_coach_schedule_slot_overlap" not in str(e.orig):
+                raise
+            unslotted.append(section_id)
+
+    return {
+        "sections": len(desired),
+        "rebuilt": rebuilt,
+        "cleared": len(changed) - rebuilt - len(unslotted),
+        "unslotted": unslotted,
+        "conflicts": conflicts,
+        "invalid": invalid,
+    }
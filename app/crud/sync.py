@@ -0,0 +1,315 @@
+import base64
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import or_, text, tuple_
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.core.config import SYNC_TOMBSTONE_PRUNE_BATCH, SYNC_TOMBSTONE_RETENTION_DAYS
+from app.models.clubs import Club
+from app.models.roles import Role
+from app.models.sections import Section
+from app.models.sync import SYNC_TABLES, SyncHorizon, SyncTombstone
+from app.models.user_roles import UserRole
+from app.models.users import User
+from app.schemas.clubs import ClubRead
+from app.schemas.sections import SectionRead
+from app.schemas.users import UserRead
+
+# Ранг tombstone-ов в курсоре — после всех таблиц с тем же xid
+TOMBSTONE_RANK = len(SYNC_TABLES)
+
+# (change_xid, rank, id) последней отданной записи
+Position = Tuple[int, int, int]
+
+# Пачка старых tombstone-ов удаляется вместе с подъёмом горизонта — в одной
+# транзакции, поэтому токен ниже горизонта не может прочитать неполный набор.
+# Только ниже watermark: все транзакции с такими xid уже завершены
+_PRUNE_TOMBSTONES = text("""
+    WITH pruned AS (
+        DELETE FROM sync_tombstones
+        WHERE id IN (
+            SELECT id FROM sync_tombstones
+            WHERE deleted_at < :cutoff AND change_xid < :watermark
+            ORDER BY deleted_at
+            LIMIT :batch
+        )
+        RETURNING change_xid
+    ), horizon AS (
+        INSERT INTO sync_horizon AS h (id, min_since)
+        SELECT 1, max(change_xid) + 1 FROM pruned HAVING count(*) > 0
+        ON CONFLICT (id) DO UPDATE
+        SET min_since = greatest(h.min_since, excluded.min_since), updated_at = now()
+    )
+    SELECT count(*) FROM pruned
+    """)
+
+
+class SyncResyncRequired(Exception):
+    """The token is older than pruned tombstones: the client must sync from scratch"""
+
+
+@dataclass
+class SyncCursor:
+    """
+    since/until — границы xid: отдаются изменения транзакций с xid в [since, until).
+    after — позиция внутри этого окна при постраничной выдаче.
+    """
+
+    since: int
+    until: Optional[int] = None
+    after: Optional[Position] = None
+
+    def encode(self) -> str:
+        parts = [self.since]
+        if self.until is not None:
+            parts.append(self.until)
+            if self.after is not None:
+                parts.extend(self.after)
+        raw = ".".join(str(part) for part in parts).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncCursor":
+        """Parse an opaque token; raises ValueError on malformed input"""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            parts = [
+                int(part)
+                for part in base64.urlsafe_b64decode(padded).decode().split(".")
+            ]
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError("Invalid sync token") from e
+        if len(parts) not in (1, 2, 5) or any(part < 0 for part in parts):
+            raise ValueError("Invalid sync token")
+        return cls(
+            since=parts[0],
+            until=parts[1] if len(parts) > 1 else None,
+            after=tuple(parts[2:]) if len(parts) == 5 else None,
+        )
+
+
+@dataclass
+class _Change:
+    position: Position
+    table: str
+    op: str
+    id: int
+    data: Optional[Dict[str, Any]]
+
+
+async def get_sync_watermark(session: AsyncSession) -> int:
+    """xmin of the current snapshot: every transaction below it has finished"""
+    result = await session.execute(
+        text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+    )
+    return result.scalar()
+
+
+async def get_sync_horizon(session: AsyncSession) -> int:
+    """Lowest since still served incrementally (0 until tombstones are pruned)"""
+    result = await session.execute(select(SyncHorizon.min_since))
+    return result.scalar() or 0
+
+
+async def prune_sync_tombstones(
+    conn: AsyncConnection,
+    retention_days: int = SYNC_TOMBSTONE_RETENTION_DAYS,
+    batch: int = SYNC_TOMBSTONE_PRUNE_BATCH,
+) -> Dict[str, Any]:
+    """
+    Delete tombstones older than retention_days in batches, one short
+    transaction per batch, raising the sync horizon past every deleted xid.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    pruned = 0
+    while True:
+        async with conn.begin():
+            watermark = await conn.scalar(
+                text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+            )
+            deleted = await conn.scalar(
+                _PRUNE_TOMBSTONES,
+                {"cutoff": cutoff, "watermark": watermark, "batch": batch},
+            )
+        pruned += deleted
+        if deleted < batch:
+            break
+
+    async with conn.begin():
+        horizon = await conn.scalar(select(SyncHorizon.min_since))
+    return {"cutoff": cutoff, "pruned": pruned, "horizon": horizon or 0}
+
+
+def _after_condition(column_xid, column_id, rank: int, after: Optional[Position]):
+    """Keyset (change_xid, rank, id) > after; rank is constant for one table"""
+    if after is None:
+        return None
+    after_xid, after_rank, after_id = after
+    if rank > after_rank:
+        return column_xid >= after_xid
+    if rank < after_rank:
+        return column_xid > after_xid
+    return tuple_(column_xid, column_id) > tuple_(after_xid, after_id)
+
+
+def _window(model, rank: int, cursor: SyncCursor) -> list:
+    conditions = [
+        model.change_xid >= cursor.since,
+        model.change_xid < cursor.until,
+    ]
+    after = _after_condition(model.change_xid, model.id, rank, cursor.after)
+    if after is not None:
+        conditions.append(after)
+    return conditions
+
+
+async def _changed_rows(
+    session: AsyncSession, model, schema, extra_conditions: list, cursor, limit
+) -> List[_Change]:
+    table = model.__tablename__
+    rank = SYNC_TABLES.index(table)
+    result = await session.execute(
+        select(model)
+        .where(*_window(model, rank, cursor), *extra_conditions)
+        .order_by(model.change_xid, model.id)
+        .limit(limit)
+    )
+    return [
+        _Change(
+            (row.change_xid, rank, row.id),
+            table,
+            "upsert",
+            row.id,
+            schema.model_validate(row).model_dump(mode="json"),
+        )
+        for row in result.scalars().all()
+    ]
+
+
+async def _changed_user_roles(
+    session: AsyncSession, user_id: int, cursor: SyncCursor, limit: int
+) -> List[_Change]:
+    rank = SYNC_TABLES.index("user_roles")
+    result = await session.execute(
+        select(UserRole, Role.code)
+        .join(Role, Role.id == UserRole.role_id)
+        .where(*_window(UserRole, rank, cursor), UserRole.user_id == user_id)
+        .order_by(UserRole.change_xid, UserRole.id)
+        .limit(limit)
+    )
+    changes = []
+    for user_role, role_code in result.all():
+        position = (user_role.change_xid, rank, user_role.id)
+        if not user_role.is_active:
+            # Деактивированная роль для клиента — то же, что удалённая
+            changes.append(
+                _Change(position, "user_roles", "delete", user_role.id, None)
+            )
+            continue
+        changes.append(
+            _Change(
+                position,
+                "user_roles",
+                "upsert",
+                user_role.id,
+                {
+                    "id": user_role.id,
+                    "user_id": user_role.user_id,
+                    "club_id": user_role.club_id,
+                    "role_code": getattr(role_code, "value", role_code),
+                    "joined_at": (
+                        user_role.joined_at.isoformat() if user_role.joined_at else None
+                    ),
+                    "is_active": True,
+                },
+            )
+        )
+    return changes
+
+
+async def _tombstones(
+    session: AsyncSession, user_id: Optional[int], cursor: SyncCursor, limit: int
+) -> List[_Change]:
+    # users/user_roles — только свои; clubs/sections — все
+    visibility = SyncTombstone.table_name.in_(("clubs", "sections"))
+    if user_id is not None:
+        visibility = or_(visibility, SyncTombstone.user_id == user_id)
+
+    result = await session.execute(
+        select(SyncTombstone)
+        .where(*_window(SyncTombstone, TOMBSTONE_RANK, cursor), visibility)
+        .order_by(SyncTombstone.change_xid, SyncTombstone.id)
+        .limit(limit)
+    )
+    return [
+        _Change(
+            (row.change_xid, TOMBSTONE_RANK, row.id),
+            row.table_name,
+            "delete",
+            row.row_id,
+            None,
+        )
+        for row in result.scalars().all()
+    ]
+
+
+async def get_changes(
+    session: AsyncSession,
+    cursor: SyncCursor,
+    telegram_id: int,
+    limit: int = 500,
+) -> Tuple[List[Dict[str, Any]], SyncCursor, bool]:
+    """
+    Изменения users (только свой профиль), clubs, sections, user_roles
+    (только свои) и tombstone-ы после курсора, не больше limit.
+    Каждая таблица читается keyset-запросом по индексу (change_xid, id),
+    поэтому стоимость — O(изменений), а не O(таблицы).
+    Полная синхронизация (since=0) tombstone-ы не читает: у клиента нечего
+    удалять. Raises SyncResyncRequired when since is below the horizon.
+    Returns (changes, next_cursor, has_more).
+    """
+    if 0 < cursor.since < await get_sync_horizon(session):
+        raise SyncResyncRequired()
+    if cursor.until is None:
+        cursor = SyncCursor(cursor.since, await get_sync_watermark(session))
+
+    user_result = await session.execute(
+        select(User.id).where(User.telegram_id == telegram_id)
+    )
+    user_id = user_result.scalar_one_or_none()
+
+    fetch = limit + 1
+    changes = await _changed_rows(session, Club, ClubRead, [], cursor, fetch)
+    changes += await _changed_rows(session, Section, SectionRead, [], cursor, fetch)
+    if user_id is not None:
+        changes += await _changed_rows(
+            session, User, UserRead, [User.id == user_id], cursor, fetch
+        )
+        changes += await _changed_user_roles(session, user_id, cursor, fetch)
+    if cursor.since > 0:
+        changes += await _tombstones(session, user_id, cursor, fetch)
+
+    changes.sort(key=lambda change: change.position)
+    has_more = len(changes) > limit
+    page = changes[:limit]
+
+    if has_more:
+        next_cursor = SyncCursor(cursor.since, cursor.until, page[-1].position)
+    else:
+        # Окно выбрано полностью: следующий sync начинается с его верхней границы
+        next_cursor = SyncCursor(cursor.until)
+
+    return (
+        [
+            {
+                "table": change.table,
+                "op": change.op,
+                "id": change.id,
+                "data": change.data,
+            }
+            for change in page
+        ],
+        next_cursor,
+        has_more,
+    )
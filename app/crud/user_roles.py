@@ -0,0 +1,311 @@
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import (
+    String,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.clubs import Club
+from app.models.roles import Role, RoleType
+from app.models.user_roles import UserRole
+from app.models.users import User
+from app.schemas.user_roles import BulkMember
+
+# Роли, которым доступно управление клубом (статистика, расписание, участники)
+CLUB_STAFF_ROLES = (RoleType.owner, RoleType.admin, RoleType.manager)
+
+# Старшинство ролей: назначать и менять можно только роли строго ниже своей
+ROLE_RANK = {
+    RoleType.student.value: 0,
+    RoleType.coach.value: 1,
+    RoleType.manager.value: 2,
+    RoleType.admin.value: 3,
+    RoleType.owner.value: 4,
+}
+
+# Строк в одном INSERT/IN: 4 параметра на строку при лимите asyncpg 32767
+BULK_CHUNK_SIZE = 2000
+
+
+async def get_user_club_role(
+    session: AsyncSession, telegram_id: int, club_id: int
+) -> Optional[RoleType]:
+    """Active role of the Telegram user in the club (owner of the club counts as owner)"""
+    result = await session.execute(
+        select(Role.code, Club.owner_id, User.id)
+        .select_from(User)
+        .join(Club, Club.id == club_id)
+        .outerjoin(
+            UserRole,
+            (UserRole.user_id == User.id)
+            & (UserRole.club_id == club_id)
+            & UserRole.is_active.is_(True),
+        )
+        .outerjoin(Role, Role.id == UserRole.role_id)
+        .where(User.telegram_id == telegram_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+
+    role_code, owner_id, user_id = row
+    if owner_id is not None and owner_id == user_id:
+        return RoleType.owner
+    return role_code
+
+
+async def is_club_staff(session: AsyncSession, telegram_id: int, club_id: int) -> bool:
+    return await get_user_club_role(session, telegram_id, club_id) in CLUB_STAFF_ROLES
+
+
+async def get_user_memberships(session: AsyncSession, telegram_id: int):
+    """
+    Active memberships of the Telegram user with the role per club,
+    including clubs the user owns. One statement (UNION ALL of both sources).
+    """
+    active_roles = (
+        select(
+            Club.id.label("club_id"),
+            Club.name.label("club_name"),
+            Club.logo_url,
+            # Как в get_user_club_role: владелец клуба — owner независимо от роли
+            case(
+                (Club.owner_id == User.id, RoleType.owner.value),
+                else_=cast(Role.code, String),
+            ).label("role"),
+            UserRole.joined_at,
+        )
+        .select_from(User)
+        .join(UserRole, (UserRole.user_id == User.id) & UserRole.is_active.is_(True))
+        .join(Club, Club.id == UserRole.club_id)
+        .join(Role, Role.id == UserRole.role_id)
+        .where(User.telegram_id == telegram_id)
+    )
+    owned_clubs = (
+        select(
+            Club.id,
+            Club.name,
+            Club.logo_url,
+            literal(RoleType.owner.value, String),
+            Club.created_at,
+        )
+        .select_from(User)
+        .join(Club, Club.owner_id == User.id)
+        .where(
+            User.telegram_id == telegram_id,
+            ~select(UserRole.id)
+            .where(
+                UserRole.user_id == User.id,
+                UserRole.club_id == Club.id,
+                UserRole.is_active.is_(True),
+            )
+            .exists(),
+        )
+    )
+    memberships = union_all(active_roles, owned_clubs).subquery()
+    result = await session.execute(
+        select(memberships).order_by(memberships.c.club_name)
+    )
+    return [dict(row._mapping) for row in result.all()]
+
+
+def _chunks(items: Sequence, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+async def get_role_ids(session: AsyncSession) -> Dict[str, int]:
+    """role_code -> Role.id for all roles (справочник из нескольких строк)"""
+    result = await session.execute(select(Role.code, Role.id))
+    return {getattr(code, "value", code): role_id for code, role_id in result.all()}
+
+
+async def _resolve_users(
+    session: AsyncSession, members: List[BulkMember]
+) -> Dict[str, Dict[int, int]]:
+    """Existing users of the batch: {"id": {id: id}, "telegram_id": {tg: id}}"""
+    user_ids = sorted({m.user_id for m in members if m.user_id is not None})
+    telegram_ids = sorted({m.telegram_id for m in members if m.telegram_id is not None})
+
+    by_id: Dict[int, int] = {}
+    for chunk in _chunks(user_ids):
+        result = await session.execute(select(User.id).where(User.id.in_(chunk)))
+        by_id.update((user_id, user_id) for user_id in result.scalars().all())
+
+    by_telegram_id: Dict[int, int] = {}
+    for chunk in _chunks(telegram_ids):
+        result = await session.execute(
+            select(User.telegram_id, User.id).where(User.telegram_id.in_(chunk))
+        )
+        by_telegram_id.update(result.all())
+
+    return {"id": by_id, "telegram_id": by_telegram_id}
+
+
+async def _current_ranks(
+    session: AsyncSession, club_id: int, user_ids: List[int]
+) -> Dict[int, int]:
+    """Rank of the current club role of these users (active role or club owner)"""
+    result = await session.execute(select(Club.owner_id).where(Club.id == club_id))
+    owner_id = result.scalar_one_or_none()
+
+    ranks: Dict[int, int] = {}
+    for chunk in _chunks(user_ids):
+        result = await session.execute(
+            select(UserRole.user_id, Role.code)
+            .join(Role, Role.id == UserRole.role_id)
+            .where(
+                UserRole.club_id == club_id,
+                UserRole.is_active.is_(True),
+                UserRole.user_id.in_(chunk),
+            )
+        )
+        ranks.update(
+            (user_id, ROLE_RANK[getattr(code, "value", code)])
+            for user_id, code in result.all()
+        )
+    if owner_id in user_ids:
+        ranks[owner_id] = ROLE_RANK[RoleType.owner.value]
+    return ranks
+
+
+async def bulk_upsert_memberships(
+    session: AsyncSession,
+    club_id: int,
+    members: List[BulkMember],
+    actor_role: RoleType,
+) -> Dict[str, Any]:
+    """
+    Импорт участников клуба: роли берутся из предзагруженного справочника,
+    пользователи ищутся пачками, запись — многострочными
+    INSERT ... ON CONFLICT ON CONSTRAINT uq_user_club DO UPDATE по BULK_CHUNK_SIZE
+    строк в одной транзакции. Строки, которые ничего не меняют, не обновляются
+    (триггеры статистики и sync не срабатывают) и получают статус unchanged.
+    Повтор одного пользователя в запросе — побеждает последняя строка.
+    actor_role — роль вызывающего в клубе: строки, которые назначают роль
+    не ниже неё или меняют участника с такой ролью, получают error.
+    Returns counters and per-row results in request order.
+    """
+    role_ids = await get_role_ids(session)
+    users = await _resolve_users(session, members)
+    actor_rank = ROLE_RANK[getattr(actor_role, "value", actor_role)]
+    assignable_role_ids = [
+        role_id for code, role_id in role_ids.items() if ROLE_RANK[code] < actor_rank
+    ]
+
+    results: List[Dict[str, Any]] = []
+    pending: Dict[int, Dict[str, Any]] = {}  # user_id -> {"index", "role_id"}
+    for index, member in enumerate(members):
+        result = {
+            "index": index,
+            "user_id": member.user_id,
+            "telegram_id": member.telegram_id,
+            "status": "error",
+            "error": None,
+        }
+        results.append(result)
+
+        if member.user_id is not None:
+            user_id = users["id"].get(member.user_id)
+        else:
+            user_id = users["telegram_id"].get(member.telegram_id)
+        role_id = role_ids.get(member.role_code)
+
+        if member.role_code == RoleType.owner.value:
+            # Владелец задаётся Club.owner_id, а не ролью участника
+            result["error"] = "Role owner cannot be assigned"
+        elif role_id is None:
+            result["error"] = f"Unknown role: {member.role_code}"
+        elif ROLE_RANK[member.role_code] >= actor_rank:
+            result["error"] = "Cannot assign a role at or above your own"
+        elif user_id is None:
+            result["error"] = "User not found"
+        else:
+            result["user_id"] = user_id
+            result["status"] = "unchanged"
+            previous = pending.get(user_id)
+            if previous is not None:
+                results[previous["index"]].update(
+                    status="error", error="Superseded by a later row for this user"
+                )
+            pending[user_id] = {"index": index, "role_id": role_id}
+
+    current_ranks = await _current_ranks(session, club_id, list(pending))
+    for user_id, rank in current_ranks.items():
+        if rank >= actor_rank:
+            row = pending.pop(user_id)
+            results[row["index"]].update(
+                status="error",
+                error="Cannot change a member whose role is at or above your own",
+            )
+
+    try:
+        for chunk in _chunks(list(pending.items())):
+            stmt = insert(UserRole).values(
+                [
+                    {
+                        "user_id": user_id,
+                        "club_id": club_id,
+                        "role_id": row["role_id"],
+                        "is_active": True,
+                    }
+                    for user_id, row in chunk
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_user_club",
+                set_={
+                    "role_id": stmt.excluded.role_id,
+                    "is_active": True,
+                    "left_at": None,
+                    # Повторное вступление после ухода — новая дата вступления
+                    "joined_at": case(
+                        (UserRole.is_active.is_(True), UserRole.joined_at),
+                        else_=func.now(),
+                    ),
+                },
+                where=and_(
+                    or_(
+                        UserRole.role_id != stmt.excluded.role_id,
+                        UserRole.is_active.isnot(True),
+                    ),
+                    # Страховка от гонки с проверкой выше: старшую активную
+                    # роль не перезаписываем даже если её выдали только что
+                    or_(
+                        UserRole.is_active.isnot(True),
+                        UserRole.role_id.in_(assignable_role_ids),
+                    ),
+                ),
+            ).returning(
+                UserRole.user_id,
+                # xmax = 0 только у только что вставленной версии строки
+                literal_column("xmax = 0").label("inserted"),
+            )
+            written = await session.execute(stmt)
+            for user_id, inserted in written.all():
+                results[pending[user_id]["index"]]["status"] = (
+                    "created" if inserted else "updated"
+                )
+        await session.commit()
+    except:
+        await session.rollback()
+        raise
+
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "error": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return {
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "unchanged": counts["unchanged"],
+        "errors": counts["error"],
+        "results": results,
+    }
@@ -1,7 +1,9 @@
-from typing import Any, Dict
-from sqlalchemy import and_, func
+from typing import Any, Dict, Iterable, Sequence, Tuple
+from sqlalchemy import Integer, BigInteger, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.fieldsets import model_columns, row_to_dict
 from app.models.users import User
 from app.schemas.users import (
     UserCreate,
@@ -10,58 +12,194 @@ from app.schemas.users import (
     UserFilters,
 )
 
+# Горячие запросы собираются один раз при импорте: значения идут только
+# через bindparam, поэтому на вызов не строится новый select(), ключ кэша
+# компиляции SQLAlchemy мемоизирован в самом объекте, а SQL-текст один и тот
+# же (повторно используется prepared statement asyncpg)
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_USER_BY_TELEGRAM_ID = select(User).where(User.telegram_id == bindparam("telegram_id"))
+_USERS_BY_IDS = select(User).where(
+    User.id == any_(bindparam("user_ids", type_=ARRAY(Integer)))
+)
+_USERS_BY_TELEGRAM_IDS = select(User).where(
+    User.telegram_id == any_(bindparam("telegram_ids", type_=ARRAY(BigInteger)))
+)
+_USER_VERSION_BY_ID = select(User.updated_at).where(User.id == bindparam("user_id"))
+_USER_VERSION_BY_TELEGRAM_ID = select(User.updated_at).where(
+    User.telegram_id == bindparam("telegram_id")
+)
+
+# Фильтры списка (ILIKE '%value%'), в фиксированном порядке
+USER_FILTER_FIELDS = ("first_name", "last_name", "phone_number", "username")
+
 
 async def get_user_by_telegram_id(session: AsyncSession, telegram_id: int):
-    result = await session.execute(select(User).where(User.telegram_id == telegram_id))
+    result = await session.execute(_USER_BY_TELEGRAM_ID, {"telegram_id": telegram_id})
     return result.scalar_one_or_none()
 
 
 async def get_user_by_id(session: AsyncSession, user_id: int):
-    result = await session.execute(select(User).where(User.id == user_id))
+    result = await session.execute(_USER_BY_ID, {"user_id": user_id})
     return result.scalar_one_or_none()
 
 
-async def get_users_paginated(
-    session: AsyncSession, skip: int = 0, limit: int = 10, filters: UserFilters = None
+async def get_users_by_ids(session: AsyncSession, user_ids: Iterable[int]):
+    """Один запрос `id = ANY($1)` вместо N отдельных SELECT. Возвращает {id: User}."""
+    ids = list(dict.fromkeys(user_ids))
+    if not ids:
+        return {}
+    result = await session.execute(_USERS_BY_IDS, {"user_ids": ids})
+    return {user.id: user for user in result.scalars().all()}
+
+
+async def get_users_by_telegram_ids(session: AsyncSession, telegram_ids: Iterable[int]):
+    """Один запрос `telegram_id = ANY($1)`. Возвращает {telegram_id: User}."""
+    ids = list(dict.fromkeys(telegram_ids))
+    if not ids:
+        return {}
+    result = await session.execute(_USERS_BY_TELEGRAM_IDS, {"telegram_ids": ids})
+    return {user.telegram_id: user for user in result.scalars().all()}
+
+
+async def get_user_fields_by_id(
+    session: AsyncSession, user_id: int, fields: Sequence[str]
 ):
-    # Базовый запрос
-    base_query = select(User)
-    count_query = select(func.count(User.id))
+    """Only the requested columns (sparse fieldset) as a dict"""
+    result = await session.execute(
+        select(*model_columns(User, fields)).where(User.id == user_id)
+    )
+    row = result.first()
+    return row_to_dict(row) if row else None
+
+
+async def get_user_fields_by_telegram_id(
+    session: AsyncSession, telegram_id: int, fields: Sequence[str]
+):
+    result = await session.execute(
+        select(*model_columns(User, fields)).where(User.telegram_id == telegram_id)
+    )
+    row = result.first()
+    return row_to_dict(row) if row else None
+
+
+async def get_users_fields_by_ids(
+    session: AsyncSession, user_ids: Iterable[int], fields: Sequence[str]
+):
+    """Как get_users_by_ids, но SELECT только нужных колонок. Возвращает {id: dict}."""
+    ids = list(dict.fromkeys(user_ids))
+    if not ids:
+        return {}
+    result = await session.execute(
+        select(User.id.label("_id"), *model_columns(User, fields)).where(
+            User.id == any_(bindparam("user_ids", ids, type_=ARRAY(Integer)))
+        )
+    )
+    users = {}
+    for row in result.all():
+        user = row_to_dict(row)
+        users[user.pop("_id")] = user
+    return users
+
+
+def _filter_params(filters: UserFilters = None) -> Dict[str, str]:
+    """Bind values of the set filters: {field: "%value%"}"""
+    if not filters:
+        return {}
+    return {
+        field: f"%{getattr(filters, field)}%"
+        for field in USER_FILTER_FIELDS
+        if getattr(filters, field)
+    }
+
 
-    # Применяем фильтры если они есть
-    if filters:
-        conditions = []
+# Набор включённых фильтров -> (count, page, versions); не больше 2**4 форм
+_PAGE_STATEMENTS: Dict[Tuple[str, ...], Tuple[Any, Any, Any]] = {}
 
-        if filters.first_name:
-            conditions.append(User.first_name.ilike(f"%{filters.first_name}%"))
 
-        if filters.last_name:
-            conditions.append(User.last_name.ilike(f"%{filters.last_name}%"))
+def _page_statements(filter_fields: Tuple[str, ...]):
+    """
+    Cached statements of the user list for one combination of filters.
+    skip/limit и значения фильтров — bindparam, поэтому на каждую
+    комбинацию приходится ровно одна форма SQL.
+    """
+    statements = _PAGE_STATEMENTS.get(filter_fields)
+    if statements is not None:
+        return statements
 
-        if filters.phone_number:
-            conditions.append(User.phone_number.ilike(f"%{filters.phone_number}%"))
+    conditions = [
+        getattr(User, field).ilike(bindparam(field)) for field in filter_fields
+    ]
+    order = (User.created_at.desc(), User.id.desc())
+    skip = bindparam("skip", type_=Integer)
+    limit = bindparam("limit", type_=Integer)
 
-        if filters.username:
-            conditions.append(User.username.ilike(f"%{filters.username}%"))
+    count_query = select(func.count(User.id)).where(*conditions)
+    users_query = (
+        select(User).where(*conditions).order_by(*order).offset(skip).limit(limit)
+    )
+    versions_query = (
+        select(User.id, User.updated_at)
+        .where(*conditions)
+        .order_by(*order)
+        .offset(skip)
+        .limit(limit)
+    )
+    statements = (count_query, users_query, versions_query)
+    _PAGE_STATEMENTS[filter_fields] = statements
+    return statements
 
-        # Применяем условия к запросам
-        if conditions:
-            filter_condition = and_(*conditions)
-            base_query = base_query.where(filter_condition)
-            count_query = count_query.where(filter_condition)
+
+async def get_users_paginated(
+    session: AsyncSession, skip: int = 0, limit: int = 10, filters: UserFilters = None
+):
+    params = _filter_params(filters)
+    count_query, users_query, _ = _page_statements(tuple(params))
 
     # Получаем общее количество записей
-    total_result = await session.execute(count_query)
+    total_result = await session.execute(count_query, params)
     total = total_result.scalar()
 
     # Получаем пагинированные результаты
-    query = base_query.offset(skip).limit(limit).order_by(User.created_at.desc())
-    result = await session.execute(query)
+    result = await session.execute(
+        users_query, {**params, "skip": skip, "limit": limit}
+    )
     users = result.scalars().all()
 
     return users, total
 
 
+async def get_user_version_by_id(session: AsyncSession, user_id: int):
+    """Только updated_at — для проверки свежести (ETag) без загрузки строки"""
+    result = await session.execute(_USER_VERSION_BY_ID, {"user_id": user_id})
+    return result.first()
+
+
+async def get_user_version_by_telegram_id(session: AsyncSession, telegram_id: int):
+    result = await session.execute(
+        _USER_VERSION_BY_TELEGRAM_ID, {"telegram_id": telegram_id}
+    )
+    return result.first()
+
+
+async def get_users_page_versions(
+    session: AsyncSession, skip: int = 0, limit: int = 10, filters: UserFilters = None
+):
+    """
+    (id, updated_at) строк страницы и total — узкий запрос для ETag списка.
+    Порядок тот же, что в get_users_paginated.
+    """
+    params = _filter_params(filters)
+    count_query, _, versions_query = _page_statements(tuple(params))
+
+    total_result = await session.execute(count_query, params)
+    total = total_result.scalar()
+
+    result = await session.execute(
+        versions_query, {**params, "skip": skip, "limit": limit}
+    )
+    return result.all(), total
+
+
 async def create_user(
     session: AsyncSession,
     user: UserCreate,
@@ -133,8 +271,29 @@ async def update_user_preferences(
 async def get_user_preference(
     session: AsyncSession, telegram_id: int, preference_key: str
 ):
-    db_user = await get_user_by_telegram_id(session, telegram_id)
-    if not db_user or not db_user.preferences:
+    # Достаём только preferences -> key, а не всю строку User
+    result = await session.execute(
+        select(User.preferences[preference_key]).where(User.telegram_id == telegram_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_user_preferences_by_keys(
+    session: AsyncSession, telegram_id: int, preference_keys: list[str]
+):
+    """
+    Несколько ключей preferences одним запросом.
+    Возвращает None, если пользователь не найден, иначе {key: value | None}.
+    """
+    columns = [
+        User.preferences[key].label(f"pref_{index}")
+        for index, key in enumerate(preference_keys)
+    ]
+    result = await session.execute(
+        select(User.id, *columns).where(User.telegram_id == telegram_id)
+    )
+    row = result.first()
+    if row is None:
         return None
 
-    return db_user.preferences.get(preference_key)
+    return {key: row[index + 1] for index, key in enumerate(preference_keys)}
@@ -2,19 +2,75 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from slowapi.errors import RateLimitExceeded
 
-from app.core.database import engine
+from app.core.database import engine, run_ddl
 from app.models import Base
+from app.models.triggers import STARTUP_DDL
 from app.core.limits import limiter, rate_limit_handler
-from app.routers import users, auth
+from app.core.config import NOTIFICATIONS_ENABLED
+from app.core.logging_config import setup_logging, stop_logging
+from app.core.catalog import catalog as catalog_store
+from app.core.checkins import checkin_buffer
+from app.core.compression import CompressionMiddleware
+from app.core.loop_monitor import LoopMonitorMiddleware, loop_monitor
+from app.core.notifications import notification_dispatcher
+from app.core.offload import shutdown_pools
+from app.core.profiling import ProfilerMiddleware
+from app.core.realtime import change_listener
+from app.core.jobs import (
+    club_stats_reconciler,
+    coach_slots_resyncer,
+    resync_coach_slots_job,
+    sync_tombstones_pruner,
+    user_roles_archiver,
+)
+from app.routers import (
+    users,
+    auth,
+    bootstrap,
+    catalog,
+    clubs,
+    sections,
+    bookings,
+    check_ins,
+    admin,
+    live,
+    sync,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup logic: create tables if they don't exist
+    setup_logging()
+    await loop_monitor.start()
+    # Startup logic: create tables if they don't exist, then functions/triggers
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await run_ddl(conn, STARTUP_DDL)
+    # Слоты тренеров для секций, созданных до coach_schedule_slots
+    await resync_coach_slots_job(wait=True)
+    await change_listener.start()
+    await catalog_store.start()
+    await checkin_buffer.start()
+    if NOTIFICATIONS_ENABLED:
+        await notification_dispatcher.start()
+    await club_stats_reconciler.start()
+    await user_roles_archiver.start()
+    await coach_slots_resyncer.start()
+    await sync_tombstones_pruner.start()
     yield
-    # Shutdown logic (optional)
+    # Shutdown logic: drain buffered check-ins before the worker exits
+    await sync_tombstones_pruner.stop()
+    await coach_slots_resyncer.stop()
+    await user_roles_archiver.stop()
+    await club_stats_reconciler.stop()
+    if NOTIFICATIONS_ENABLED:
+        await notification_dispatcher.stop()
+    await checkin_buffer.stop()
+    await catalog_store.stop()
+    await change_listener.stop()
+    await shutdown_pools()
+    await loop_monitor.stop()
+    stop_logging()
 
 
 app = FastAPI(
@@ -30,9 +86,25 @@ app.state.limiter = limiter
 # Add rate limit exception handler
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
 
+# br/gzip for JSON responses; bodies with ETag are compressed once and cached
+app.add_middleware(CompressionMiddleware)
+# Реестр запросов по задачам: блокировки event loop привязываются к маршруту
+app.add_middleware(LoopMonitorMiddleware)
+# Сэмплирующий профайлер по подписанному X-Profile или доле запросов; внешний
+app.add_middleware(ProfilerMiddleware)
+
 # Include routers with API version prefix
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(auth.router, prefix="/api/v1")
+app.include_router(bootstrap.router, prefix="/api/v1")
+app.include_router(catalog.router, prefix="/api/v1")
+app.include_router(clubs.router, prefix="/api/v1")
+app.include_router(sections.router, prefix="/api/v1")
+app.include_router(bookings.router, prefix="/api/v1")
+app.include_router(check_ins.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
+app.include_router(live.router, prefix="/api/v1")
+app.include_router(sync.router, prefix="/api/v1")
 
 
 @app.get("/")
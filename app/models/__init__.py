@@ -4,6 +4,13 @@ from .roles import Role
 from .clubs import Club
 from .sections import Section
 from .user_roles import UserRole
+from .user_roles_history import UserRoleHistory
+from .bookings import Booking
+from .check_ins import CheckIn
+from .notifications import Notification
+from .club_stats import ClubStatsDaily
+from .coach_slots import CoachSlot
+from .sync import SyncHorizon, SyncTombstone
 
 __all__ = [
     "Base",
@@ -12,4 +19,12 @@ __all__ = [
     "Club",
     "Section",
     "UserRole",
+    "UserRoleHistory",
+    "Booking",
+    "CheckIn",
+    "Notification",
+    "ClubStatsDaily",
+    "CoachSlot",
+    "SyncTombstone",
+    "SyncHorizon",
 ]
@@ -0,0 +1,57 @@
+import enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+)
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class BookingStatus(str, enum.Enum):
+    confirmed = "confirmed"
+    waitlisted = "waitlisted"
+    cancelled = "cancelled"
+
+
+class Booking(Base):
+    """
+    Запись пользователя в секцию. Одна строка на пару (section, user):
+    повторная запись после отмены переиспользует строку.
+    Занятые места считаются счётчиком Section.booked, а не COUNT(*) по этой таблице.
+    """
+
+    __tablename__ = "bookings"
+
+    id = Column(Integer, primary_key=True)
+    section_id = Column(
+        Integer, ForeignKey("sections.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    status = Column(String(20), nullable=False, default=BookingStatus.confirmed.value)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
+
+    # relations
+    section = relationship("Section")
+    user = relationship("User")
+
+    __table_args__ = (
+        UniqueConstraint("section_id", "user_id", name="uq_booking_section_user"),
+        # Очередь ожидания: первый waitlisted по created_at
+        Index(
+            "ix_bookings_section_status_created", "section_id", "status", "created_at"
+        ),
+        Index("ix_bookings_user", "user_id"),
+    )
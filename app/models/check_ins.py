@@ -0,0 +1,50 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    String,
+    DateTime,
+    Index,
+    Sequence,
+)
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+check_ins_id_seq = Sequence("check_ins_id_seq", metadata=Base.metadata)
+
+
+class CheckIn(Base):
+    """
+    Отметки посещения (QR check-in). Пишутся пачками через COPY
+    из in-process буфера (app.core.checkins), без ORM.
+
+    Таблица партиционирована по месяцам (RANGE по checked_in_at);
+    партиции создаёт app.core.partitions.ensure_monthly_partitions.
+    FK на sections/users нет намеренно: проверка FK на каждую строку
+    удорожает массовую вставку, а отметки только добавляются.
+    """
+
+    __tablename__ = "check_ins"
+
+    id = Column(
+        BigInteger,
+        check_ins_id_seq,
+        server_default=check_ins_id_seq.next_value(),
+        primary_key=True,
+    )
+    # ключ партиционирования обязан входить в первичный ключ
+    checked_in_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
+    section_id = Column(Integer, nullable=False)
+    telegram_id = Column(BigInteger, nullable=False)
+    source = Column(String(20), nullable=False, default="qr")
+
+    __table_args__ = (
+        Index("ix_check_ins_section_time", "section_id", "checked_in_at"),
+        Index("ix_check_ins_telegram_time", "telegram_id", "checked_in_at"),
+        {"postgresql_partition_by": "RANGE (checked_in_at)"},
+    )
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, text
+from app.core.database import Base
+
+
+class ClubStatsDaily(Base):
+    """
+    Инкрементальные rollup-ы статистики клуба: одна строка = приращение
+    метрики за день. Текущее значение метрики = сумма по всем дням клуба,
+    поэтому чтение стоит O(дней), а не O(участников).
+
+    Метрики:
+      members:<role>     — изменение числа активных участников с ролью
+      joins / leaves     — вступления / выходы за день
+      sections:<level>   — изменение числа активных секций уровня ("none" без уровня)
+      revenue_potential  — изменение суммы price * capacity активных секций
+
+    Поддерживается statement-level триггерами на user_roles и sections
+    (app/models/triggers.py) и периодически сверяется с исходными таблицами
+    (app.crud.club_stats.reconcile_club_stats).
+    """
+
+    __tablename__ = "club_stats_daily"
+
+    club_id = Column(
+        Integer, ForeignKey("clubs.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    metric = Column(String(40), primary_key=True)
+    value = Column(Numeric(14, 2), nullable=False, server_default=text("0"))
@@ -3,13 +3,20 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    Float,
+    BigInteger,
+    Index,
+    text,
     DateTime,
     JSON,
     ForeignKey,
+    event,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.core.database import Base
+from app.core.geo import encode_geohash
 
 
 class Club(Base):
@@ -21,6 +28,13 @@ class Club(Base):
     city = Column(String(80), nullable=True)
     address = Column(String(255), nullable=True)
 
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    # geohash в C-collation: поиск "рядом" — диапазоны по B-tree без PostGIS.
+    # В БД его пересчитывает триггер trg_clubs_geohash; событие ниже держит
+    # то же значение в объекте сразу после flush
+    geohash = Column(String(12, collation="C"), nullable=True, index=True)
+
     logo_url = Column(String(255), nullable=True)
     cover_url = Column(String(255), nullable=True)
 
@@ -38,7 +52,26 @@ class Club(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # xid транзакции последней записи (триггер sync_stamp_change) — для /sync
+    change_xid = Column(BigInteger, nullable=False, server_default=text("0"))
+    # Документ полнотекстового поиска (триггеры trg_*_search_vector);
+    # deferred — не грузится вместе с клубом
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
 
     # relations
     sections = relationship("Section", back_populates="club", cascade="all, delete")
     user_roles = relationship("UserRole", back_populates="club", cascade="all, delete")
+
+    __table_args__ = (
+        Index("ix_clubs_change_xid", "change_xid", "id"),
+        Index("ix_clubs_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+@event.listens_for(Club, "before_insert")
+@event.listens_for(Club, "before_update")
+def _set_club_geohash(mapper, connection, target):
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = encode_geohash(target.latitude, target.longitude)
+    else:
+        target.geohash = None
@@ -0,0 +1,49 @@
+from sqlalchemy import DDL, Column, ForeignKey, Integer, event
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, INT4RANGE
+from app.core.database import Base
+
+
+class CoachSlot(Base):
+    """
+    Занятость тренера: один недельный интервал занятия секции.
+    slot — минуты от понедельника 00:00 UTC, полуинтервал [start, end).
+    Строки пересобираются из Section.schedule при создании/изменении секции,
+    а для всех секций — на старте и раз в COACH_SLOTS_RESYNC_INTERVAL
+    (app.core.jobs). Смещение пояса клуба берётся на момент записи, поэтому
+    после перехода на летнее время слоты сдвинуты до ближайшей пересборки.
+
+    Exclusion constraint по (coach_id =, slot &&) на GiST-индексе:
+    пересечение ищется за O(log n) и не может проскочить при гонке двух запросов.
+    """
+
+    __tablename__ = "coach_schedule_slots"
+
+    id = Column(Integer, primary_key=True)
+    coach_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    section_id = Column(
+        Integer,
+        ForeignKey("sections.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    club_id = Column(Integer, nullable=False)
+    slot = Column(INT4RANGE, nullable=False)
+
+    __table_args__ = (
+        ExcludeConstraint(
+            (coach_id, "="),
+            (slot, "&&"),
+            using="gist",
+            name="ex_coach_schedule_slot_overlap",
+        ),
+    )
+
+
+# "=" по integer внутри GiST-индекса требует btree_gist
+event.listen(
+    CoachSlot.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"),
+)
@@ -0,0 +1,72 @@
+import enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    String,
+    Text,
+    DateTime,
+    JSON,
+    ForeignKey,
+    Index,
+    text,
+)
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class NotificationStatus(str, enum.Enum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
+    skipped = "skipped"  # пользователь отключил уведомления
+
+
+class Notification(Base):
+    """
+    Outbox исходящих сообщений в Telegram.
+    Строки добавляются в той же транзакции, что и бизнес-событие,
+    а отправляет их фоновый воркер (app.core.notifications).
+    """
+
+    __tablename__ = "notification_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    telegram_id = Column(BigInteger, nullable=False)
+
+    kind = Column(String(50), nullable=False)  # ключ шаблона, напр. "class_reminder"
+    payload = Column(JSON, nullable=False, default=dict)
+    language = Column(String(8), nullable=False, default="ru")
+
+    status = Column(
+        String(20), nullable=False, default=NotificationStatus.pending.value
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    # не отправлять раньше (тихие часы в часовом поясе пользователя, retry_after)
+    not_before = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Воркер выбирает только pending — частичный индекс остаётся маленьким
+        Index(
+            "ix_notification_outbox_pending",
+            "not_before",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_notification_outbox_sending",
+            "claimed_at",
+            postgresql_where=text("status = 'sending'"),
+        ),
+    )
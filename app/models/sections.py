@@ -1,6 +1,8 @@
 import enum
 from sqlalchemy import (
+    BigInteger,
     Column,
+    Index,
     Integer,
     String,
     Boolean,
@@ -31,6 +33,8 @@ class Section(Base):
     name = Column(String(100), nullable=False)
     level = Column(String(20), nullable=True)  # хранится как str
     capacity = Column(Integer, nullable=True)  # макс. мест
+    # занято мест; меняется только атомарным UPDATE ... WHERE booked < capacity
+    booked = Column(Integer, nullable=False, default=0, server_default=text("0"))
     price = Column(Numeric(10, 2), nullable=True)
     duration_min = Column(Integer, nullable=True, server_default=text("60"))
 
@@ -44,6 +48,10 @@ class Section(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # xid транзакции последней записи (триггер sync_stamp_change) — для /sync
+    change_xid = Column(BigInteger, nullable=False, server_default=text("0"))
 
     # relations
     club = relationship("Club", back_populates="sections")
+
+    __table_args__ = (Index("ix_sections_change_xid", "change_xid", "id"),)
@@ -0,0 +1,56 @@
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+)
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# Таблицы, изменения которых отдаёт GET /sync (порядок = ранг в курсоре)
+SYNC_TABLES = ("users", "clubs", "sections", "user_roles")
+
+
+class SyncTombstone(Base):
+    """
+    Удалённые строки синхронизируемых таблиц, пишутся триггером
+    sync_record_delete. user_id — владелец строки (users.id для users,
+    user_id для user_roles): эти таблицы отдаются только своему пользователю.
+    """
+
+    __tablename__ = "sync_tombstones"
+
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(32), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=True)
+    change_xid = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_change_xid", "change_xid", "id"),
+        # Для удаления по сроку хранения (prune_sync_tombstones)
+        Index("ix_sync_tombstones_deleted_at", "deleted_at"),
+    )
+
+
+class SyncHorizon(Base):
+    """
+    Одна строка: min_since — наименьший since, для которого tombstone-ы
+    ещё полны. Поднимается при удалении старых tombstone-ов
+    (prune_sync_tombstones); токен ниже — 410, нужна полная синхронизация.
+    """
+
+    __tablename__ = "sync_horizon"
+
+    id = Column(SmallInteger, primary_key=True, default=1)
+    min_since = Column(BigInteger, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (CheckConstraint("id = 1", name="ck_sync_horizon_single_row"),)
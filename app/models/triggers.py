@@ -0,0 +1,505 @@
+"""
+Объекты БД, которые не выражаются через Base.metadata.create_all:
+функции и триггеры. Выполняются при старте (lifespan) по одному
+statement за раз, поэтому каждый statement обязан быть идемпотентным.
+"""
+
+from app.core.geo import GEOHASH_ALPHABET, GEOHASH_PRECISION
+from app.models.sync import SYNC_TABLES
+
+# ---------- LISTEN/NOTIFY: изменения каталога (clubs, sections) ----------
+CATALOG_CHANGES_CHANNEL = "catalog_changes"
+
+CATALOG_NOTIFY_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_catalog_change() RETURNS trigger AS $$
+    DECLARE
+        rec record;
+        payload jsonb;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            rec := OLD;
+        ELSE
+            rec := NEW;
+        END IF;
+
+        IF TG_TABLE_NAME = 'sections' THEN
+            payload := jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'id', rec.id,
+                'club_id', rec.club_id,
+                'active', rec.active,
+                'capacity', rec.capacity,
+                'booked', rec.booked,
+                'spots_left', CASE
+                    WHEN rec.capacity IS NULL THEN NULL
+                    ELSE GREATEST(rec.capacity - rec.booked, 0)
+                END
+            );
+        ELSE
+            payload := jsonb_build_object(
+                'table', TG_TABLE_NAME,
+                'op', TG_OP,
+                'id', rec.id,
+                'club_id', rec.id
+            );
+        END IF;
+
+        PERFORM pg_notify('{CATALOG_CHANGES_CHANNEL}', payload::text);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_clubs_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON clubs
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_sections_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON sections
+    FOR EACH ROW EXECUTE FUNCTION notify_catalog_change()
+    """,
+]
+
+# ---------- Rollup-ы статистики клубов (club_stats_daily) ----------
+# Statement-level триггеры с transition tables: массовая вставка участников
+# даёт один upsert на (клуб, метрика), а не по одному на строку.
+# Transition tables нельзя объявить для триггера на несколько событий,
+# поэтому на каждую таблицу три триггера с общей функцией.
+STATS_DAY = "(now() AT TIME ZONE 'UTC')::date"
+
+_UPSERT_STATS = f"""
+    INSERT INTO club_stats_daily (club_id, day, metric, value)
+    SELECT club_id, {STATS_DAY}, metric, sum(delta)
+    FROM deltas
+    -- при каскадном удалении клуба его строки уже невидимы: не пишем в удалённый клуб
+    WHERE EXISTS (SELECT 1 FROM clubs c WHERE c.id = deltas.club_id)
+    GROUP BY club_id, metric
+    HAVING sum(delta) <> 0
+    ON CONFLICT (club_id, day, metric)
+    DO UPDATE SET value = club_stats_daily.value + EXCLUDED.value
+"""
+
+CLUB_STATS_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION club_stats_user_roles() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            WITH deltas AS (
+                SELECT n.club_id, 'members:' || r.code::text AS metric, 1 AS delta
+                FROM new_rows n JOIN roles r ON r.id = n.role_id
+                WHERE n.is_active IS TRUE
+                UNION ALL
+                SELECT n.club_id, 'joins', 1 FROM new_rows n WHERE n.is_active IS TRUE
+            )
+            {_UPSERT_STATS};
+        ELSIF TG_OP = 'UPDATE' THEN
+            WITH deltas AS (
+                SELECT o.club_id, 'members:' || r.code::text AS metric, -1 AS delta
+                FROM old_rows o JOIN roles r ON r.id = o.role_id
+                WHERE o.is_active IS TRUE
+                UNION ALL
+                SELECT n.club_id, 'members:' || r.code::text, 1
+                FROM new_rows n JOIN roles r ON r.id = n.role_id
+                WHERE n.is_active IS TRUE
+                UNION ALL
+                SELECT n.club_id, 'joins', 1
+                FROM new_rows n JOIN old_rows o ON o.id = n.id
+                WHERE n.is_active IS TRUE AND o.is_active IS NOT TRUE
+                UNION ALL
+                SELECT o.club_id, 'leaves', 1
+                FROM old_rows o JOIN new_rows n ON n.id = o.id
+                WHERE o.is_active IS TRUE AND n.is_active IS NOT TRUE
+            )
+            {_UPSERT_STATS};
+        ELSE
+            WITH deltas AS (
+                SELECT o.club_id, 'members:' || r.code::text AS metric, -1 AS delta
+                FROM old_rows o JOIN roles r ON r.id = o.role_id
+                WHERE o.is_active IS TRUE
+                UNION ALL
+                SELECT o.club_id, 'leaves', 1 FROM old_rows o WHERE o.is_active IS TRUE
+            )
+            {_UPSERT_STATS};
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_user_roles_stats_insert
+    AFTER INSERT ON user_roles REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION club_stats_user_roles()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_user_roles_stats_update
+    AFTER UPDATE ON user_roles REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION club_stats_user_roles()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_user_roles_stats_delete
+    AFTER DELETE ON user_roles REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION club_stats_user_roles()
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION club_stats_sections() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            WITH deltas AS (
+                SELECT club_id, 'sections:' || coalesce(level, 'none') AS metric,
+                       1::numeric AS delta
+                FROM new_rows WHERE active IS TRUE
+                UNION ALL
+                SELECT club_id, 'revenue_potential',
+                       coalesce(price, 0) * coalesce(capacity, 0)
+                FROM new_rows WHERE active IS TRUE
+            )
+            {_UPSERT_STATS};
+        ELSIF TG_OP = 'UPDATE' THEN
+            -- Обновления счётчика booked дают нулевые дельты и отсекаются HAVING
+            WITH deltas AS (
+                SELECT club_id, 'sections:' || coalesce(level, 'none') AS metric,
+                       -1::numeric AS delta
+                FROM old_rows WHERE active IS TRUE
+                UNION ALL
+                SELECT club_id, 'revenue_potential',
+                       -(coalesce(price, 0) * coalesce(capacity, 0))
+                FROM old_rows WHERE active IS TRUE
+                UNION ALL
+                SELECT club_id, 'sections:' || coalesce(level, 'none'), 1
+                FROM new_rows WHERE active IS TRUE
+                UNION ALL
+                SELECT club_id, 'revenue_potential',
+                       coalesce(price, 0) * coalesce(capacity, 0)
+                FROM new_rows WHERE active IS TRUE
+            )
+            {_UPSERT_STATS};
+        ELSE
+            WITH deltas AS (
+                SELECT club_id, 'sections:' || coalesce(level, 'none') AS metric,
+                       -1::numeric AS delta
+                FROM old_rows WHERE active IS TRUE
+                UNION ALL
+                SELECT club_id, 'revenue_potential',
+                       -(coalesce(price, 0) * coalesce(capacity, 0))
+                FROM old_rows WHERE active IS TRUE
+            )
+            {_UPSERT_STATS};
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_sections_stats_insert
+    AFTER INSERT ON sections REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION club_stats_sections()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_sections_stats_update
+    AFTER UPDATE ON sections REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION club_stats_sections()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_sections_stats_delete
+    AFTER DELETE ON sections REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION club_stats_sections()
+    """,
+]
+
+# ---------- Delta-sync (GET /sync) ----------
+# Каждая запись штампуется xid своей транзакции. Курсор клиента — xmin снимка:
+# все транзакции с xid ниже него завершены, поэтому строки с change_xid
+# в [since, until) уже не появятся "задним числом" (в отличие от sequence
+# или updated_at, которые выдаются до коммита и коммитятся не по порядку).
+SYNC_XID = "pg_current_xact_id()::text::bigint"
+
+SYNC_DDL = [
+    # Колонки для таблиц, созданных до появления /sync (create_all их не добавит)
+    *[
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS "
+        "change_xid bigint NOT NULL DEFAULT 0"
+        for table in SYNC_TABLES
+    ],
+    "CREATE INDEX IF NOT EXISTS ix_users_change_xid ON users (change_xid, id)",
+    "CREATE INDEX IF NOT EXISTS ix_clubs_change_xid ON clubs (change_xid, id)",
+    "CREATE INDEX IF NOT EXISTS ix_sections_change_xid ON sections (change_xid, id)",
+    """
+    CREATE INDEX IF NOT EXISTS ix_sync_tombstones_deleted_at
+    ON sync_tombstones (deleted_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_user_roles_user_change_xid
+    ON user_roles (user_id, change_xid, id)
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION sync_stamp_change() RETURNS trigger AS $$
+    BEGIN
+        NEW.change_xid := {SYNC_XID};
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION sync_record_delete() RETURNS trigger AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'user_roles' THEN
+            -- Неактивная строка уже ушла клиентам как delete при деактивации.
+            -- Если та деактивация ниже горизонта /sync, токенам до неё всё
+            -- равно отвечают 410: tombstone не нужен (архивация user_roles)
+            INSERT INTO sync_tombstones (table_name, row_id, user_id, change_xid)
+            SELECT TG_TABLE_NAME, o.id, o.user_id, {SYNC_XID} FROM old_rows o
+            WHERE o.is_active IS TRUE
+               OR o.change_xid >= coalesce((SELECT min_since FROM sync_horizon), 0);
+        ELSIF TG_TABLE_NAME = 'users' THEN
+            INSERT INTO sync_tombstones (table_name, row_id, user_id, change_xid)
+            SELECT TG_TABLE_NAME, o.id, o.id, {SYNC_XID} FROM old_rows o;
+        ELSE
+            INSERT INTO sync_tombstones (table_name, row_id, change_xid)
+            SELECT TG_TABLE_NAME, o.id, {SYNC_XID} FROM old_rows o;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    *[
+        statement
+        for table in SYNC_TABLES
+        for statement in (
+            f"""
+            CREATE OR REPLACE TRIGGER trg_{table}_sync_stamp
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION sync_stamp_change()
+            """,
+            f"""
+            CREATE OR REPLACE TRIGGER trg_{table}_sync_delete
+            AFTER DELETE ON {table} REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION sync_record_delete()
+            """,
+        )
+    ],
+]
+
+# ---------- Полнотекстовый поиск клубов (GET /clubs/search) ----------
+# Конфигурация multilang: копия russian (кириллица, в т.ч. казахская, — через
+# russian_stem), латиница — через english_stem. Документ клуба: name (A),
+# city и названия/теги секций (B), description (C). Вектор хранится в
+# clubs.search_vector и пересчитывается триггерами только при изменении
+# этих полей, а не при каждой записи в секцию. Казахского стеммера в
+# PostgreSQL нет; префиксный поиск (term:*) закрывает окончания.
+SEARCH_CONFIG = "multilang"
+
+SEARCH_DDL = [
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = russian);
+            ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                ALTER MAPPING FOR asciiword, asciihword, hword_asciipart
+                WITH english_stem;
+        END IF;
+    END;
+    $$
+    """,
+    # Для таблицы clubs, созданной до появления поиска
+    "ALTER TABLE clubs ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE INDEX IF NOT EXISTS ix_clubs_search_vector
+    ON clubs USING gin (search_vector)
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION club_search_vector(
+        p_club_id integer, p_name text, p_city text, p_description text
+    ) RETURNS tsvector AS $$
+        SELECT
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(p_name, '')), 'A')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(p_city, '')), 'B')
+            || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce((
+                SELECT string_agg(
+                    s.name || ' ' || coalesce((
+                        SELECT string_agg(tag, ' ')
+                        FROM json_array_elements_text(
+                            CASE WHEN json_typeof(s.tags) = 'array' THEN s.tags END
+                        ) AS tag
+                    ), ''),
+                    ' '
+                )
+                FROM sections s
+                WHERE s.club_id = p_club_id AND s.active IS TRUE
+            ), '')), 'B')
+            || setweight(
+                to_tsvector('{SEARCH_CONFIG}', coalesce(p_description, '')), 'C'
+            )
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION clubs_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := club_search_vector(
+            NEW.id, NEW.name, NEW.city, NEW.description
+        );
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_clubs_search_vector
+    BEFORE INSERT OR UPDATE OF name, city, description ON clubs
+    FOR EACH ROW EXECUTE FUNCTION clubs_search_vector_update()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION sections_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE clubs c
+            SET search_vector = club_search_vector(c.id, c.name, c.city, c.description)
+            WHERE c.id = NEW.club_id;
+        END IF;
+        IF TG_OP = 'DELETE'
+           OR (TG_OP = 'UPDATE' AND OLD.club_id IS DISTINCT FROM NEW.club_id) THEN
+            UPDATE clubs c
+            SET search_vector = club_search_vector(c.id, c.name, c.city, c.description)
+            WHERE c.id = OLD.club_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Row-level: UPDATE OF со списком колонок несовместим с transition tables.
+    # Запись в секцию (booked) документ не меняет и триггер не вызывает
+    """
+    CREATE OR REPLACE TRIGGER trg_sections_search_vector
+    AFTER INSERT OR DELETE OR UPDATE OF name, tags, active, club_id ON sections
+    FOR EACH ROW EXECUTE FUNCTION sections_search_vector_update()
+    """,
+    # Клубы, созданные до появления поиска; после первого старта — пустой UPDATE
+    """
+    UPDATE clubs
+    SET search_vector = club_search_vector(id, name, city, description)
+    WHERE search_vector IS NULL
+    """,
+]
+
+# Архив членств (app.crud.archival): горячая таблица + история одним view
+ARCHIVE_DDL = [
+    # Индекс кандидатов в архив для баз, созданных до его появления в модели
+    """
+    CREATE INDEX IF NOT EXISTS ix_user_roles_inactive_since
+    ON user_roles (coalesce(left_at, joined_at))
+    WHERE is_active IS NOT TRUE
+    """,
+    # Все членства, включая архивные — для исторических запросов и сверки
+    # статистики. Архивные строки никогда не активны
+    """
+    CREATE OR REPLACE VIEW user_roles_all AS
+    SELECT id, user_id, club_id, role_id, joined_at, left_at, is_active,
+           false AS archived
+    FROM user_roles
+    UNION ALL
+    SELECT id, user_id, club_id, role_id, joined_at, left_at, is_active,
+           true AS archived
+    FROM user_roles_history
+    """,
+]
+
+# ---------- Поиск клубов рядом (GET /clubs/nearby) ----------
+# Колонки для таблицы clubs, созданной до появления поиска по координатам.
+# geohash считает триггер — тем же алгоритмом, что app.core.geo.encode_geohash
+# (ORM-событие _set_club_geohash), поэтому строки, записанные мимо ORM,
+# и уже существующие клубы тоже попадают в поиск
+GEO_DDL = [
+    "ALTER TABLE clubs ADD COLUMN IF NOT EXISTS latitude double precision",
+    "ALTER TABLE clubs ADD COLUMN IF NOT EXISTS longitude double precision",
+    'ALTER TABLE clubs ADD COLUMN IF NOT EXISTS geohash varchar(12) COLLATE "C"',
+    "CREATE INDEX IF NOT EXISTS ix_clubs_geohash ON clubs (geohash)",
+    f"""
+    CREATE OR REPLACE FUNCTION geohash_encode(
+        lat double precision, lon double precision, digits integer DEFAULT {GEOHASH_PRECISION}
+    ) RETURNS text AS $$
+    DECLARE
+        alphabet constant text := '{GEOHASH_ALPHABET}';
+        lat_lo double precision := -90;
+        lat_hi double precision := 90;
+        lon_lo double precision := -180;
+        lon_hi double precision := 180;
+        mid double precision;
+        bits integer := 0;
+        bit_count integer := 0;
+        even boolean := true;
+        hash text := '';
+    BEGIN
+        IF lat IS NULL OR lon IS NULL THEN
+            RETURN NULL;
+        END IF;
+        WHILE length(hash) < digits LOOP
+            IF even THEN
+                mid := (lon_lo + lon_hi) / 2;
+                IF lon >= mid THEN
+                    bits := bits * 2 + 1;
+                    lon_lo := mid;
+                ELSE
+                    bits := bits * 2;
+                    lon_hi := mid;
+                END IF;
+            ELSE
+                mid := (lat_lo + lat_hi) / 2;
+                IF lat >= mid THEN
+                    bits := bits * 2 + 1;
+                    lat_lo := mid;
+                ELSE
+                    bits := bits * 2;
+                    lat_hi := mid;
+                END IF;
+            END IF;
+            even := NOT even;
+            bit_count := bit_count + 1;
+            IF bit_count = 5 THEN
+                hash := hash || substr(alphabet, bits + 1, 1);
+                bits := 0;
+                bit_count := 0;
+            END IF;
+        END LOOP;
+        RETURN hash;
+    END;
+    $$ LANGUAGE plpgsql IMMUTABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION clubs_set_geohash() RETURNS trigger AS $$
+    BEGIN
+        NEW.geohash := geohash_encode(NEW.latitude, NEW.longitude);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_clubs_geohash
+    BEFORE INSERT OR UPDATE OF latitude, longitude, geohash ON clubs
+    FOR EACH ROW EXECUTE FUNCTION clubs_set_geohash()
+    """,
+    # Клубы с координатами, но без geohash; после первого старта — пустой UPDATE
+    """
+    UPDATE clubs
+    SET geohash = geohash_encode(latitude, longitude)
+    WHERE geohash IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL
+    """,
+]
+
+# ---------- Записи в секции (bookings) ----------
+# Счётчик занятых мест для таблицы sections, созданной до появления записей;
+# его читает notify_catalog_change
+BOOKINGS_DDL = [
+    "ALTER TABLE sections ADD COLUMN IF NOT EXISTS booked integer NOT NULL DEFAULT 0",
+]
+
+STARTUP_DDL = [
+    *GEO_DDL,
+    *BOOKINGS_DDL,
+    *CATALOG_NOTIFY_DDL,
+    *CLUB_STATS_DDL,
+    *SYNC_DDL,
+    *SEARCH_DDL,
+    *ARCHIVE_DDL,
+]
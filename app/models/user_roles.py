@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     Boolean,
@@ -6,6 +7,7 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -36,6 +38,8 @@ class UserRole(Base):
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
     left_at = Column(DateTime(timezone=True), nullable=True)
     is_active = Column(Boolean, default=True)
+    # xid транзакции последней записи (триггер sync_stamp_change) — для /sync
+    change_xid = Column(BigInteger, nullable=False, server_default=text("0"))
 
     # relationships
     user = relationship("User", back_populates="roles")
@@ -47,4 +51,11 @@ class UserRole(Base):
         UniqueConstraint("user_id", "club_id", name="uq_user_club"),
         Index("ix_user_roles_user_club", "user_id", "club_id"),
         Index("ix_user_roles_active", "is_active"),
+        Index("ix_user_roles_user_change_xid", "user_id", "change_xid", "id"),
+        # Кандидаты в архив (app.crud.archival): неактивные, по давности
+        Index(
+            "ix_user_roles_inactive_since",
+            text("coalesce(left_at, joined_at)"),
+            postgresql_where=text("is_active IS NOT TRUE"),
+        ),
     )
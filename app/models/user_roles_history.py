@@ -0,0 +1,49 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+)
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class UserRoleHistory(Base):
+    """
+    Архив неактивных членств: строки user_roles, неактивные дольше
+    USER_ROLES_RETENTION_DAYS, переносятся сюда (app.crud.archival).
+    Чтение истории целиком — через view user_roles_all.
+
+    Таблица партиционирована по годам (RANGE по period_at);
+    партиции создаёт app.core.partitions.ensure_range_partition.
+    """
+
+    __tablename__ = "user_roles_history"
+
+    # id из user_roles сохраняется
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    # coalesce(left_at, joined_at) — ключ партиционирования, обязан входить в PK
+    period_at = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    club_id = Column(
+        Integer, ForeignKey("clubs.id", ondelete="CASCADE"), nullable=False
+    )
+    role_id = Column(Integer, nullable=False)
+
+    joined_at = Column(DateTime(timezone=True), nullable=True)
+    left_at = Column(DateTime(timezone=True), nullable=True)
+    is_active = Column(Boolean, nullable=True)
+    archived_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_user_roles_history_user", "user_id"),
+        Index("ix_user_roles_history_club_period", "club_id", "period_at"),
+        {"postgresql_partition_by": "RANGE (period_at)"},
+    )
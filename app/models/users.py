@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, JSON, BigInteger, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -19,6 +19,8 @@ class User(Base):
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+    # xid транзакции последней записи (триггер sync_stamp_change) — для /sync
+    change_xid = Column(BigInteger, nullable=False, server_default=text("0"))
 
     roles = relationship(
         "UserRole",
@@ -26,3 +28,5 @@ class User(Base):
         cascade="all, delete",
         lazy="select",
     )
+
+    __table_args__ = (Index("ix_users_change_xid", "change_xid", "id"),)
@@ -0,0 +1,214 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import USER_ROLES_RETENTION_DAYS
+from app.core.database import engine, get_session
+from app.core.dependencies import require_admin
+from app.core.catalog import catalog
+from app.core.checkins import checkin_buffer
+from app.core.compression import precompressed_cache
+from app.core.idempotency import idempotency_store
+from app.core.logging_config import logging_stats
+from app.core.loop_monitor import loop_monitor
+from app.core.notifications import notification_dispatcher
+from app.core.offload import offload_stats
+from app.core.profiling import request_profiler, to_collapsed, to_speedscope
+from app.core.realtime import change_listener, live_updates_hub
+from app.core.singleflight import db_reads
+from app.schemas.notifications import NotificationEnqueue, NotificationEnqueued
+from app.crud.notifications import enqueue_notifications, get_outbox_backlog
+from app.crud.archival import archive_user_roles, get_user_roles_sizes
+from app.crud.club_stats import reconcile_all_club_stats, reconcile_club_stats
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.post("/notifications", response_model=NotificationEnqueued)
+async def enqueue_notifications_route(
+    notification: NotificationEnqueue,
+    db: AsyncSession = Depends(get_session),
+):
+    """Queue a notification for users; users with notifications off are skipped"""
+    queued = await enqueue_notifications(
+        db,
+        notification.user_ids,
+        notification.kind,
+        notification.payload,
+        send_at=notification.send_at,
+    )
+    return NotificationEnqueued(queued=queued)
+
+
+@router.get("/notifications/metrics")
+async def get_notifications_metrics(db: AsyncSession = Depends(get_session)):
+    """Dispatcher throughput counters of this worker and outbox backlog"""
+    return {
+        "worker": notification_dispatcher.stats(),
+        "backlog": await get_outbox_backlog(db),
+    }
+
+
+@router.get("/check-ins/metrics")
+async def get_check_ins_metrics():
+    """Check-in buffer counters of this worker"""
+    return checkin_buffer.stats()
+
+
+@router.get("/check-ins/dead-letter")
+async def get_check_ins_dead_letter():
+    """Check-ins of this worker that were rejected row by row, newest last"""
+    return [
+        {
+            "section_id": section_id,
+            "telegram_id": telegram_id,
+            "checked_in_at": checked_in_at,
+            "source": source,
+            "error": error,
+        }
+        for (section_id, telegram_id, checked_in_at, source), error in (
+            checkin_buffer.dead_letters
+        )
+    ]
+
+
+@router.get("/catalog/metrics")
+async def get_catalog_metrics():
+    """In-memory catalog snapshot of this worker: size, age, rebuild time"""
+    return catalog.stats()
+
+
+@router.post("/catalog/reload")
+async def reload_catalog():
+    """Rebuild the catalog snapshot of this worker from the database"""
+    await catalog.reload()
+    return catalog.stats()
+
+
+@router.get("/live/metrics")
+async def get_live_metrics():
+    """WebSocket fan-out counters of this worker"""
+    return {
+        "notifications_received": change_listener.received,
+        **live_updates_hub.stats(),
+    }
+
+
+@router.get("/logging/metrics")
+async def get_logging_metrics():
+    """Log records dropped by rate limiting or a full queue in this worker"""
+    return logging_stats()
+
+
+@router.get("/idempotency/metrics")
+async def get_idempotency_metrics():
+    """Idempotency-Key store of this worker: executed, replayed, waited on in-flight"""
+    return idempotency_store.stats()
+
+
+@router.get("/singleflight/metrics")
+async def get_singleflight_metrics():
+    """Coalesced identical reads of this worker: executed vs shared results"""
+    return db_reads.stats()
+
+
+@router.get("/compression/metrics")
+async def get_compression_metrics():
+    """Bytes before/after compression, CPU time and precompressed cache hits"""
+    return precompressed_cache.stats()
+
+
+@router.get("/loop/metrics")
+async def get_loop_metrics():
+    """
+    Event loop lag histogram of this worker, recent stalls with the
+    blocking stack and route, and offload pool usage
+    """
+    return {**loop_monitor.stats(), "offload": offload_stats()}
+
+
+@router.get("/profiler")
+async def get_profiler_state():
+    """Profiler settings of this worker and the stored request profiles"""
+    return {
+        **request_profiler.stats(),
+        "profiles": [profile.summary() for profile in request_profiler.profiles],
+    }
+
+
+@router.post("/profiler")
+async def configure_profiler(
+    enabled: bool = Query(...),
+    sample_rate: float = Query(0.01, ge=0, le=1),
+    path_prefix: Optional[str] = Query(None, description="e.g. /api/v1/users"),
+):
+    """Profile a random fraction of requests (optionally one path prefix)"""
+    request_profiler.configure(enabled, sample_rate, path_prefix)
+    return request_profiler.stats()
+
+
+@router.post("/profiler/token")
+async def issue_profiler_token(ttl: int = Query(600, ge=1, le=24 * 60 * 60)):
+    """Signed X-Profile header value: requests carrying it are always profiled"""
+    if request_profiler.secret is None:
+        raise HTTPException(status_code=409, detail="PROFILER_SECRET is not set")
+    return request_profiler.issue_token(ttl)
+
+
+@router.get("/profiler/export")
+async def export_profiles(
+    profile_id: Optional[int] = Query(None, description="One profile; all if omitted"),
+    path: Optional[str] = Query(None, description="Only profiles of this path"),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+):
+    """
+    Stored profiles merged into one flame graph: speedscope JSON
+    (https://www.speedscope.app) or collapsed stacks for flamegraph.pl
+    """
+    profiles = [
+        profile
+        for profile in request_profiler.profiles
+        if (profile_id is None or profile.id == profile_id)
+        and (path is None or profile.path == path)
+    ]
+    if not profiles:
+        raise HTTPException(status_code=404, detail="No matching profiles")
+    if format == "collapsed":
+        return PlainTextResponse(to_collapsed(profiles))
+    name = f"profile {profile_id}" if profile_id is not None else (path or "requests")
+    return to_speedscope(profiles, name)
+
+
+@router.post("/club-stats/reconcile")
+async def reconcile_club_stats_route(
+    club_id: Optional[int] = Query(None, description="Only this club; all if omitted"),
+):
+    """Rebuild club statistics rollups from user_roles and sections"""
+    async with engine.connect() as conn:
+        if club_id is not None:
+            async with conn.begin():
+                await reconcile_club_stats(conn, club_id)
+            return {"reconciled_clubs": 1}
+        return {"reconciled_clubs": await reconcile_all_club_stats(conn)}
+
+
+@router.get("/user-roles/sizes")
+async def get_user_roles_sizes_route():
+    """Rows (estimate), heap and index bytes of user_roles and its archive"""
+    async with engine.connect() as conn:
+        return await get_user_roles_sizes(conn)
+
+
+@router.post("/user-roles/archive")
+async def archive_user_roles_route(
+    retention_days: int = Query(USER_ROLES_RETENTION_DAYS, ge=1),
+    max_batches: Optional[int] = Query(None, ge=1),
+):
+    """Archive inactive memberships now; returns sizes before and after"""
+    async with engine.connect() as conn:
+        return await archive_user_roles(
+            conn, retention_days=retention_days, max_batches=max_batches
+        )
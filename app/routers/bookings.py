@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict
+
+from app.core.database import get_session
+from app.core.limits import limiter
+from app.core.dependencies import get_current_user
+from app.schemas.bookings import BookingRead
+from app.crud.users import get_user_by_telegram_id
+from app.crud.bookings import (
+    book_section,
+    cancel_booking,
+    get_booking,
+    get_waitlist_position,
+)
+
+router = APIRouter(prefix="/sections", tags=["bookings"])
+
+
+async def _get_registered_user(db: AsyncSession, current_user: Dict[str, Any]):
+    db_user = await get_user_by_telegram_id(db, current_user.get("id"))
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return db_user
+
+
+async def _to_booking_read(db: AsyncSession, booking) -> BookingRead:
+    booking_read = BookingRead.model_validate(booking)
+    booking_read.waitlist_position = await get_waitlist_position(db, booking)
+    return booking_read
+
+
+@router.post("/{section_id}/bookings", response_model=BookingRead)
+@limiter.limit("10/minute")
+async def book_section_route(
+    request: Request,
+    section_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Book a place in the section for the current user.
+    When the section is full the booking is put on the waitlist.
+    Repeating the request returns the existing booking.
+    """
+    db_user = await _get_registered_user(db, current_user)
+    booking = await book_section(db, section_id, db_user.id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+    return await _to_booking_read(db, booking)
+
+
+@router.delete("/{section_id}/bookings", response_model=BookingRead)
+@limiter.limit("10/minute")
+async def cancel_booking_route(
+    request: Request,
+    section_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """Cancel the current user's booking (idempotent)"""
+    db_user = await _get_registered_user(db, current_user)
+    booking = await cancel_booking(db, section_id, db_user.id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return await _to_booking_read(db, booking)
+
+
+@router.get("/{section_id}/bookings/me", response_model=BookingRead)
+@limiter.limit("30/minute")
+async def get_my_booking_route(
+    request: Request,
+    section_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """Get the current user's booking in the section with waitlist position"""
+    db_user = await _get_registered_user(db, current_user)
+    booking = await get_booking(db, section_id, db_user.id)
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return await _to_booking_read(db, booking)
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict
+
+from app.core.dependencies import get_current_user
+from app.core.limits import limiter
+from app.core.singleflight import coalesced_read
+from app.schemas.bootstrap import BootstrapResponse
+from app.schemas.users import UserRead
+from app.crud.bookings import get_upcoming_sessions
+from app.crud.user_roles import get_user_memberships
+from app.crud.users import get_user_by_telegram_id
+
+router = APIRouter(tags=["bootstrap"])
+
+
+async def _read_profile(session: AsyncSession, telegram_id: int):
+    user = await get_user_by_telegram_id(session, telegram_id)
+    return UserRead.model_validate(user) if user else None
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+@limiter.limit("30/minute")
+async def bootstrap(
+    request: Request,
+    days: int = Query(7, ge=1, le=31, description="Upcoming sessions window"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Startup data of the mini-app in one round trip: Telegram user, profile
+    and preferences, active memberships with the role per club and upcoming
+    sessions. initData is verified once; the independent queries run
+    concurrently, each in its own session.
+    """
+    telegram_id = current_user.get("id")
+    profile, memberships, upcoming_sessions = await asyncio.gather(
+        coalesced_read(_read_profile, telegram_id),
+        coalesced_read(get_user_memberships, telegram_id),
+        coalesced_read(get_upcoming_sessions, telegram_id, days=days),
+    )
+
+    return BootstrapResponse(
+        telegram_user=current_user,
+        registered=profile is not None,
+        user=profile,
+        preferences=(profile.preferences or {}) if profile else {},
+        memberships=memberships,
+        upcoming_sessions=upcoming_sessions,
+        server_time=datetime.now(timezone.utc),
+    )
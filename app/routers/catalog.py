@@ -0,0 +1,96 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from typing import Any, Optional
+
+from app.core.catalog import catalog
+from app.core.http_cache import conditional_response, make_etag
+from app.core.limits import limiter
+from app.schemas.catalog import CatalogClub
+from app.schemas.clubs import ClubRead
+from app.schemas.sections import SectionLevel, SectionRead
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+
+def _snapshot_response(request: Request, content: Any, *key: Any):
+    """JSON from the snapshot with an ETag of its content and the query"""
+    snapshot = catalog.snapshot
+    response = JSONResponse(content)
+    not_modified = conditional_response(
+        request, response, make_etag("catalog", snapshot.digest, *key)
+    )
+    return not_modified or response
+
+
+@router.get("/clubs", response_model=list[ClubRead])
+@limiter.limit("60/minute")
+async def get_catalog_clubs_route(
+    request: Request,
+    city: Optional[str] = Query(None, max_length=80),
+    tag: Optional[str] = Query(
+        None, max_length=50, description="Only clubs with an active section tag"
+    ),
+    level: Optional[SectionLevel] = Query(
+        None, description="Only clubs with an active section of this level"
+    ),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Clubs by name from the in-memory catalog (no database round trip)"""
+    level_code = level.value if level else None
+    clubs = catalog.snapshot.find_clubs(city=city, tag=tag, level=level_code)
+    return _snapshot_response(
+        request,
+        clubs[offset : offset + limit],
+        "clubs",
+        city,
+        tag,
+        level_code,
+        offset,
+        limit,
+    )
+
+
+@router.get("/clubs/{club_id}", response_model=CatalogClub)
+@limiter.limit("60/minute")
+async def get_catalog_club_route(request: Request, club_id: int):
+    """Club with its active sections from the in-memory catalog"""
+    snapshot = catalog.snapshot
+    club = snapshot.clubs.get(club_id)
+    if club is None:
+        raise HTTPException(status_code=404, detail="Club not found")
+    return _snapshot_response(
+        request,
+        {**club, "sections": snapshot.find_sections(club_id=club_id)},
+        "club",
+        club_id,
+    )
+
+
+@router.get("/sections", response_model=list[SectionRead])
+@limiter.limit("60/minute")
+async def get_catalog_sections_route(
+    request: Request,
+    club_id: Optional[int] = Query(None),
+    city: Optional[str] = Query(None, max_length=80),
+    tag: Optional[str] = Query(None, max_length=50),
+    level: Optional[SectionLevel] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+):
+    """Active sections from the in-memory catalog, grouped by club"""
+    level_code = level.value if level else None
+    sections = catalog.snapshot.find_sections(
+        club_id=club_id, city=city, tag=tag, level=level_code
+    )
+    return _snapshot_response(
+        request,
+        sections[offset : offset + limit],
+        "sections",
+        club_id,
+        city,
+        tag,
+        level_code,
+        offset,
+        limit,
+    )
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from typing import Any, Dict
+
+from app.core.checkins import checkin_buffer
+from app.core.dependencies import get_current_user
+from app.core.limits import limiter
+from app.schemas.check_ins import CheckInCreate, CheckInAccepted
+
+router = APIRouter(prefix="/check-ins", tags=["check-ins"])
+
+
+@router.post("/", response_model=CheckInAccepted, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("120/minute")
+async def create_check_in(
+    request: Request,
+    check_in: CheckInCreate,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Register a QR check-in for the current user.
+    The check-in is buffered in memory and written to the database in batches,
+    so the response does not wait for the insert.
+    """
+    checked_in_at = datetime.now(timezone.utc)
+    accepted = checkin_buffer.add(
+        check_in.section_id,
+        current_user.get("id"),
+        checked_in_at,
+        check_in.source,
+    )
+    if not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Check-in service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    return CheckInAccepted(section_id=check_in.section_id, checked_in_at=checked_in_at)
@@ -0,0 +1,162 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
+
+from app.core.database import get_session
+from app.core.dependencies import get_current_user
+from app.core.fieldsets import parse_fields
+from app.core.limits import limiter
+from app.core.singleflight import coalesced_read
+from app.schemas.clubs import ClubNearby, ClubRead, ClubSearchResult, ClubStatsRead
+from app.schemas.sections import SectionLevel
+from app.schemas.user_roles import BulkMembershipRequest, BulkMembershipResponse
+from app.crud.clubs import get_clubs_nearby, search_clubs
+from app.models.clubs import Club
+from app.crud.club_stats import get_club_stats
+from app.crud.user_roles import (
+    CLUB_STAFF_ROLES,
+    bulk_upsert_memberships,
+    get_user_club_role,
+    is_club_staff,
+)
+
+router = APIRouter(prefix="/clubs", tags=["clubs"])
+
+# Поля ClubRead, которые хранятся в колонках clubs (для ?fields=)
+CLUB_FIELDS = [field for field in ClubRead.model_fields if field in Club.__table__.c]
+
+
+async def _read_clubs_nearby(
+    session: AsyncSession,
+    lat: float,
+    lon: float,
+    radius: float,
+    level: Optional[str],
+    tag: Optional[str],
+    limit: int,
+    fields: Optional[tuple] = None,
+):
+    rows = await get_clubs_nearby(
+        session, lat, lon, radius, level=level, tag=tag, limit=limit, fields=fields
+    )
+    if fields:
+        return [
+            {**row._mapping, "distance_km": round(row.distance_km, 3)} for row in rows
+        ]
+    return [
+        ClubNearby(
+            **ClubRead.model_validate(club).model_dump(),
+            distance_km=round(distance, 3),
+        )
+        for club, distance in rows
+    ]
+
+
+@router.get("/nearby", response_model=list[ClubNearby])
+@limiter.limit("30/minute")
+async def get_clubs_nearby_route(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the user"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the user"),
+    radius: float = Query(5, gt=0, le=50, description="Search radius in km"),
+    level: Optional[SectionLevel] = Query(
+        None, description="Only clubs with an active section of this level"
+    ),
+    tag: Optional[str] = Query(
+        None, max_length=50, description="Only clubs with an active section tag"
+    ),
+    limit: int = Query(50, ge=1, le=100, description="Max number of clubs"),
+    fields: Optional[str] = Query(
+        None,
+        description="Sparse fieldset, e.g. name,latitude,longitude "
+        "(id and distance_km are always included)",
+    ),
+):
+    """Clubs within radius km of (lat, lon), nearest first"""
+    selected = parse_fields(fields, ClubNearby, allowed=[*CLUB_FIELDS, "distance_km"])
+    if selected:
+        selected = tuple(field for field in selected if field != "distance_km")
+    # Одна ссылка в канале клуба — сотни одинаковых запросов: один поход в БД
+    clubs = await coalesced_read(
+        _read_clubs_nearby, lat, lon, radius, level, tag, limit, selected
+    )
+    if selected:
+        return JSONResponse(jsonable_encoder(clubs))
+    return clubs
+
+
+async def _search_clubs(
+    session: AsyncSession,
+    q: str,
+    city: Optional[str],
+    limit: int,
+    offset: int,
+):
+    rows = await search_clubs(session, q, city=city, limit=limit, offset=offset)
+    return [
+        ClubSearchResult(
+            **ClubRead.model_validate(club).model_dump(), rank=round(rank, 6)
+        )
+        for club, rank in rows
+    ]
+
+
+@router.get("/search", response_model=list[ClubSearchResult])
+@limiter.limit("60/minute")
+async def search_clubs_route(
+    request: Request,
+    q: str = Query(
+        ..., min_length=1, max_length=100, description='e.g. "бокс дети Алматы"'
+    ),
+    city: Optional[str] = Query(None, max_length=80),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+):
+    """
+    Full-text search over club name, city, description and its active
+    sections (names, tags), best matches first. Every word is matched
+    as a prefix, so partially typed queries work for autocomplete.
+    """
+    # Автодополнение шлёт одинаковые запросы пачками: один поход в БД
+    return await coalesced_read(_search_clubs, q.strip(), city, limit, offset)
+
+
+@router.get("/{club_id}/stats", response_model=ClubStatsRead)
+@limiter.limit("30/minute")
+async def get_club_stats_route(
+    request: Request,
+    club_id: int,
+    days: int = Query(30, ge=1, le=366, description="Window for weekly joins/leaves"),
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Club dashboard: active members per role, sections by level,
+    revenue potential and weekly joins. Available to club owner/admin/manager.
+    """
+    if not await is_club_staff(db, current_user.get("id"), club_id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return await get_club_stats(db, club_id, days=days)
+
+
+@router.post("/{club_id}/members/bulk", response_model=BulkMembershipResponse)
+@limiter.limit("5/minute")
+async def bulk_members_route(
+    request: Request,
+    club_id: int,
+    payload: BulkMembershipRequest,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Add or update up to 10000 club members at once (user_id or telegram_id
+    plus role_code). Returns an outcome per row: created, updated,
+    unchanged or error. Available to club owner/admin/manager; only roles
+    below the caller's own can be assigned or changed.
+    """
+    role = await get_user_club_role(db, current_user.get("id"), club_id)
+    if role not in CLUB_STAFF_ROLES:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return await bulk_upsert_memberships(db, club_id, payload.members, role)
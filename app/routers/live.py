@@ -0,0 +1,93 @@
+import asyncio
+import re
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+
+from app.core.dependencies import telegram_auth
+from app.core.realtime import live_updates_hub
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+CHANNEL_PATTERN = re.compile(r"^(club|section):\d+$")
+MAX_CHANNELS_PER_CONNECTION = 50
+
+
+async def _send_updates(websocket: WebSocket, subscriber):
+    while True:
+        message = await subscriber.queue.get()
+        await websocket.send_json(message)
+
+
+@router.websocket("/ws")
+async def live_updates(
+    websocket: WebSocket, init_data: str = Query(..., alias="initData")
+):
+    """
+    Live schedule/capacity updates.
+
+    Connect with ?initData=<Telegram initData>, then send
+    {"action": "subscribe", "channels": ["club:1", "section:5"]}
+    (or "unsubscribe"). Changes arrive as
+    {"type": "changes", "channel": ..., "changes": [...]} coalesced per short window;
+    {"type": "resync"} means the client fell behind and should refetch via REST.
+    """
+    try:
+        telegram_auth.authenticate(init_data)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = live_updates_hub.connect()
+    sender = asyncio.create_task(_send_updates(websocket, subscriber))
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action") if isinstance(message, dict) else None
+            channels = message.get("channels") if isinstance(message, dict) else None
+
+            if action not in ("subscribe", "unsubscribe") or not isinstance(
+                channels, list
+            ):
+                subscriber.offer({"type": "error", "detail": "Invalid message"})
+                continue
+
+            invalid = [
+                channel
+                for channel in channels
+                if not isinstance(channel, str) or not CHANNEL_PATTERN.match(channel)
+            ]
+            if invalid:
+                subscriber.offer(
+                    {"type": "error", "detail": "Invalid channels", "channels": invalid}
+                )
+                continue
+
+            if action == "subscribe":
+                if (
+                    len(subscriber.channels | set(channels))
+                    > MAX_CHANNELS_PER_CONNECTION
+                ):
+                    subscriber.offer({"type": "error", "detail": "Too many channels"})
+                    continue
+                for channel in channels:
+                    live_updates_hub.subscribe(subscriber, channel)
+            else:
+                for channel in channels:
+                    live_updates_hub.unsubscribe(subscriber, channel)
+
+            subscriber.offer(
+                {"type": "subscribed", "channels": sorted(subscriber.channels)}
+            )
+    except (WebSocketDisconnect, ValueError):
+        pass
+    finally:
+        live_updates_hub.disconnect(subscriber)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
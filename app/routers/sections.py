@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict
+
+from app.core.database import get_session
+from app.core.dependencies import get_current_user
+from app.core.limits import limiter
+from app.core.schedule import ScheduleConflictError, ScheduleError
+from app.schemas.sections import (
+    SectionCreate,
+    SectionRead,
+    SectionUpdate,
+    TimetableValidation,
+)
+from app.crud.sections import (
+    create_section,
+    get_section_by_id,
+    update_section,
+    validate_club_timetable,
+)
+from app.crud.user_roles import is_club_staff
+
+router = APIRouter(tags=["sections"])
+
+
+async def _require_club_staff(
+    db: AsyncSession, current_user: Dict[str, Any], club_id: int
+):
+    if not await is_club_staff(db, current_user.get("id"), club_id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+def _schedule_http_error(error: Exception) -> HTTPException:
+    if isinstance(error, ScheduleConflictError):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Coach is busy at these times",
+                "conflicts": error.conflicts,
+            },
+        )
+    return HTTPException(status_code=422, detail=f"Invalid schedule: {error}")
+
+
+@router.post(
+    "/clubs/{club_id}/sections",
+    response_model=SectionRead,
+    status_code=status.HTTP_201_CREATED,
+)
+@limiter.limit("10/minute")
+async def create_section_route(
+    request: Request,
+    club_id: int,
+    section: SectionCreate,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Create a section in the club. Responds 409 with the overlapping
+    slots if the coach already has a class at the same time.
+    """
+    if section.club_id != club_id:
+        raise HTTPException(status_code=422, detail="club_id does not match the path")
+    await _require_club_staff(db, current_user, club_id)
+
+    try:
+        db_section = await create_section(db, section)
+    except (ScheduleConflictError, ScheduleError) as e:
+        raise _schedule_http_error(e)
+    if db_section is None:
+        raise HTTPException(status_code=404, detail="Club not found")
+    return db_section
+
+
+@router.patch("/sections/{section_id}", response_model=SectionRead)
+@limiter.limit("20/minute")
+async def update_section_route(
+    request: Request,
+    section_id: int,
+    section: SectionUpdate,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """Update a section; schedule/coach changes are checked for coach conflicts"""
+    db_section = await get_section_by_id(db, section_id)
+    if db_section is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+    await _require_club_staff(db, current_user, db_section.club_id)
+
+    try:
+        return await update_section(db, db_section, section)
+    except (ScheduleConflictError, ScheduleError) as e:
+        raise _schedule_http_error(e)
+
+
+@router.get("/clubs/{club_id}/timetable/conflicts", response_model=TimetableValidation)
+@limiter.limit("10/minute")
+async def validate_club_timetable_route(
+    request: Request,
+    club_id: int,
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Validate the whole club timetable: coach overlaps between sections
+    (including sections in other clubs) and unparseable schedules
+    """
+    await _require_club_staff(db, current_user, club_id)
+    report = await validate_club_timetable(db, club_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Club not found")
+    return report
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional
+
+from app.core.database import get_session
+from app.core.dependencies import get_current_user
+from app.core.limits import limiter
+from app.schemas.sync import SyncResponse
+from app.crud.sync import SyncCursor, SyncResyncRequired, get_changes
+
+router = APIRouter(tags=["sync"])
+
+
+@router.get("/sync", response_model=SyncResponse)
+@limiter.limit("60/minute")
+async def sync_changes(
+    request: Request,
+    since: Optional[str] = Query(
+        None, description="Token from the previous response (omit for a full sync)"
+    ),
+    limit: int = Query(500, ge=1, le=1000, description="Max changes per page"),
+    db: AsyncSession = Depends(get_session),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Delta-sync feed: clubs and sections, plus the current user's profile and
+    memberships, created/updated/deleted after the token. Deactivated
+    memberships come as deletes. Repeat with `next` while has_more is true,
+    then store `next` for the following sync. 410 means the token is older
+    than the kept deletions: drop local data and sync again without `since`.
+    """
+    try:
+        cursor = SyncCursor.decode(since) if since else SyncCursor(since=0)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        changes, next_cursor, has_more = await get_changes(
+            db, cursor, current_user.get("id"), limit=limit
+        )
+    except SyncResyncRequired:
+        raise HTTPException(
+            status_code=410, detail="Sync token expired, full resync required"
+        )
+    return SyncResponse(changes=changes, next=next_cursor.encode(), has_more=has_more)
@@ -1,11 +1,18 @@
 import math
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+import re
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, Dict, Optional
 
 from app.core.database import get_session
 from app.core.limits import limiter
 from app.core.dependencies import get_current_user
+from app.core.fieldsets import parse_fields
+from app.core.http_cache import conditional_response, make_etag
+from app.core.idempotency import idempotent
+from app.core.singleflight import coalesced_read
 from app.schemas.users import (
     UserCreate,
     UserUpdate,
@@ -13,20 +20,64 @@ from app.schemas.users import (
     UserListResponse,
     PreferencesUpdate,
     UserFilters,
+    UserLookupRequest,
+    UserLookupResult,
+    UserLookupResponse,
 )
 
 from app.crud.users import (
     get_user_by_id,
     get_user_by_telegram_id,
-    get_users_paginated,
+    get_users_by_ids,
+    get_users_by_telegram_ids,
+    get_users_fields_by_ids,
+    get_user_fields_by_id,
+    get_user_fields_by_telegram_id,
+    get_users_page_versions,
+    get_user_version_by_id,
+    get_user_version_by_telegram_id,
     create_user,
     update_user,
     update_user_preferences,
     get_user_preference,
+    get_user_preferences_by_keys,
 )
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+PREFERENCE_KEY_PATTERN = re.compile(r"^[a-zA-Z0-9_]{1,64}$")
+MAX_PREFERENCE_KEYS = 20
+
+
+# Чтения для coalesced_read: результат общий для параллельных запросов,
+# поэтому отдаём pydantic-модели, а не ORM-объекты сессии
+async def _read_user_by_id(session: AsyncSession, user_id: int):
+    user = await get_user_by_id(session, user_id)
+    return UserRead.model_validate(user) if user else None
+
+
+async def _read_user_by_telegram_id(session: AsyncSession, telegram_id: int):
+    user = await get_user_by_telegram_id(session, telegram_id)
+    return UserRead.model_validate(user) if user else None
+
+
+async def _read_users_by_ids(session: AsyncSession, user_ids: list[int]):
+    users = await get_users_by_ids(session, user_ids)
+    return {user_id: UserRead.model_validate(user) for user_id, user in users.items()}
+
+
+def _fields_query():
+    return Query(
+        None,
+        description="Sparse fieldset: comma-separated UserRead fields, "
+        "e.g. first_name,photo_url (id is always included)",
+    )
+
+
+def _partial_response(content: Any, response: Response) -> JSONResponse:
+    """Sparse fieldset response; keeps validator headers set on response"""
+    return JSONResponse(jsonable_encoder(content), headers=dict(response.headers))
+
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 @limiter.limit("5/minute")
@@ -36,21 +87,95 @@ async def create_new_user(
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: AsyncSession = Depends(get_session),
 ):
-    existing = await get_user_by_telegram_id(db, current_user.get("id"))
-    if existing:
-        raise HTTPException(
-            status_code=409,
-            detail=f"User with this telegram_id {current_user.get("id")} already exists.",
+    """
+    Register the current Telegram user.
+    Supports Idempotency-Key: a retried registration replays the stored 201.
+    """
+
+    async def handler():
+        existing = await get_user_by_telegram_id(db, current_user.get("id"))
+        if existing:
+            raise HTTPException(
+                status_code=409,
+                detail=f"User with this telegram_id {current_user.get("id")} already exists.",
+            )
+        return await create_user(db, user, current_user)
+
+    return await idempotent(
+        request,
+        current_user.get("id"),
+        handler,
+        UserRead,
+        status_code=status.HTTP_201_CREATED,
+    )
+
+
+@router.post("/lookup", response_model=UserLookupResponse)
+@limiter.limit("30/minute")
+async def lookup_users(
+    request: Request,
+    lookup: UserLookupRequest,
+    db: AsyncSession = Depends(get_session),
+):
+    """
+    Batch lookup by ids and/or telegram_ids in one request.
+    Results keep request order; unknown ids are returned with found=false.
+    """
+    by_id = await get_users_by_ids(db, lookup.ids)
+    by_telegram_id = await get_users_by_telegram_ids(db, lookup.telegram_ids)
+
+    results = [
+        UserLookupResult(id=user_id, found=user_id in by_id, user=by_id.get(user_id))
+        for user_id in lookup.ids
+    ]
+    results.extend(
+        UserLookupResult(
+            telegram_id=telegram_id,
+            found=telegram_id in by_telegram_id,
+            user=by_telegram_id.get(telegram_id),
         )
-    return await create_user(db, user, current_user)
+        for telegram_id in lookup.telegram_ids
+    )
+
+    found = sum(1 for result in results if result.found)
+    return UserLookupResponse(
+        results=results, found=found, missing=len(results) - found
+    )
 
 
 @router.get("/{user_id}", response_model=UserRead)
 @limiter.limit("30/minute")
 async def get_user(
-    request: Request, user_id: int, db: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    user_id: int,
+    fields: Optional[str] = _fields_query(),
 ):
-    user = await get_user_by_id(db, user_id)
+    """Get user by id; ?fields= narrows both the SELECT and the response"""
+    selected = parse_fields(fields, UserRead)
+
+    # Одинаковые параллельные чтения (всплеск после ссылки в канале)
+    # выполняются одним запросом к БД
+    version = await coalesced_read(get_user_version_by_id, user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag("user", user_id, version.updated_at, selected),
+        version.updated_at,
+    )
+    if not_modified:
+        return not_modified
+
+    if selected:
+        user = await coalesced_read(get_user_fields_by_id, user_id, selected)
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return _partial_response(user, response)
+
+    user = await coalesced_read(_read_user_by_id, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -60,6 +185,7 @@ async def get_user(
 @limiter.limit("20/minute")
 async def get_users_list(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number starting from 1"),
     size: int = Query(10, ge=1, le=100, description="Number of items per page"),
     # Фильтры как query параметры
@@ -75,8 +201,9 @@ async def get_users_list(
     username: Optional[str] = Query(
         None, description="Filter by username (partial match)"
     ),
-    db: AsyncSession = Depends(get_session),
+    fields: Optional[str] = _fields_query(),
 ):
+    selected = parse_fields(fields, UserRead)
     skip = (page - 1) * size
 
     # Создаем объект фильтров
@@ -91,10 +218,45 @@ async def get_users_list(
     if not any([first_name, last_name, phone_number, username]):
         filters = None
 
-    users, total = await get_users_paginated(db, skip=skip, limit=size, filters=filters)
+    # Сначала узкий запрос (id, updated_at) страницы — для ETag
+    versions, total = await coalesced_read(
+        get_users_page_versions, skip=skip, limit=size, filters=filters
+    )
+    last_modified = max((version.updated_at for version in versions), default=None)
+    etag = make_etag(
+        "users",
+        page,
+        size,
+        filters.model_dump() if filters else None,
+        total,
+        [(version.id, version.updated_at) for version in versions],
+        selected,
+    )
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+
+    ids = [version.id for version in versions]
+    if selected:
+        users_by_id = await coalesced_read(get_users_fields_by_ids, ids, selected)
+    else:
+        users_by_id = await coalesced_read(_read_users_by_ids, ids)
+    users = [users_by_id[user_id] for user_id in ids if user_id in users_by_id]
 
     pages = math.ceil(total / size) if total > 0 else 1
 
+    if selected:
+        return _partial_response(
+            {
+                "users": users,
+                "total": total,
+                "page": page,
+                "size": size,
+                "pages": pages,
+                "filters": filters,
+            },
+            response,
+        )
     return UserListResponse(
         users=users, total=total, page=page, size=size, pages=pages, filters=filters
     )
@@ -103,9 +265,34 @@ async def get_users_list(
 @router.get("/by-telegram-id/{telegram_id}", response_model=UserRead)
 @limiter.limit("30/minute")
 async def get_user_by_telegram_id_route(
-    request: Request, telegram_id: int, db: AsyncSession = Depends(get_session)
+    request: Request,
+    response: Response,
+    telegram_id: int,
+    fields: Optional[str] = _fields_query(),
 ):
-    user = await get_user_by_telegram_id(db, telegram_id)
+    selected = parse_fields(fields, UserRead)
+    version = await coalesced_read(get_user_version_by_telegram_id, telegram_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    not_modified = conditional_response(
+        request,
+        response,
+        make_etag("user-tg", telegram_id, version.updated_at, selected),
+        version.updated_at,
+    )
+    if not_modified:
+        return not_modified
+
+    if selected:
+        user = await coalesced_read(
+            get_user_fields_by_telegram_id, telegram_id, selected
+        )
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return _partial_response(user, response)
+
+    user = await coalesced_read(_read_user_by_telegram_id, telegram_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -119,10 +306,15 @@ async def update_user_by_telegram_id(
     db: AsyncSession = Depends(get_session),
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
-    db_user = await update_user(db, current_user.get("id"), user)
-    if db_user is None:
-        raise HTTPException(status_code=404, detail="User not found")
-    return db_user
+    """Update the current user; supports Idempotency-Key"""
+
+    async def handler():
+        db_user = await update_user(db, current_user.get("id"), user)
+        if db_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return db_user
+
+    return await idempotent(request, current_user.get("id"), handler, UserRead)
 
 
 @router.put("/preferences", response_model=UserRead)
@@ -133,11 +325,52 @@ async def update_user_preferences_route(
     db: AsyncSession = Depends(get_session),
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
-    """Update user preferences (language, dark_mode, notifications, timezone)"""
-    db_user = await update_user_preferences(db, preferences, current_user.get("id"))
-    if db_user is None:
+    """
+    Update user preferences (language, dark_mode, notifications, timezone).
+    Supports Idempotency-Key.
+    """
+
+    async def handler():
+        db_user = await update_user_preferences(db, preferences, current_user.get("id"))
+        if db_user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return db_user
+
+    return await idempotent(request, current_user.get("id"), handler, UserRead)
+
+
+@router.get("/{telegram_id}/preferences")
+@limiter.limit("10/minute")
+async def get_user_preferences_route(
+    request: Request,
+    telegram_id: int,
+    keys: str = Query(
+        ..., description="Comma-separated preference keys, e.g. theme,language"
+    ),
+    db: AsyncSession = Depends(get_session),
+):
+    """Get several user preferences by keys in one request"""
+    preference_keys = list(
+        dict.fromkeys(key.strip() for key in keys.split(",") if key.strip())
+    )
+    if not preference_keys:
+        raise HTTPException(status_code=422, detail="At least one key is required")
+    if len(preference_keys) > MAX_PREFERENCE_KEYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"No more than {MAX_PREFERENCE_KEYS} keys per request",
+        )
+    invalid = [key for key in preference_keys if not PREFERENCE_KEY_PATTERN.match(key)]
+    if invalid:
+        raise HTTPException(
+            status_code=422, detail=f"Invalid preference keys: {', '.join(invalid)}"
+        )
+
+    preferences = await get_user_preferences_by_keys(db, telegram_id, preference_keys)
+    if preferences is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return db_user
+
+    return {"telegram_id": telegram_id, "preferences": preferences}
 
 
 @router.get("/{telegram_id}/preferences/{preference_key}")
@@ -0,0 +1,23 @@
+# app/schemas/bookings.py
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+BookingStatus = Literal["confirmed", "waitlisted", "cancelled"]
+
+
+class BookingRead(BaseModel):
+    """Ответ API."""
+
+    id: int
+    section_id: int
+    user_id: int
+    status: BookingStatus
+    created_at: datetime
+    cancelled_at: Optional[datetime] = None
+    # позиция в очереди ожидания (1 — следующий), только для waitlisted
+    waitlist_position: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
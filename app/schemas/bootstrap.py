@@ -0,0 +1,41 @@
+# app/schemas/bootstrap.py
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.bookings import BookingStatus
+from app.schemas.user_roles import RoleType
+from app.schemas.users import UserRead
+
+
+class BootstrapMembership(BaseModel):
+    club_id: int
+    club_name: str
+    logo_url: Optional[str] = None
+    role: RoleType
+    joined_at: Optional[datetime] = None
+
+
+class BootstrapSession(BaseModel):
+    """Конкретное занятие из расписания секции, на которую записан пользователь."""
+
+    section_id: int
+    section_name: str
+    club_id: int
+    club_name: str
+    starts_at: datetime
+    ends_at: datetime
+    booking_status: BookingStatus
+
+
+class BootstrapResponse(BaseModel):
+    """GET /bootstrap — всё, что нужно mini-app на первом экране."""
+
+    telegram_user: dict[str, Any]
+    registered: bool
+    user: Optional[UserRead] = None
+    preferences: dict[str, Any] = Field(default_factory=dict)
+    memberships: list[BootstrapMembership] = Field(default_factory=list)
+    upcoming_sessions: list[BootstrapSession] = Field(default_factory=list)
+    server_time: datetime
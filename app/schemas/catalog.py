@@ -0,0 +1,8 @@
+from app.schemas.clubs import ClubRead
+from app.schemas.sections import SectionRead
+
+
+class CatalogClub(ClubRead):
+    """GET /catalog/clubs/{id} — клуб с активными секциями."""
+
+    sections: list[SectionRead]
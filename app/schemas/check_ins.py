@@ -0,0 +1,23 @@
+# app/schemas/check_ins.py
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+CheckInSource = Literal["qr", "manual"]
+
+
+class CheckInCreate(BaseModel):
+    """POST /check-ins"""
+
+    section_id: int = Field(..., gt=0)
+    source: CheckInSource = "qr"
+
+
+class CheckInAccepted(BaseModel):
+    """Ответ API: отметка принята в буфер, запись в БД — асинхронно."""
+
+    status: Literal["accepted"] = "accepted"
+    section_id: int
+    checked_in_at: datetime
@@ -1,5 +1,5 @@
 # app/schemas/clubs.py
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, HttpUrl
@@ -12,6 +12,8 @@ class ClubBase(BaseModel):
     description: Optional[str] = None
     city: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
     logo_url: Optional[HttpUrl] = None
     cover_url: Optional[HttpUrl] = None
@@ -41,6 +43,8 @@ class ClubUpdate(BaseModel):
     description: Optional[str] = None
     city: Optional[str] = None
     address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
 
     logo_url: Optional[HttpUrl] = None
     cover_url: Optional[HttpUrl] = None
@@ -65,3 +69,33 @@ class ClubRead(ClubBase):
     owner_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
+
+
+class ClubNearby(ClubRead):
+    """GET /clubs/nearby — клуб + расстояние от точки поиска."""
+
+    distance_km: float
+
+
+class ClubSearchResult(ClubRead):
+    """GET /clubs/search — клуб + релевантность (ts_rank)."""
+
+    rank: float
+
+
+class ClubStatsWeek(BaseModel):
+    week_start: date
+    joins: int = 0
+    leaves: int = 0
+
+
+class ClubStatsRead(BaseModel):
+    """GET /clubs/{id}/stats — дашборд владельца клуба."""
+
+    club_id: int
+    total_members: int
+    members_by_role: dict[str, int]
+    sections_by_level: dict[str, int]
+    revenue_potential: float
+    weekly: list[ClubStatsWeek]
+    days: int
@@ -0,0 +1,18 @@
+# app/schemas/notifications.py
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+
+class NotificationEnqueue(BaseModel):
+    """POST /admin/notifications — поставить сообщение в outbox."""
+
+    user_ids: list[int] = Field(..., min_length=1, max_length=10000)
+    kind: str = Field(..., pattern=r"^[a-z_]{1,50}$")
+    payload: dict[str, Any] = Field(default_factory=dict)
+    send_at: Optional[datetime] = None
+
+
+class NotificationEnqueued(BaseModel):
+    queued: int = Field(..., ge=0)
@@ -53,5 +53,32 @@ class SectionRead(SectionBase):
     """Ответ API."""
 
     id: int
+    booked: int = 0
     created_at: datetime
     updated_at: datetime
+
+
+# ---------- конфликты расписания тренеров ----------
+class ScheduleConflict(BaseModel):
+    """Пересечение занятий тренера; start/end — "wed 18:00" во времени клуба."""
+
+    coach_id: int
+    section_id: Optional[int] = None
+    other_section_id: int
+    other_club_id: int
+    start: str
+    end: str
+
+
+class ScheduleInvalid(BaseModel):
+    section_id: int
+    error: str
+
+
+class TimetableValidation(BaseModel):
+    """GET /clubs/{club_id}/timetable/conflicts"""
+
+    club_id: int
+    sections_checked: int
+    conflicts: list[ScheduleConflict]
+    invalid: list[ScheduleInvalid]
@@ -0,0 +1,20 @@
+# app/schemas/sync.py
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class SyncChange(BaseModel):
+    table: Literal["users", "clubs", "sections", "user_roles"]
+    op: Literal["upsert", "delete"]
+    id: int
+    # полная строка (как в Read-схеме) для upsert, None для delete
+    data: Optional[dict[str, Any]] = None
+
+
+class SyncResponse(BaseModel):
+    """GET /sync — изменения после токена; next передаётся в следующий запрос."""
+
+    changes: list[SyncChange]
+    next: str
+    has_more: bool
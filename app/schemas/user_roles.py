@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Literal
+from typing import List, Literal
 
 
 RoleType = Literal["student", "coach", "manager", "admin", "owner"]
@@ -27,3 +27,37 @@ class UserRoleRead(UserRoleBase):
     joined_at: datetime
     left_at: datetime | None = None
     is_active: bool
+
+
+class BulkMember(BaseModel):
+    """Одна строка импорта: пользователь по user_id или telegram_id"""
+
+    user_id: int | None = None
+    telegram_id: int | None = None
+    role_code: RoleType = "student"
+
+    @model_validator(mode="after")
+    def check_identity(self):
+        if (self.user_id is None) == (self.telegram_id is None):
+            raise ValueError("Exactly one of user_id or telegram_id is required")
+        return self
+
+
+class BulkMembershipRequest(BaseModel):
+    members: List[BulkMember] = Field(..., min_length=1, max_length=10000)
+
+
+class BulkMemberResult(BaseModel):
+    index: int
+    user_id: int | None = None
+    telegram_id: int | None = None
+    status: Literal["created", "updated", "unchanged", "error"]
+    error: str | None = None
+
+
+class BulkMembershipResponse(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    errors: int
+    results: List[BulkMemberResult]
@@ -1,7 +1,7 @@
 from datetime import datetime
 import re
 from typing import Any, Dict, Optional
-from pydantic import BaseModel, Field, field_validator, ConfigDict
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
 
 
 class UserPreferences(BaseModel):
@@ -89,6 +89,40 @@ class UserListResponse(BaseModel):
     filters: Optional[UserFilters] = None
 
 
+USER_LOOKUP_MAX_ITEMS = 500
+
+
+class UserLookupRequest(BaseModel):
+    ids: list[int] = Field(default_factory=list, max_length=USER_LOOKUP_MAX_ITEMS)
+    telegram_ids: list[int] = Field(
+        default_factory=list, max_length=USER_LOOKUP_MAX_ITEMS
+    )
+
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        if not self.ids and not self.telegram_ids:
+            raise ValueError("Either ids or telegram_ids must be provided")
+        if len(self.ids) + len(self.telegram_ids) > USER_LOOKUP_MAX_ITEMS:
+            raise ValueError(
+                f"No more than {USER_LOOKUP_MAX_ITEMS} ids per lookup request"
+            )
+        return self
+
+
+class UserLookupResult(BaseModel):
+    id: Optional[int] = None
+    telegram_id: Optional[int] = None
+    found: bool
+    user: Optional[UserRead] = None
+
+
+class UserLookupResponse(BaseModel):
+    # Порядок results совпадает с порядком запроса: сначала ids, затем telegram_ids
+    results: list[UserLookupResult]
+    found: int = Field(..., ge=0)
+    missing: int = Field(..., ge=0)
+
+
 class PreferencesUpdate(BaseModel):
     language: Optional[str] = None
     dark_mode: Optional[bool] = None
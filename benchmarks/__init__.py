@@ -0,0 +1,9 @@
+"""
+Нагрузочные сценарии и микробенчмарки. В образ приложения не входят
+(Dockerfile копирует только app/).
+
+Запуск из корня репозитория: python -m benchmarks.<name> --help.
+Сценарии с БД работают с DATABASE_URL (переменные POSTGRES_* из
+app.core.config) и удаляют за собой созданные строки; схема должна быть
+создана стартом приложения.
+"""
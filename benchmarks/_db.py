@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import DATABASE_URL
+
+
+def make_engine(connections: int):
+    """
+    Отдельный движок сценария: пул на `connections` соединений, чтобы
+    конкурентность задавалась сценарием, а не pool_size приложения.
+    Returns (engine, session factory).
+    """
+    engine = create_async_engine(
+        DATABASE_URL, pool_size=connections, max_overflow=0, pool_timeout=300
+    )
+    return engine, sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -0,0 +1,132 @@
+"""
+Конкурентная запись в одну секцию (app.crud.bookings).
+
+    python -m benchmarks.bookings --users 5000 --capacity 1000 --connections 100
+
+Три фазы, каждая — все вызовы одновременно:
+1. users x book_section;
+2. отмена всех из очереди (секция полна, очередь пуста);
+3. отмена половины подтверждённых вперемешку с повторной записью.
+После каждой фазы проверяются инварианты: booked <= capacity,
+booked == число confirmed, при непустой очереди свободных мест нет.
+Временные клуб, секция и пользователи удаляются в конце.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List
+from sqlalchemy import delete
+from sqlalchemy.future import select
+from app.crud.bookings import book_section, cancel_booking
+from app.models.bookings import Booking, BookingStatus
+from app.models.clubs import Club
+from app.models.sections import Section
+from app.models.users import User
+from benchmarks._db import make_engine
+
+
+async def _timed(label: str, calls: List) -> None:
+    started = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - started
+    print(f"{label:38} {len(calls):6} calls {len(calls) / elapsed:8.0f} ops/s")
+
+
+async def _state(
+    sessions, section_id: int, capacity: int, stage: str
+) -> Dict[str, List[int]]:
+    async with sessions() as session:
+        booked = await session.scalar(
+            select(Section.booked).where(Section.id == section_id)
+        )
+        result = await session.execute(
+            select(Booking.status, Booking.user_id).where(
+                Booking.section_id == section_id
+            )
+        )
+    by_status: Dict[str, List[int]] = {}
+    for status, user_id in result.all():
+        by_status.setdefault(status, []).append(user_id)
+    confirmed = by_status.get(BookingStatus.confirmed.value, [])
+    waitlisted = by_status.get(BookingStatus.waitlisted.value, [])
+    print(
+        f"{stage:38} booked={booked} confirmed={len(confirmed)} "
+        f"waitlisted={len(waitlisted)} capacity={capacity}"
+    )
+    assert booked <= capacity, "overbooked"
+    assert booked == len(confirmed), "booked counter drifted"
+    assert not waitlisted or booked == capacity, "free seat with a waitlist"
+    return by_status
+
+
+async def run(users: int, capacity: int, connections: int):
+    engine, sessions = make_engine(connections)
+
+    async def call(fn, section_id: int, user_id: int):
+        async with sessions() as session:
+            return await fn(session, section_id, user_id)
+
+    tag = uuid.uuid4().hex[:8]
+    base_telegram_id = 9_000_000_000 + int(tag, 16) % 100_000 * 100_000
+    async with sessions() as session:
+        club = Club(name=f"bench-bookings-{tag}")
+        section = Section(club=club, name="bench", capacity=capacity)
+        people = [
+            User(
+                telegram_id=base_telegram_id + index,
+                first_name="bench",
+                phone_number="0",
+            )
+            for index in range(users)
+        ]
+        session.add_all([club, section, *people])
+        await session.commit()
+        club_id, section_id = club.id, section.id
+        user_ids = [user.id for user in people]
+
+    try:
+        await _timed(
+            "book (all at once)",
+            [call(book_section, section_id, user_id) for user_id in user_ids],
+        )
+        state = await _state(sessions, section_id, capacity, "after booking")
+        confirmed = state.get(BookingStatus.confirmed.value, [])
+        waitlisted = state.get(BookingStatus.waitlisted.value, [])
+        assert len(confirmed) == min(users, capacity)
+        assert len(waitlisted) == users - len(confirmed)
+
+        # Секция полна, очередь пуста — условие гонки отмена/запись в очередь
+        await _timed(
+            "cancel waitlisted",
+            [call(cancel_booking, section_id, user_id) for user_id in waitlisted],
+        )
+        state = await _state(sessions, section_id, capacity, "after emptying queue")
+        confirmed = state.get(BookingStatus.confirmed.value, [])
+
+        leaving = confirmed[: len(confirmed) // 2]
+        rejoining = waitlisted[: len(leaving) * 2]
+        calls = []
+        for index in range(max(len(leaving), len(rejoining))):
+            if index < len(leaving):
+                calls.append(call(cancel_booking, section_id, leaving[index]))
+            if index < len(rejoining):
+                calls.append(call(book_section, section_id, rejoining[index]))
+        await _timed("cancel confirmed + book, interleaved", calls)
+        await _state(sessions, section_id, capacity, "after cancel/book race")
+    finally:
+        async with sessions() as session:
+            await session.execute(delete(Club).where(Club.id == club_id))
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--connections", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.capacity, args.connections))
@@ -0,0 +1,98 @@
+"""
+Устойчивая скорость приёма отметок посещения (app.core.checkins).
+
+    python -m benchmarks.checkins --rows 200000 --concurrency 20
+
+Сначала путь запроса в памяти (add, без БД), затем на живой БД:
+INSERT + COMMIT на отметку через ORM-сессию, как без буфера, против
+буфера с COPY; последняя фаза — тот же буфер с одной «ядовитой» строкой
+(source длиннее колонки), которая должна уйти в dead letter, не
+задержав остальные. Строки бенчмарка — source="bench", удаляются в конце.
+"""
+
+import argparse
+import asyncio
+import time
+import timeit
+from datetime import datetime, timezone
+from sqlalchemy import delete
+from app.core.checkins import CheckInBuffer
+from app.core.database import async_session, engine
+from app.core.partitions import month_start
+from app.models.check_ins import CheckIn
+
+
+def _report(label: str, rows: int, elapsed: float):
+    print(f"{label:44} {rows:7} rows {rows / elapsed:10.0f} check-ins/s")
+
+
+async def _per_request_inserts(rows: int, concurrency: int):
+    # Прежний путь: каждая отметка — своя транзакция; concurrency запросов
+    remaining = iter(range(rows))
+
+    async def worker():
+        for index in remaining:
+            async with async_session() as session:
+                session.add(CheckIn(section_id=1, telegram_id=index, source="bench"))
+                await session.commit()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def _buffered(rows: int, concurrency: int, poison_at: int = -1):
+    buffer = CheckInBuffer()
+    await buffer.start()
+    for index in range(rows):
+        source = "bench-" + "x" * 30 if index == poison_at else "bench"
+        while not buffer.add(1, index, source=source):
+            # Буфер полон (запрос получил бы 503): ждём сброса — так меряется
+            # устойчивая скорость записи, а не размер буфера
+            await asyncio.sleep(0.01)
+        if index % concurrency == 0:
+            # Запросы приходят вперемешку с работой фоновой задачи
+            await asyncio.sleep(0)
+    await buffer.stop()
+    expected = rows - (poison_at >= 0)
+    assert buffer.flushed == expected, buffer.stats()
+    assert buffer.dead_lettered == rows - expected, buffer.stats()
+    assert buffer.pending == 0, buffer.stats()
+
+
+async def run(rows: int, concurrency: int):
+    try:
+        # Партиции текущего месяца — до замеров
+        await CheckInBuffer()._ensure_partitions(
+            {month_start(datetime.now(timezone.utc).date())}
+        )
+        baseline_rows = max(rows // 10, concurrency)
+        for label, scenario, count, extra in (
+            (
+                f"INSERT + COMMIT per check-in (x{concurrency})",
+                _per_request_inserts,
+                baseline_rows,
+                (),
+            ),
+            ("buffer + COPY", _buffered, rows, ()),
+            ("buffer + COPY, one poison row", _buffered, rows, (rows // 2,)),
+        ):
+            started = time.perf_counter()
+            await scenario(count, concurrency, *extra)
+            _report(label, count, time.perf_counter() - started)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(delete(CheckIn).where(CheckIn.source == "bench"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    memory = CheckInBuffer(flush_size=10**9, max_pending=10**9)
+    rounds = 200000
+    per_add = timeit.timeit(lambda: memory.add(1, 1), number=rounds) / rounds
+    print(f"{'add() in the request path':44} {per_add * 1e6:7.2f} us/call")
+
+    asyncio.run(run(args.rows, args.concurrency))
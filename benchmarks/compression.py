@@ -0,0 +1,105 @@
+"""
+Сжатие ответа: CPU на ответ против сэкономленных байт (app.core.compression).
+
+    python -m benchmarks.compression --rows 100 --rounds 50
+
+Тело — синтетическая страница GET /users?size=<rows>. Для каждого
+(encoding, level) — время сжатия и экономия; последней строкой — цена
+попадания в PrecompressedCache (хэш тела + поиск), которую платит каждый
+повторный ответ с ETag.
+"""
+
+import argparse
+import json
+import time
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.compression import PrecompressedCache, brotli, cache_key, compress
+
+
+def benchmark(
+    body: bytes, levels: Optional[List[Tuple[str, int]]] = None, rounds: int = 50
+) -> List[Dict[str, Any]]:
+    """CPU time per response against bytes saved, for each (encoding, level)"""
+    if levels is None:
+        levels = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+        if brotli is not None:
+            levels += [("br", 1), ("br", 5), ("br", 11)]
+
+    results = []
+    for encoding, level in levels:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            compressed = compress(
+                body, encoding, gzip_level=level, brotli_quality=level
+            )
+        elapsed = (time.perf_counter() - started) / rounds
+        results.append(
+            {
+                "encoding": encoding,
+                "level": level,
+                "bytes_in": len(body),
+                "bytes_out": len(compressed),
+                "saved_percent": round(100 * (1 - len(compressed) / len(body)), 1),
+                "ms_per_response": round(elapsed * 1000, 3),
+            }
+        )
+    return results
+
+
+def users_page(rows: int) -> bytes:
+    now = datetime.now(timezone.utc).isoformat()
+    page = {
+        "users": [
+            {
+                "id": index,
+                "telegram_id": 100000000 + index * 7919,
+                "first_name": f"Имя{index}",
+                "last_name": f"Фамилия{index}",
+                "phone_number": f"+7701{index:07d}",
+                "username": f"user_{index}",
+                "photo_url": f"https://t.me/i/userpic/320/{index:08x}.jpg",
+                "preferences": {
+                    "language": "ru",
+                    "dark_mode": index % 2 == 0,
+                    "notifications": True,
+                    "timezone": "UTC+5",
+                },
+                "created_at": now,
+                "updated_at": now,
+            }
+            for index in range(rows)
+        ],
+        "total": rows,
+        "page": 1,
+        "size": rows,
+        "pages": 1,
+        "filters": None,
+    }
+    return json.dumps(page, ensure_ascii=False).encode()
+
+
+def cache_hit_ms(body: bytes, rounds: int) -> float:
+    cache = PrecompressedCache()
+    cache.put(cache_key(body, "gzip"), compress(body, "gzip"))
+    elapsed = timeit.timeit(lambda: cache.get(cache_key(body, "gzip")), number=rounds)
+    return elapsed / rounds * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    body = users_page(args.rows)
+    for row in benchmark(body, rounds=args.rounds):
+        print(row)
+    print(
+        {
+            "cache_hit": "blake2b + lookup",
+            "bytes_in": len(body),
+            "ms_per_response": round(cache_hit_ms(body, args.rounds * 100), 4),
+        }
+    )
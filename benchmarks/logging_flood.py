@@ -0,0 +1,137 @@
+"""
+Задержка event loop под потоком запросов, каждый из которых пишет в лог.
+
+    python -m benchmarks.logging_flood --requests 20000 --write-delay-us 100
+
+Два источника записей: битый initData (warning из app.core.telegram_auth)
+и access-лог uvicorn — логгер uvicorn.access со своим StreamHandler и
+propagate=False, как его настраивает uvicorn до старта приложения.
+Синхронные StreamHandler в потоке loop (как было) против очереди с
+фоновым потоком (setup_logging). Лог пишется во временный файл;
+write-delay-us имитирует медленный приёмник stdout (pipe в лог-коллектор).
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from typing import List, TextIO
+from fastapi import HTTPException
+from app.core.logging_config import logging_stats, setup_logging, stop_logging
+from app.core.telegram_auth import TelegramAuth
+
+CLIENTS = 50
+TICK = 0.001
+ACCESS_FORMAT = '%s - "%s %s HTTP/%s" %d'
+
+auth = TelegramAuth("123456:benchmark")
+bad_init_data = "auth_date=1700000000&user=%7B%22id%22%3A1%7D&hash=" + "0" * 64
+access_logger = logging.getLogger("uvicorn.access")
+
+
+class SlowStream:
+    def __init__(self, stream: TextIO, write_delay: float):
+        self.stream = stream
+        self.write_delay = write_delay
+
+    def write(self, data: str):
+        time.sleep(self.write_delay)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+async def _flood(requests: int):
+    loop = asyncio.get_running_loop()
+    lags: List[float] = []
+    flooding = True
+
+    async def ticker():
+        while flooding:
+            started = loop.time()
+            await asyncio.sleep(TICK)
+            lags.append(max(loop.time() - started - TICK, 0.0))
+
+    async def client(index: int):
+        for _ in range(requests // CLIENTS):
+            try:
+                auth.authenticate(bad_init_data)
+            except HTTPException:
+                pass
+            access_logger.info(
+                ACCESS_FORMAT, f"10.0.0.{index}:5000", "GET", "/api/v1/me", "1.1", 401
+            )
+            await asyncio.sleep(0)
+
+    ticker_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(CLIENTS)))
+    elapsed = time.perf_counter() - started
+    flooding = False
+    await ticker_task
+    return elapsed, sorted(lags)
+
+
+def _report(label: str, requests: int, elapsed: float, lags: List[float]):
+    def at(q: float) -> float:
+        return lags[min(int(q * len(lags)), len(lags) - 1)] * 1000
+
+    print(
+        f"{label:34} {requests / elapsed:8.0f} req/s  loop lag ms: "
+        f"p50 {at(0.5):6.2f}  p99 {at(0.99):6.2f}  max {lags[-1] * 1000:6.2f}"
+    )
+
+
+def _uvicorn_style_handlers(stream: SlowStream):
+    # Как uvicorn.config.LOGGING_CONFIG: свои хендлеры, мимо root
+    formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    for name in ("uvicorn", "uvicorn.access"):
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(formatter)
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers[:] = [handler]
+        uvicorn_logger.propagate = False
+        uvicorn_logger.setLevel(logging.INFO)
+
+
+def main(requests: int, write_delay: float):
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    with tempfile.TemporaryFile("w+") as sink:
+        stream = SlowStream(sink, write_delay)
+
+        direct = logging.StreamHandler(stream)
+        direct.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+        root.handlers[:] = [direct]
+        _uvicorn_style_handlers(stream)
+        _report("sync StreamHandler (before)", requests, *asyncio.run(_flood(requests)))
+
+        root.handlers[:] = []
+        _uvicorn_style_handlers(stream)
+        setup_logging(stream)
+        assert not access_logger.handlers and access_logger.propagate
+        sink.seek(0, 2)
+        written_before = sink.tell()
+        _report("queue + rate limit (now)", requests, *asyncio.run(_flood(requests)))
+        stats = logging_stats()
+        stop_logging()
+
+        sink.seek(written_before)
+        access_lines = sum('"uvicorn.access"' in line for line in sink)
+        print(
+            f"rate-limited {stats['rate_limited']} of {requests * 2} records, "
+            f"queue-full drops {stats['queue_full_dropped']}, "
+            f"access lines written {access_lines} of {requests}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--write-delay-us", type=float, default=100.0)
+    args = parser.parse_args()
+    main(args.requests, args.write_delay_us / 1e6)
@@ -0,0 +1,243 @@
+"""
+Рассылка уведомлений против локального фейкового Bot API.
+
+    python -m benchmarks.notifications --messages 300 --workers 3 --rate 25
+    python -m benchmarks.notifications --serve --port 8081
+
+Во втором режиме поднимается только фейковый Bot API: приложение
+запускается с TELEGRAM_API_URL=http://127.0.0.1:8081 и шлёт в него.
+
+Сценарий: в outbox кладутся messages сообщений для временных
+пользователей, в одном процессе стартуют workers диспетчеров — как
+воркеры uvicorn, каждый со своим соединением под advisory lock.
+Фейковый API отвечает 403 каждому blocked-every чату и один раз 429
+(retry_after=1). На половине рассылки активный диспетчер
+останавливается (воркер завершился) — рассылку должен подхватить
+другой. Проверяется: одновременно шлёт один диспетчер, ни одно
+сообщение не доставлено дважды, средняя скорость не выше --rate.
+Пользователи удаляются в конце (outbox — каскадом).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Tuple
+from sqlalchemy import delete, func, insert
+from sqlalchemy.future import select
+from app.core.database import async_session, engine
+from app.core.notifications import NotificationDispatcher
+from app.models.notifications import Notification, NotificationStatus
+from app.models.users import User
+
+REASONS = {200: "OK", 403: "Forbidden", 404: "Not Found", 429: "Too Many Requests"}
+
+
+class FakeBotApi:
+    """Minimal HTTP/1.1 keep-alive server answering sendMessage"""
+
+    def __init__(self, blocked_every: int = 0, throttle_once: bool = False):
+        self.blocked_every = blocked_every
+        self.throttle_once = throttle_once
+        # (monotonic time, chat_id, status) на каждый sendMessage
+        self.requests: List[Tuple[float, int, int]] = []
+        self.url = ""
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.url = f"http://{host}:{self._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _reply(self, target: str, body: bytes) -> Tuple[int, Dict]:
+        if not target.endswith("/sendMessage"):
+            return 404, {"ok": False, "description": "Not Found"}
+        chat_id = json.loads(body)["chat_id"]
+        if self.throttle_once:
+            self.throttle_once = False
+            status, payload = 429, {
+                "ok": False,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            }
+        elif self.blocked_every and chat_id % self.blocked_every == 0:
+            status, payload = 403, {
+                "ok": False,
+                "description": "Forbidden: bot was blocked by the user",
+            }
+        else:
+            status, payload = 200, {"ok": True, "result": {"chat": {"id": chat_id}}}
+        self.requests.append((time.monotonic(), chat_id, status))
+        return status, payload
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                target = request_line.decode("latin-1").split()[1]
+                status, payload = self._reply(target, body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _outbox_state(user_ids: List[int]) -> Dict[str, int]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(Notification.status, func.count())
+            .where(Notification.user_id.in_(user_ids))
+            .group_by(Notification.status)
+        )
+        return dict(result.all())
+
+
+def _max_per_window(times: List[float], window: float = 1.0) -> int:
+    best = start = 0
+    for end, sent_at in enumerate(times):
+        while sent_at - times[start] > window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+async def run(messages: int, workers: int, rate: float, blocked_every: int):
+    api = FakeBotApi(blocked_every=blocked_every, throttle_once=True)
+    await api.start()
+
+    tag = uuid.uuid4().hex[:8]
+    base_telegram_id = 8_000_000_000 + int(tag, 16) % 100_000 * 100_000
+    async with async_session() as session:
+        people = [
+            User(
+                telegram_id=base_telegram_id + index,
+                first_name="bench",
+                phone_number="0",
+            )
+            for index in range(messages)
+        ]
+        session.add_all(people)
+        await session.flush()
+        user_ids = [user.id for user in people]
+        await session.execute(
+            insert(Notification),
+            [
+                {
+                    "user_id": user.id,
+                    "telegram_id": user.telegram_id,
+                    "kind": "booking_confirmed",
+                    "payload": {"section": "bench"},
+                    "language": "ru",
+                }
+                for user in people
+            ],
+        )
+        await session.commit()
+
+    dispatchers = [
+        NotificationDispatcher(
+            api_url=api.url,
+            bot_token="bench",
+            rate_per_second=rate,
+            poll_interval=0.2,
+            leader_check_interval=0.5,
+        )
+        for _ in range(workers)
+    ]
+    started = time.monotonic()
+    try:
+        for dispatcher in dispatchers:
+            await dispatcher.start()
+
+        stopped = None
+        final = (NotificationStatus.sent.value, NotificationStatus.failed.value)
+        while True:
+            await asyncio.sleep(0.5)
+            leaders = [index for index, d in enumerate(dispatchers) if d.leader]
+            assert len(leaders) <= 1, f"several active dispatchers: {leaders}"
+            if stopped is None and len(api.requests) >= messages // 2 and leaders:
+                # Активный воркер завершается посреди рассылки
+                stopped = leaders[0]
+                print(f"stopping dispatcher #{stopped} at {len(api.requests)} requests")
+                await dispatchers[stopped].stop()
+            state = await _outbox_state(user_ids)
+            if sum(state.get(status, 0) for status in final) == messages:
+                break
+            if time.monotonic() - started > messages / rate * 3 + 30:
+                raise AssertionError(f"outbox not drained: {state}")
+        elapsed = time.monotonic() - started
+    finally:
+        for dispatcher in dispatchers:
+            await dispatcher.stop()
+        await api.stop()
+        async with async_session() as session:
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.commit()
+        await engine.dispose()
+
+    delivered = Counter(chat_id for _, chat_id, status in api.requests if status == 200)
+    duplicates = [chat_id for chat_id, count in delivered.items() if count > 1]
+    times = [sent_at for sent_at, _, _ in api.requests]
+    senders = [index for index, d in enumerate(dispatchers) if d.sent or d.failed]
+    print(f"outbox        {state}")
+    print(
+        f"requests      {len(api.requests)} ({dict(Counter(s for _, _, s in api.requests))})"
+    )
+    print(f"senders       dispatchers {senders} of {workers}")
+    print(f"average rate  {len(api.requests) / elapsed:.1f} req/s (limit {rate:g})")
+    print(f"max in 1 s    {_max_per_window(times)} requests")
+    assert not duplicates, f"delivered twice: {duplicates[:10]}"
+    assert len(delivered) == state.get(NotificationStatus.sent.value), "lost sends"
+    assert len(api.requests) / elapsed <= rate * 1.05, "global rate exceeded"
+    assert _max_per_window(times) <= rate + 1, "burst above the limit"
+
+
+async def serve(port: int, blocked_every: int):
+    api = FakeBotApi(blocked_every=blocked_every)
+    await api.start(port=port)
+    print(f"Fake Bot API on {api.url}; run the app with TELEGRAM_API_URL={api.url}")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(
+                f"{len(api.requests)} requests, {Counter(s for _, _, s in api.requests)}"
+            )
+    finally:
+        await api.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--rate", type=float, default=25)
+    parser.add_argument("--blocked-every", type=int, default=50)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    if args.serve:
+        asyncio.run(serve(args.port, args.blocked_every))
+    else:
+        asyncio.run(run(args.messages, args.workers, args.rate, args.blocked_every))
@@ -0,0 +1,61 @@
+"""
+Python-накладные расходы на вызов app.crud.users до похода в БД:
+построение запроса и ключ кэша компиляции (при его промахе ещё и compile).
+
+    python -m benchmarks.users --rounds 20000
+"""
+
+import argparse
+import timeit
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+from app.crud.users import _USER_BY_ID, _filter_params, _page_statements
+from app.models.users import User
+from app.schemas.users import UserFilters
+
+dialect = postgresql.asyncpg.dialect()
+filters = UserFilters(first_name="Ali", username="ali")
+
+
+def rebuilt_page():
+    # Как было: новый select() на каждый вызов
+    query = select(User)
+    for field, pattern in _filter_params(filters).items():
+        query = query.where(getattr(User, field).ilike(pattern))
+    return query.offset(20).limit(10).order_by(User.created_at.desc())
+
+
+def cached_page():
+    return _page_statements(tuple(_filter_params(filters)))[1]
+
+
+CASES = [
+    ("get_user_by_id: select() per call", lambda: select(User).where(User.id == 42)),
+    ("get_user_by_id: cached statement", lambda: _USER_BY_ID),
+    ("get_users_paginated: select() per call", rebuilt_page),
+    ("get_users_paginated: cached statement", cached_page),
+]
+
+
+def main(rounds: int, compile_rounds: int):
+    for name, build in CASES:
+        per_call = timeit.timeit(lambda: build()._generate_cache_key(), number=rounds)
+        print(f"{name:42} {per_call / rounds * 1e6:8.2f} us/call")
+
+    per_compile = timeit.timeit(
+        lambda: rebuilt_page().compile(dialect=dialect), number=compile_rounds
+    )
+    print(f"{'compile on cache miss':42} {per_compile / compile_rounds * 1e6:8.2f} us")
+    shapes = {
+        str(_page_statements(fields)[1].compile(dialect=dialect))
+        for fields in [(), ("first_name",), ("first_name", "username")] * 100
+    }
+    print(f"distinct SQL shapes for 300 list calls: {len(shapes)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--compile-rounds", type=int, default=500)
+    args = parser.parse_args()
+    main(args.rounds, args.compile_rounds)